@@ -1,16 +1,30 @@
 """
 FastAPI app for the arbitrage bot dashboard and API.
+
+Importing this module is cheap: exchange clients, the market-data services,
+the database engine and the secrets store are built lazily (see
+`utils.lazy`). The startup hook only schedules a background warm-up, so the
+port is bound and /health answers before ccxt is even imported.
 """
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
 import os
-from core.price_monitor import PriceMonitor
-from core.trade_executor import TradeExecutor
-from core.inventory_manager import InventoryManager
-from config.secrets import SecretsManager
+import asyncio
+import time
+from api.websocket_handler import router as websocket_router, broadcaster
+from core.models import prices_to_dict, to_dicts
+from core.supervisor import run_every
+from api.versioned_state import VersionedState, etag_matches
+from config.config import settings
+from config.runtime_config import RuntimeConfig
+from utils.lazy import Lazy, build_times
 from utils.logger import logger
+from utils.metrics import CONTENT_TYPE, render as render_metrics
+from utils.profiling import MAX_SECONDS as MAX_PROFILE_SECONDS, function_timings, profiler, register_loop, token_matches
+from datetime import datetime, timedelta
 
 app = FastAPI(title="Arbitrage Bot API")
 
@@ -20,35 +34,234 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Mount frontend static files
 frontend_dir = os.path.join(os.path.dirname(__file__), "..", "frontend")
 if os.path.exists(frontend_dir):
     app.mount("/static", StaticFiles(directory=frontend_dir), name="static")
 
-price_monitor = PriceMonitor()
-trade_executor = TradeExecutor()
-inventory_manager = InventoryManager()
-secrets_manager = SecretsManager()
+app.include_router(websocket_router)
 
-@app.get("/", response_class=HTMLResponse)
-def root():
-    """Serve dashboard"""
+DEFAULT_PAIRS = ["BTC/USDT", "ETH/USDT"]
+
+class Services:
+    """One set of async clients shared by every request and background task"""
+
+    def __init__(self):
+        # ccxt and aiohttp are only imported once the services are needed
+        from exchanges.ccxt_wrapper import AsyncExchangeManager
+        from core.price_monitor import PriceMonitor
+        from core.inventory_manager import InventoryManager
+        from core.market_data import MarketDataService
+        from core.opportunity_service import OpportunityService
+        from core.fee_schedule import FeeSchedule, parse_fee_overrides
+
+        self.exchange_manager = AsyncExchangeManager()
+        self.fee_schedule = FeeSchedule(list(self.exchange_manager.exchanges.keys()),
+                                        default=settings.DEFAULT_FEE,
+                                        overrides=parse_fee_overrides(settings.FEE_OVERRIDES))
+        self.price_monitor = PriceMonitor(exchange_manager=self.exchange_manager, fees=self.fee_schedule)
+        self.inventory_manager = InventoryManager(exchange_manager=self.exchange_manager)
+        self.market_data = MarketDataService(self.price_monitor)
+        self.opportunity_service = OpportunityService(self.price_monitor, self.market_data,
+                                                      settings.TRADING_PAIRS,
+                                                      max_age=settings.MAX_QUOTE_AGE_MS / 1000)
+        self.market_data.add_listener(publish_market_data)
+        self.opportunity_service.add_listener(publish_opportunities)
+        self._fee_task = None
+        self._clock_task = None
+
+    def start(self):
+        self.opportunity_service.start()
+        self.market_data.start()
+        self._fee_task = asyncio.create_task(
+            run_every(lambda: settings.FEE_REFRESH_INTERVAL, self.refresh_fees)
+        )
+        self._clock_task = asyncio.create_task(
+            run_every(lambda: settings.CLOCK_SYNC_INTERVAL, self.sync_clocks)
+        )
+
+    async def refresh_fees(self):
+        try:
+            await self.fee_schedule.refresh(self.exchange_manager, settings.TRADING_PAIRS)
+        except Exception as e:
+            logger.error("Error refreshing fees: %s", e)
+
+    async def sync_clocks(self):
+        from exchanges.clock import exchange_clock
+        try:
+            await exchange_clock.sync(self.exchange_manager)
+        except Exception as e:
+            logger.error("Error syncing exchange clocks: %s", e)
+
+    async def stop(self):
+        for task in (self._fee_task, self._clock_task):
+            if task:
+                task.cancel()
+        await self.market_data.stop()
+        await self.exchange_manager.close()
+
+def _open_database():
+    """Import the database layer and create tables and indexes"""
+    from database import db
+    db.init_db()
+    return db
+
+def _open_secrets():
+    from config.secrets import SecretsManager
+    return SecretsManager()
+
+services = Lazy(Services, "services")
+database = Lazy(_open_database, "database")
+secrets_manager = Lazy(_open_secrets, "secrets")
+runtime_config = RuntimeConfig()
+
+_balances = {"data": {}, "fetched_at": 0.0}
+balance_state = VersionedState("balances")
+_balances_lock = asyncio.Lock()
+_index_html = None
+
+async def cached_balances(max_age: float = None) -> dict:
+    """Balances from memory, refreshed at most once per `max_age` across all callers"""
+    if max_age is None:
+        max_age = settings.BALANCE_UPDATE_INTERVAL
+    if time.time() - _balances["fetched_at"] < max_age:
+        return _balances["data"]
+    inventory_manager = (await services.aget()).inventory_manager
+    async with _balances_lock:
+        # Another request may have refreshed while we waited for the lock
+        if time.time() - _balances["fetched_at"] >= max_age:
+            _balances["data"] = await inventory_manager.get_all_balances_async()
+            _balances["fetched_at"] = time.time()
+            balance_state.update(inventory_manager.compact_balances(_balances["data"]))
+    return _balances["data"]
+
+def publish_market_data(prices: dict):
+    """Push each market-data refresh to WebSocket clients"""
+    if not broadcaster.has_subscribers("prices"):
+        return
+    broadcaster.publish("prices", prices_to_dict(prices), meta={
+        "configured_exchanges": list(services.get().exchange_manager.exchanges.keys())
+    })
+
+def publish_opportunities(snapshot):
+    """Push each detection pass to WebSocket clients"""
+    if not broadcaster.has_subscribers("opportunities"):
+        return
+    opportunities = snapshot.filter(min_spread=settings.MIN_SPREAD_THRESHOLD, limit=50)
+    broadcaster.publish("opportunities", {
+        f"{o.symbol}|{o.buy_exchange}|{o.sell_exchange}": o.to_dict() for o in opportunities
+    }, meta={"version": snapshot.version, "generated_at": snapshot.generated_at})
+
+def apply_config(changes: dict):
+    """Apply live configuration changes to the running services"""
+    if "FUNCTION_TIMINGS" in changes:
+        function_timings.enabled = settings.FUNCTION_TIMINGS
+    if not services.ready:
+        # Services read the current settings when they are built
+        return
+    if "TRADING_PAIRS" in changes:
+        services.get().opportunity_service.set_symbols(settings.TRADING_PAIRS)
+    if "PRICE_UPDATE_INTERVAL" in changes:
+        services.get().market_data.interval = settings.PRICE_UPDATE_INTERVAL
+
+runtime_config.add_listener(apply_config)
+
+async def publish_updates():
+    """Fetch once on behalf of every WebSocket client and push what changed"""
+    last_balance_update = 0.0
+    while True:
+        try:
+            if broadcaster.has_subscribers("prices") or broadcaster.has_subscribers("opportunities"):
+                # Prices are pushed by the market-data refresher; keep its symbols alive
+                (await services.aget()).market_data.watch(broadcaster.watched_symbols() or DEFAULT_PAIRS)
+            
+            now = time.time()
+            if broadcaster.has_subscribers("balances") and now - last_balance_update >= settings.BALANCE_UPDATE_INTERVAL:
+                await cached_balances()
+                broadcaster.publish("balances", balance_state.snapshot()["data"])
+                last_balance_update = now
+            
+            if broadcaster.has_subscribers("trades"):
+                db = await database.aget()
+                page = await asyncio.to_thread(db.get_trades_page, 50)
+                broadcaster.publish("trades", {str(t.id): db.trade_to_dict(t) for t in page["trades"]})
+        except Exception as e:
+            logger.error("Error publishing updates: %s", e)
+        await asyncio.sleep(settings.PRICE_UPDATE_INTERVAL)
+
+async def warm_up():
+    """Build the database and exchange services in the background and start them"""
+    for component in (database, services):
+        try:
+            await component.aget()
+        except Exception as e:
+            # Left unbuilt; the first request that needs it retries and reports the error
+            logger.error("Warm-up of %s failed: %s", component.name, e)
+    if services.ready:
+        try:
+            services.get().start()
+        except Exception as e:
+            logger.error("Starting %s failed: %s", services.name, e)
+
+@app.on_event("startup")
+async def startup():
+    """Schedule the warm-up and the WebSocket publisher without waiting on either"""
+    runtime_config.start(asyncio.get_running_loop())
+    register_loop()
+    function_timings.enabled = settings.FUNCTION_TIMINGS
+    app.state.warm_up = asyncio.create_task(warm_up())
+    app.state.publisher = asyncio.create_task(publish_updates())
+
+@app.on_event("shutdown")
+async def shutdown():
+    for name in ("warm_up", "publisher"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    runtime_config.stop()
+    if services.ready:
+        await services.get().stop()
+
+def _read_index_html():
     frontend_dir = os.path.join(os.path.dirname(__file__), "..", "frontend")
     index_path = os.path.join(frontend_dir, "index.html")
     if os.path.exists(index_path):
         with open(index_path, "r") as f:
             return f.read()
-    return "<h1>Dashboard not found</h1>"
+    return None
+
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    """Serve dashboard"""
+    global _index_html
+    if _index_html is None:
+        _index_html = await asyncio.to_thread(_read_index_html)
+    return _index_html or "<h1>Dashboard not found</h1>"
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this process"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
 
 @app.get("/health")
-def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+async def health_check():
+    """Health check endpoint; answers before the services finish building
+    
+    `ready` turns true once the database and exchange clients are up;
+    `startup` has the seconds each component took to build.
+    """
+    return {
+        "status": "healthy",
+        "ready": database.ready and services.ready,
+        "startup": build_times()
+    }
 
 @app.post("/validate-credentials")
-def validate_credentials(credentials: dict):
+async def validate_credentials(credentials: dict):
     """Validate API credentials format before saving"""
     try:
         validation_results = {}
@@ -143,23 +356,26 @@ def validate_credentials(credentials: dict):
             "results": validation_results
         }
     except Exception as e:
-        logger.error(f"Error validating credentials: {str(e)}")
+        logger.error("Error validating credentials: %s", e)
         return {
             "status": "error",
             "message": f"Validation error: {str(e)}"
         }
 
+def _save_credentials(credentials: dict) -> int:
+    values = {key: value for key, value in credentials.items() if value and value.strip()}
+    if values:
+        # Encrypt and save in one write
+        secrets_manager.get().save_secrets(values)
+        for key in values:
+            logger.info("Credential saved: %s", key)
+    return len(values)
+
 @app.post("/save-credentials")
-def save_credentials(credentials: dict):
+async def save_credentials(credentials: dict):
     """Save and encrypt API credentials"""
     try:
-        saved_count = 0
-        for key, value in credentials.items():
-            if value and value.strip():
-                # Encrypt and save
-                secrets_manager.save_secret(key, value)
-                saved_count += 1
-                logger.info(f"Credential saved: {key}")
+        saved_count = await asyncio.to_thread(_save_credentials, credentials)
         
         return {
             "status": "success",
@@ -167,14 +383,18 @@ def save_credentials(credentials: dict):
             "count": saved_count
         }
     except Exception as e:
-        logger.error(f"Error saving credentials: {str(e)}")
+        logger.error("Error saving credentials: %s", e)
         return {
             "status": "error",
             "message": f"Error saving credentials: {str(e)}"
         }
 
+def _delete_exchange_credentials(exchange: str) -> list:
+    manager = secrets_manager.get()
+    return manager.delete_secrets(key for key in manager.load_secrets() if key.startswith(f"{exchange}_"))
+
 @app.post("/delete-credentials")
-def delete_credentials(data: dict):
+async def delete_credentials(data: dict):
     """Delete credentials for an exchange"""
     try:
         exchange = data.get("exchange", "").lower()
@@ -186,8 +406,7 @@ def delete_credentials(data: dict):
             }
         
         # Delete all credentials for this exchange
-        secrets = secrets_manager.load_secrets()
-        keys_to_delete = [key for key in secrets.keys() if key.startswith(f"{exchange}_")]
+        keys_to_delete = await asyncio.to_thread(_delete_exchange_credentials, exchange)
         
         if not keys_to_delete:
             return {
@@ -195,18 +414,7 @@ def delete_credentials(data: dict):
                 "message": f"No credentials found for {exchange}"
             }
         
-        # Remove keys and save
-        for key in keys_to_delete:
-            del secrets[key]
-        
-        # Save updated secrets
-        data_str = str(secrets).encode()
-        encrypted = secrets_manager.fernet.encrypt(data_str)
-        import os
-        with open(secrets_manager.secrets_path, "wb") as f:
-            f.write(encrypted)
-        
-        logger.info(f"Deleted {len(keys_to_delete)} credentials for {exchange}")
+        logger.info("Deleted %d credentials for %s", len(keys_to_delete), exchange)
         
         return {
             "status": "success",
@@ -214,17 +422,17 @@ def delete_credentials(data: dict):
             "deleted_count": len(keys_to_delete)
         }
     except Exception as e:
-        logger.error(f"Error deleting credentials: {str(e)}")
+        logger.error("Error deleting credentials: %s", e)
         return {
             "status": "error",
             "message": f"Error deleting credentials: {str(e)}"
         }
 
 @app.get("/check-credentials")
-def check_credentials():
+async def check_credentials():
     """Check which credentials are stored and return masked versions"""
     try:
-        secrets = secrets_manager.load_secrets()
+        secrets = await asyncio.to_thread((await secrets_manager.aget()).load_secrets)
         credential_status = {}
         
         # Map exchanges
@@ -280,7 +488,7 @@ def check_credentials():
             "credentials": credential_status
         }
     except Exception as e:
-        logger.error(f"Error checking credentials: {str(e)}")
+        logger.error("Error checking credentials: %s", e)
         return {
             "status": "error",
             "message": f"Error checking credentials: {str(e)}",
@@ -288,30 +496,35 @@ def check_credentials():
         }
 
 @app.get("/prices")
-def get_prices(pairs: str = "BTC/USDT,ETH/USDT"):
+async def get_prices(pairs: str = "BTC/USDT,ETH/USDT"):
     """Get current prices for trading pairs
     
+    Served from the market-data snapshot; `data_age` is the age in seconds
+    of the oldest symbol in the response.
+    
     Usage:
     - /prices?pairs=BTC/USDT,ETH/USDT
     - /prices (uses default BTC/USDT,ETH/USDT)
     """
     try:
         # Split the comma-separated pairs
-        symbol_list = [p.strip() for p in pairs.split(",")]
-        prices = price_monitor.fetch_prices(symbol_list)
+        symbol_list = [p.strip() for p in pairs.split(",") if p.strip()]
+        svc = await services.aget()
+        prices, data_age = await svc.market_data.get_prices(symbol_list)
         
         # Check which exchanges are configured
-        configured_exchanges = list(price_monitor.exchange_manager.exchanges.keys())
+        configured_exchanges = list(svc.exchange_manager.exchanges.keys())
         unconfigured = [ex for ex in ["binance", "kucoin", "mexc", "okx", "gateio", "bybit"] if ex not in configured_exchanges]
         
         return {
-            "prices": prices,
+            "prices": prices_to_dict(prices),
+            "data_age": data_age,
             "configured_exchanges": configured_exchanges,
             "unconfigured_exchanges": unconfigured,
             "message": f"Prices from {len(configured_exchanges)} configured exchanges" if configured_exchanges else "⚠️ No exchanges configured - add API credentials in Settings"
         }
     except Exception as e:
-        logger.error(f"Error fetching prices: {str(e)}")
+        logger.error("Error fetching prices: %s", e)
         return {
             "prices": {},
             "error": str(e),
@@ -319,24 +532,26 @@ def get_prices(pairs: str = "BTC/USDT,ETH/USDT"):
         }
 
 @app.get("/prices/{symbols}")
-def get_prices_legacy(symbols: str):
+async def get_prices_legacy(symbols: str):
     """Legacy path-based prices endpoint for backward compatibility"""
     try:
         # Handle URL-encoded commas (%2C)
         symbols = symbols.replace("%2C", ",").replace("%2F", "/")
-        symbol_list = [s.strip() for s in symbols.split(",")]
-        prices = price_monitor.fetch_prices(symbol_list)
+        symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
+        svc = await services.aget()
+        prices, data_age = await svc.market_data.get_prices(symbol_list)
         
         # Check which exchanges are configured
-        configured_exchanges = list(price_monitor.exchange_manager.exchanges.keys())
+        configured_exchanges = list(svc.exchange_manager.exchanges.keys())
         
         return {
-            "prices": prices,
+            "prices": prices_to_dict(prices),
+            "data_age": data_age,
             "configured_exchanges": configured_exchanges,
             "message": f"Prices from {len(configured_exchanges)} configured exchanges" if configured_exchanges else "⚠️ No exchanges configured"
         }
     except Exception as e:
-        logger.error(f"Error fetching prices: {str(e)}")
+        logger.error("Error fetching prices: %s", e)
         return {
             "prices": {},
             "error": str(e),
@@ -344,26 +559,243 @@ def get_prices_legacy(symbols: str):
         }
 
 @app.get("/opportunities")
-def get_opportunities():
-    """Get current arbitrage opportunities"""
-    prices = price_monitor.get_cached_prices([])
-    opportunities = price_monitor.detect_opportunities(prices)
-    return opportunities
+async def get_opportunities(symbol: str = None, venue: str = None,
+                            min_spread: float = None, limit: int = 50):
+    """Get current arbitrage opportunities from the continuous detection loop
+    
+    `data_age` is the age in seconds of the prices the snapshot was built from.
+    
+    Usage:
+    - /opportunities
+    - /opportunities?symbol=BTC/USDT&venue=binance&min_spread=0.5
+    """
+    snapshot = (await services.aget()).opportunity_service.snapshot
+    if min_spread is None:
+        min_spread = settings.MIN_SPREAD_THRESHOLD
+    now = time.time()
+    return {
+        "version": snapshot.version,
+        "generated_at": datetime.fromtimestamp(snapshot.generated_at).isoformat() if snapshot.generated_at else None,
+        "data_age": (snapshot.data_age + now - snapshot.generated_at) if snapshot.data_age is not None else None,
+        "opportunities": to_dicts(snapshot.filter(symbol=symbol, venue=venue, min_spread=min_spread, limit=limit))
+    }
+
+@app.get("/exchanges/health")
+async def get_exchange_health():
+    """Per-exchange latency percentiles, error rate and circuit-breaker state
+    
+    A venue in state `open` is skipped by scans and execution until a probe
+    after `retry_in` seconds succeeds.
+    """
+    from exchanges.health import exchange_health
+    return {"exchanges": exchange_health.snapshot()}
+
+@app.get("/exchanges/clock")
+async def get_exchange_clock():
+    """Estimated clock offset (venue minus local) and one-way latency per exchange
+    
+    Quote timestamps are shifted by the offset onto the local clock; quotes
+    older than `max_quote_age_ms` are not traded on.
+    """
+    from exchanges.clock import exchange_clock
+    return {"max_quote_age_ms": settings.MAX_QUOTE_AGE_MS, "exchanges": exchange_clock.snapshot()}
+
+@app.get("/fees")
+async def get_fees(symbol: str = None):
+    """Taker and maker fee rates per exchange, as used for spreads
+    
+    Usage:
+    - /fees (venue rates)
+    - /fees?symbol=BTC/USDT (rates for one market, including overrides)
+    """
+    fee_schedule = (await services.aget()).fee_schedule
+    return {
+        "default": fee_schedule.default,
+        "fees": {
+            name: {
+                "taker": fee_schedule.taker(name, symbol),
+                "maker": fee_schedule.maker(name, symbol),
+                "updated_at": datetime.fromtimestamp(fee_schedule.updated_at[name]).isoformat()
+                if name in fee_schedule.updated_at else None
+            }
+            for name in fee_schedule.exchanges
+        }
+    }
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag_matches(request.headers.get("if-none-match"), etag)
 
 @app.get("/balances")
-def get_balances():
-    """Get balances across all exchanges"""
-    balances = inventory_manager.get_all_balances()
-    return balances
+async def get_balances(request: Request, since: int = None):
+    """Get non-zero balances across all exchanges, keyed by exchange
+    
+    Usage:
+    - /balances (send If-None-Match with the last ETag to get 304 when unchanged)
+    - /balances?since=<version> (only exchanges whose balances changed, plus removed ones)
+    """
+    await cached_balances()
+    if _not_modified(request, balance_state.etag):
+        return Response(status_code=304, headers={"ETag": balance_state.etag})
+    return JSONResponse(balance_state.delta(since), headers={"ETag": balance_state.etag})
+
+@app.get("/balances/history")
+async def get_balances_history(exchange: str, asset: str, hours: float = 24, resolution: str = "auto"):
+    """Get balance history for one exchange/asset
+    
+    Resolution is picked from the range unless given: raw up to a day,
+    hourly up to 30 days, daily beyond that.
+    """
+    if resolution not in ("auto", "raw", "hour", "day"):
+        return {"error": "resolution must be one of auto, raw, hour, day"}
+    await database.aget()
+    from database.retention import get_balance_history
+    start = datetime.utcnow() - timedelta(hours=hours)
+    return await asyncio.to_thread(get_balance_history, exchange, asset.upper(), start, resolution=resolution)
 
 @app.get("/trades")
-def get_trades(limit: int = 20):
-    """Get trade history"""
-    trades = trade_executor.get_trade_history(limit)
-    return trades
+async def get_recent_trades(request: Request, limit: int = 20, since: int = None):
+    """Get recent trades, newest first, as a list
+    
+    The version is the newest trade id sent, in the X-Version header (and the
+    ETag). With since=<version> only trades added after it are returned, at
+    most `limit` of the oldest; X-Has-More: true means more are waiting, so
+    poll again with the new version to get them.
+    """
+    db = await database.aget()
+    version = await asyncio.to_thread(db.get_latest_trade_id)
+    etag = f'W/"trades-{version}"'
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    limit = min(limit, 500)
+    headers = {}
+    if since is not None and since <= version:
+        trades = await asyncio.to_thread(db.get_trades_since, since, limit)
+        has_more = bool(trades) and trades[-1].id < version
+        if has_more:
+            # Only advance the client to what it has actually been sent
+            version = trades[-1].id
+            etag = f'W/"trades-{version}"'
+        headers["X-Has-More"] = "true" if has_more else "false"
+        trades.reverse()
+    else:
+        trades = await asyncio.to_thread(db.get_trades, limit)
+    headers.update({"ETag": etag, "X-Version": str(version)})
+    return JSONResponse([db.trade_to_dict(t) for t in trades], headers=headers)
+
+@app.get("/trades/history")
+async def get_trade_history(limit: int = 50, cursor: str = None, symbol: str = None, exchange: str = None):
+    """Get persisted trade history, newest first
+    
+    Usage:
+    - /trades/history?limit=50
+    - /trades/history?cursor=<next_cursor from previous page>
+    - /trades/history?symbol=BTC/USDT&exchange=binance
+    """
+    db = await database.aget()
+    try:
+        page = await asyncio.to_thread(db.get_trades_page, min(limit, 500), cursor=cursor,
+                                       symbol=symbol, exchange=exchange)
+    except ValueError:
+        return {"trades": [], "next_cursor": None, "error": "Invalid cursor"}
+    return {
+        "trades": [db.trade_to_dict(t) for t in page["trades"]],
+        "next_cursor": page["next_cursor"]
+    }
+
+@app.get("/stats/daily")
+async def get_daily_statistics(date: str = None):
+    """Get precomputed statistics for a day (YYYY-MM-DD UTC, default today)"""
+    date = date or datetime.utcnow().date().isoformat()
+    db = await database.aget()
+    stats = await asyncio.to_thread(db.get_daily_stats, date)
+    if not stats:
+        return {"date": date, "total_trades": 0, "winning_trades": 0,
+                "losing_trades": 0, "total_pnl": 0.0, "venues": {}, "updated_at": None}
+    return db.daily_stats_to_dict(stats)
+
+def require_admin(x_admin_token: str = Header(None)):
+    """Admin routes only exist when ADMIN_TOKEN is set and sent as X-Admin-Token"""
+    if not token_matches(settings.ADMIN_TOKEN, x_admin_token):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.get("/config")
+async def get_config():
+    """Current values of the live-reloadable settings"""
+    return runtime_config.current()
+
+@app.post("/config", dependencies=[Depends(require_admin)])
+async def update_config(updates: dict):
+    """Change trading settings live, e.g. {"TRADING_PAIRS": ["BTC/USDT", "SOL/USDT"]}
+    
+    Needs ADMIN_TOKEN, like the /admin routes. Changes are persisted to
+    RUNTIME_CONFIG_FILE so the bot process applies them too. Exchange
+    connections and caches are kept.
+    """
+    try:
+        changes = await asyncio.to_thread(runtime_config.update, updates)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    return {
+        "status": "success",
+        "changed": {name: new for name, (_, new) in changes.items()},
+        "config": runtime_config.current()
+    }
+
+@app.get("/admin/profiler", dependencies=[Depends(require_admin)])
+async def get_profiler():
+    """State of the sampling profiler"""
+    return profiler.status()
+
+def _check_profile_seconds(seconds: float):
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=422,
+                            detail=f"seconds must be greater than 0 and at most {MAX_PROFILE_SECONDS:g}")
+
+@app.post("/admin/profiler/start", dependencies=[Depends(require_admin)])
+async def start_profiler(seconds: float = 30.0, interval_ms: float = 5.0):
+    """Start sampling every thread's stack; stops by itself after `seconds` (max 300)"""
+    _check_profile_seconds(seconds)
+    try:
+        profiler.start(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.status()
+
+@app.post("/admin/profiler/stop", dependencies=[Depends(require_admin)])
+async def stop_profiler():
+    """Stop sampling and return the stacks in collapsed (flamegraph) format"""
+    return PlainTextResponse(await asyncio.to_thread(profiler.stop))
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def profile(seconds: float = 10.0, interval_ms: float = 5.0):
+    """Sample for `seconds` and return the stacks in collapsed format
+    
+    e.g. curl -H "X-Admin-Token: ..." ':8000/admin/profile?seconds=30' | flamegraph.pl > api.svg
+    """
+    _check_profile_seconds(seconds)
+    try:
+        profiler.start(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        collapsed = await asyncio.to_thread(profiler.stop)
+    return PlainTextResponse(collapsed)
+
+@app.get("/admin/timings", dependencies=[Depends(require_admin)])
+async def get_timings():
+    """Calls and time spent per timed hot function since timings were first enabled"""
+    return {"enabled": function_timings.enabled, "functions": function_timings.snapshot()}
+
+@app.post("/admin/timings", dependencies=[Depends(require_admin)])
+async def set_timings(enabled: bool = True):
+    """Switch the per-function timers in this process (POST /config FUNCTION_TIMINGS reaches the bot too)"""
+    function_timings.enabled = enabled
+    return {"enabled": function_timings.enabled}
 
 @app.get("/status")
-def get_bot_status():
+async def get_bot_status():
     """Get bot status"""
     return {"message": "Bot is running"}
 
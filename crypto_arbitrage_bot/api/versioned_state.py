@@ -0,0 +1,95 @@
+"""
+Versioned keyed state for conditional and delta API responses.
+
+Every update that changes something bumps the version. Clients can revalidate
+with the ETag (If-None-Match) or ask for only what changed with `since`.
+Versions start at the process start time in milliseconds, so a version held
+from before a restart is older than anything this process can diff against
+and gets a full snapshot instead of a wrong delta.
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+_MISSING = object()
+
+
+def _opaque_tag(tag: str) -> str:
+    """An entity tag without its weak marker, for weak comparison"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches `etag`
+
+    The header is a comma-separated list of entity tags or `*`; tags are
+    compared weakly (ignoring `W/`), as RFC 9110 requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == wanted for tag in if_none_match.split(","))
+
+
+class VersionedState:
+    """Keyed state that remembers which version last touched each key"""
+
+    def __init__(self, name: str, max_tombstones: int = 1000):
+        self.name = name
+        self.max_tombstones = max_tombstones
+        self.version = int(time.time() * 1000)
+        # Deltas can only be computed from this version onwards
+        self._base = self.version
+        self._entries: Dict[str, Any] = {}
+        self._changed_at: Dict[str, int] = {}
+        self._removed_at: Dict[str, int] = {}
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.name}-{self.version}"'
+
+    def update(self, state: Dict[str, Any], replace: bool = True) -> bool:
+        """Apply new state; returns True if anything changed
+
+        With replace=False the entries are merged and nothing is removed.
+        """
+        changed = [k for k, v in state.items() if self._entries.get(k, _MISSING) != v]
+        removed = [k for k in self._entries if k not in state] if replace else []
+        if not changed and not removed:
+            return False
+
+        self.version += 1
+        for key in changed:
+            self._entries[key] = state[key]
+            self._changed_at[key] = self.version
+            self._removed_at.pop(key, None)
+        for key in removed:
+            del self._entries[key]
+            del self._changed_at[key]
+            self._removed_at[key] = self.version
+        self._prune_tombstones()
+        return True
+
+    def _prune_tombstones(self):
+        if len(self._removed_at) <= self.max_tombstones:
+            return
+        # Forget the oldest removals; clients older than that get a full snapshot
+        ordered = sorted(self._removed_at.items(), key=lambda item: item[1])
+        drop = len(ordered) - self.max_tombstones
+        for key, version in ordered[:drop]:
+            del self._removed_at[key]
+            self._base = max(self._base, version)
+
+    def snapshot(self) -> Dict:
+        return {"version": self.version, "full": True, "data": dict(self._entries), "removed": []}
+
+    def delta(self, since: Optional[int]) -> Dict:
+        """Entries changed after `since`, or a full snapshot if it can't be diffed"""
+        if since is None or since < self._base or since > self.version:
+            return self.snapshot()
+        data = {k: self._entries[k] for k, v in self._changed_at.items() if v > since}
+        removed: List[str] = [k for k, v in self._removed_at.items() if v > since]
+        return {"version": self.version, "full": False, "data": data, "removed": removed}
+
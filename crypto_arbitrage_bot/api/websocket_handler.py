@@ -1 +1,212 @@
-# WebSocket handler for API
+"""
+WebSocket push channel for dashboard updates.
+
+A single in-process `Broadcaster` keeps the latest state for each topic and
+fans out deltas to every connected client, so any number of dashboard tabs
+share one set of upstream exchange requests.
+
+Client protocol (JSON messages):
+
+    -> {"action": "subscribe", "topics": ["prices", "opportunities"], "symbols": ["BTC/USDT"]}
+    -> {"action": "unsubscribe", "topics": ["balances"]}
+    <- {"type": "snapshot", "topic": "prices", "version": 12, "data": {...}, "meta": {...}}
+    <- {"type": "delta", "topic": "prices", "version": 13, "data": {...}, "removed": [...]}
+
+"symbols" filters the symbol-keyed topics (prices and opportunities) among
+the topics in that message; other topics are never filtered. Omitting it
+leaves those topics' filters as they were, and an empty list subscribes them
+to every symbol.
+"""
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from utils.logger import logger
+
+TOPICS = ("prices", "opportunities", "balances", "trades")
+# Topics whose entries belong to one symbol and can be filtered by it
+SYMBOL_TOPICS = ("prices", "opportunities")
+
+
+def _symbol_of(topic: str, key: str, value) -> Optional[str]:
+    """Symbol a topic entry belongs to, or None if it has none"""
+    if topic == "prices":
+        return key
+    if isinstance(value, dict):
+        return value.get("symbol")
+    return None
+
+
+class Subscriber:
+    """One connected client with a bounded outgoing queue"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.topics: Set[str] = set()
+        # Symbol filter per symbol-keyed topic; a missing or empty set passes everything
+        self.symbols: Dict[str, Set[str]] = {}
+        self.dropped = 0
+
+    def wants(self, topic: str, key: str, value) -> bool:
+        symbols = self.symbols.get(topic)
+        if not symbols:
+            return True
+        symbol = _symbol_of(topic, key, value)
+        return symbol is None or symbol in symbols
+
+
+class Broadcaster:
+    """Keeps the latest state per topic and pushes deltas to subscribers"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscriber] = set()
+        self._state: Dict[str, Dict] = {topic: {} for topic in TOPICS}
+        self._meta: Dict[str, Dict] = {topic: {} for topic in TOPICS}
+        self._versions: Dict[str, int] = {topic: 0 for topic in TOPICS}
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def connect(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def subscribe(self, subscriber: Subscriber, topics: Iterable[str],
+                  symbols: Optional[Iterable[str]] = None):
+        """Add topics (replacing their symbol filters) and queue fresh snapshots"""
+        wanted = {s for s in symbols if s} if symbols is not None else None
+        for topic in topics:
+            if topic not in TOPICS:
+                continue
+            subscriber.topics.add(topic)
+            if wanted is not None and topic in SYMBOL_TOPICS:
+                subscriber.symbols[topic] = wanted
+            self._enqueue(subscriber, self.snapshot_message(topic, subscriber))
+
+    def unsubscribe(self, subscriber: Subscriber, topics: Iterable[str]):
+        for topic in topics:
+            subscriber.topics.discard(topic)
+            subscriber.symbols.pop(topic, None)
+
+    def has_subscribers(self, topic: Optional[str] = None) -> bool:
+        if topic is None:
+            return bool(self.subscribers)
+        return any(topic in s.topics for s in self.subscribers)
+
+    def watched_symbols(self) -> Set[str]:
+        """Symbols any price subscriber has asked for"""
+        symbols: Set[str] = set()
+        for subscriber in self.subscribers:
+            for topic in SYMBOL_TOPICS:
+                if topic in subscriber.topics:
+                    symbols |= subscriber.symbols.get(topic, set())
+        return symbols
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def snapshot_message(self, topic: str, subscriber: Optional[Subscriber] = None) -> Dict:
+        state = self._state[topic]
+        if subscriber is not None:
+            state = {k: v for k, v in state.items() if subscriber.wants(topic, k, v)}
+        return {
+            "type": "snapshot",
+            "topic": topic,
+            "version": self._versions[topic],
+            "data": state,
+            "meta": self._meta[topic]
+        }
+
+    def publish(self, topic: str, state: Dict, meta: Optional[Dict] = None, replace: bool = True):
+        """Publish the new state of a topic; only changed entries are sent
+
+        With replace=False the entries are merged into the current state
+        instead of replacing it, so nothing is reported as removed.
+        """
+        current = self._state[topic]
+        changed = {k: v for k, v in state.items() if current.get(k) != v}
+        removed: List[str] = [k for k in current if k not in state] if replace else []
+        meta_changed = meta is not None and meta != self._meta[topic]
+        if not changed and not removed and not meta_changed:
+            return
+
+        if replace:
+            self._state[topic] = dict(state)
+        else:
+            current.update(changed)
+        if meta is not None:
+            self._meta[topic] = meta
+        self._versions[topic] += 1
+
+        for subscriber in list(self.subscribers):
+            if topic not in subscriber.topics:
+                continue
+            data = {k: v for k, v in changed.items() if subscriber.wants(topic, k, v)}
+            gone = [k for k in removed if subscriber.wants(topic, k, current.get(k))]
+            if not data and not gone and not meta_changed:
+                continue
+            message = {
+                "type": "delta",
+                "topic": topic,
+                "version": self._versions[topic],
+                "data": data,
+                "removed": gone
+            }
+            if meta_changed:
+                message["meta"] = meta
+            self._enqueue(subscriber, message)
+
+    def _enqueue(self, subscriber: Subscriber, message: Dict):
+        try:
+            subscriber.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A slow consumer has missed deltas; drop its backlog and resync
+            # it with one snapshot per topic instead of growing without bound.
+            subscriber.dropped += subscriber.queue.qsize()
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            for topic in subscriber.topics:
+                subscriber.queue.put_nowait(self.snapshot_message(topic, subscriber))
+            logger.warning("WebSocket client fell behind; resynced (dropped %d messages)", subscriber.dropped)
+
+
+broadcaster = Broadcaster()
+router = APIRouter()
+
+
+async def _writer(websocket: WebSocket, subscriber: Subscriber):
+    while True:
+        message = await subscriber.queue.get()
+        await websocket.send_json(message)
+
+
+@router.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """Push channel for prices, opportunities, balances and trades"""
+    await websocket.accept()
+    subscriber = broadcaster.connect()
+    writer = asyncio.create_task(_writer(websocket, subscriber))
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action")
+            topics = message.get("topics") or list(TOPICS)
+            if action == "subscribe":
+                broadcaster.subscribe(subscriber, topics, message.get("symbols"))
+            elif action == "unsubscribe":
+                broadcaster.unsubscribe(subscriber, topics)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("WebSocket error: %s", e)
+    finally:
+        writer.cancel()
+        broadcaster.disconnect(subscriber)
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the detection, execution and API hot paths.
+
+Run `python -m benchmarks.run` from the bot directory; see benchmarks/run.py.
+"""
@@ -0,0 +1,125 @@
+"""
+Timing, baseline storage and regression checks for the benchmark suite.
+
+Each benchmark reports the median seconds per operation over several
+batches; a batch runs the operation enough times to take at least
+`min_time` seconds, so fast and slow operations are both measured stably.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+def _calibrate(run_batch: Callable[[int], float], min_time: float) -> int:
+    number = 1
+    while run_batch(number) < min_time and number < 1_000_000:
+        number *= 2
+    return number
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, repeats: int = 5) -> float:
+    """Median seconds per call of `fn()`"""
+    def run_batch(number: int) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - started
+
+    number = _calibrate(run_batch, min_time)
+    return statistics.median(run_batch(number) / number for _ in range(repeats))
+
+
+async def measure_async(fn: Callable[[], Awaitable[object]], min_time: float = 0.2,
+                        repeats: int = 5) -> float:
+    """Median seconds per call of `await fn()`, on the running event loop"""
+    async def run_batch(number: int) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        return time.perf_counter() - started
+
+    number = 1
+    while await run_batch(number) < min_time and number < 1_000_000:
+        number *= 2
+    timings = [await run_batch(number) / number for _ in range(repeats)]
+    return statistics.median(timings)
+
+
+def result(seconds: float, **params) -> Dict:
+    return {"seconds": seconds, "ops_per_sec": 1.0 / seconds if seconds > 0 else None, "params": params}
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(path: str, results: Dict[str, Dict]):
+    """Write results (merged into an existing file, so partial runs update it)"""
+    existing = load_baseline(path) or {}
+    merged = dict(existing.get("results", {}))
+    merged.update(results)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": dict(sorted(merged.items()))}, f, indent=2)
+        f.write("\n")
+
+
+def compare(results: Dict[str, Dict], baseline: Optional[Dict], tolerance: float) -> List[Dict]:
+    """One row per benchmark; `status` is regression, improvement, ok or new
+
+    A benchmark regresses when it takes more than (1 + tolerance) times
+    its baseline time per operation.
+    """
+    previous = (baseline or {}).get("results", {})
+    rows = []
+    for name, current in results.items():
+        before = previous.get(name)
+        row = {"name": name, "seconds": current["seconds"], "baseline": None, "change": None, "status": "new"}
+        if before and before.get("seconds"):
+            ratio = current["seconds"] / before["seconds"]
+            row.update(baseline=before["seconds"], change=ratio - 1)
+            if ratio > 1 + tolerance:
+                row["status"] = "regression"
+            elif ratio < 1 / (1 + tolerance):
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def _format_time(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def print_report(rows: List[Dict], out=sys.stdout):
+    width = max((len(row["name"]) for row in rows), default=10)
+    print(f"{'benchmark':<{width}}  {'time/op':>10}  {'baseline':>10}  {'change':>8}  status", file=out)
+    for row in rows:
+        change = f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "-"
+        flag = "REGRESSION" if row["status"] == "regression" else row["status"]
+        print(f"{row['name']:<{width}}  {_format_time(row['seconds']):>10}  "
+              f"{_format_time(row['baseline']):>10}  {change:>8}  {flag}", file=out)
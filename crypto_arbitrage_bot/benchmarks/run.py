@@ -0,0 +1,285 @@
+"""
+Benchmark suite for the detection, execution and API hot paths.
+
+Synthetic scenarios scale symbols (10 -> 1000) and exchanges (2 -> 12).
+Exchanges are simulated venues with injected latency, and the database and
+logs live in a scratch directory, so nothing touches the network or the
+bot's own data. Results are compared with a baseline file, and any
+benchmark slower than the baseline by more than the tolerance is flagged
+as a regression (exit status 1).
+
+Usage:
+    python -m benchmarks.run                  # run and compare with benchmarks/baseline.json, if recorded
+    python -m benchmarks.run --quick          # smaller scales, shorter timings
+    python -m benchmarks.run --save           # record these results as the baseline
+    python -m benchmarks.run --filter detect --tolerance 0.5 --json results.json
+
+Baselines are machine-specific, so benchmarks/baseline.json is not checked
+in: record one with --save on the machine you compare on.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from benchmarks.harness import compare, load_baseline, measure, measure_async, print_report, result, save_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+FULL = {"symbols": (10, 100, 1000), "exchanges": (2, 6, 12), "min_time": 0.2}
+QUICK = {"symbols": (10, 100), "exchanges": (2, 6), "min_time": 0.05}
+
+# Injected request latency for the mocked exchanges
+LATENCY = 0.005
+
+# Project modules are imported inside the suites: the runner first moves to a
+# scratch directory so the logger, database and secrets files are created there.
+# Suites get the scale and a predicate on benchmark names, and skip (and don't
+# set up for) benchmarks the --filter excludes.
+SUITES: List[Callable[[Dict, Callable[[str], bool]], Iterator[Tuple[str, Dict]]]] = []
+
+
+def suite(fn):
+    SUITES.append(fn)
+    return fn
+
+
+@suite
+def detection(scale: Dict, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, Dict]]:
+    from benchmarks.scenarios import exchange_names, make_quotes, symbol_names
+    from core.backtester import ReplayExchangeManager
+    from core.price_monitor import PriceMonitor
+
+    for symbols in scale["symbols"]:
+        for exchanges in scale["exchanges"]:
+            name = f"detect_opportunities[symbols={symbols},exchanges={exchanges}]"
+            if not wanted(name):
+                continue
+            names = exchange_names(exchanges)
+            prices = make_quotes(symbol_names(symbols), names)
+            monitor = PriceMonitor(exchange_manager=ReplayExchangeManager(names))
+            seconds = measure(lambda: monitor.detect_opportunities(prices, min_spread=0.3),
+                              min_time=scale["min_time"])
+            yield name, result(seconds, symbols=symbols, exchanges=exchanges)
+
+
+@suite
+def engine(scale: Dict, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, Dict]]:
+    from benchmarks.scenarios import make_opportunities
+    from core.arbitrage_engine import ArbitrageEngine
+
+    arbitrage_engine = ArbitrageEngine(min_spread=0.3)
+    if wanted("calculate_profit"):
+        seconds = measure(lambda: arbitrage_engine.calculate_profit(100.0, 100.5, 0.01),
+                          min_time=scale["min_time"])
+        yield "calculate_profit", result(seconds)
+
+    for count in (10, 1000):
+        name = f"rank_opportunities[opportunities={count}]"
+        if not wanted(name):
+            continue
+        opportunities = make_opportunities(count)
+        seconds = measure(lambda: arbitrage_engine.rank_opportunities(opportunities),
+                          min_time=scale["min_time"])
+        yield name, result(seconds, opportunities=count)
+
+
+@suite
+def fetch_cycle(scale: Dict, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, Dict]]:
+    from benchmarks.scenarios import (BenchAsyncExchangeManager, BenchExchangeManager, exchange_names,
+                                      make_prices, symbol_names)
+    from core.price_monitor import PriceMonitor
+
+    latency_ms = LATENCY * 1000
+    for symbols in scale["symbols"]:
+        for exchanges in scale["exchanges"]:
+            name = f"fetch_prices_async[symbols={symbols},exchanges={exchanges},latency_ms={latency_ms:g}]"
+            if not wanted(name):
+                continue
+            names = exchange_names(exchanges)
+            symbol_list = symbol_names(symbols)
+            prices = make_prices(symbol_list, names)
+            monitor = PriceMonitor(exchange_manager=BenchAsyncExchangeManager(prices, names, LATENCY))
+            seconds = asyncio.run(measure_async(lambda: monitor.fetch_prices_async(symbol_list),
+                                                min_time=scale["min_time"], repeats=3))
+            yield name, result(seconds, symbols=symbols, exchanges=exchanges, latency_ms=latency_ms)
+
+    # The sync path waits out every request in turn, so only small scales
+    symbols = 10
+    for exchanges in scale["exchanges"][:2]:
+        name = f"fetch_prices_sync[symbols={symbols},exchanges={exchanges},latency_ms={latency_ms:g}]"
+        if not wanted(name):
+            continue
+        names = exchange_names(exchanges)
+        symbol_list = symbol_names(symbols)
+        prices = make_prices(symbol_list, names)
+        monitor = PriceMonitor(exchange_manager=BenchExchangeManager(prices, names, LATENCY))
+        seconds = measure(lambda: monitor.fetch_prices(symbol_list), min_time=scale["min_time"], repeats=3)
+        yield name, result(seconds, symbols=symbols, exchanges=exchanges, latency_ms=latency_ms)
+
+
+@suite
+def execution(scale: Dict, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, Dict]]:
+    from benchmarks.scenarios import BenchExchangeManager, exchange_names, make_prices, symbol_names
+    from core.trade_executor import TradeExecutor
+
+    names = exchange_names(2)
+    symbol = symbol_names(1)[0]
+    prices = make_prices([symbol], names)
+    for latency in (0.0, LATENCY):
+        name = f"execute_arbitrage_trade[latency_ms={latency * 1000:g}]"
+        if not wanted(name):
+            continue
+        executor = TradeExecutor(exchange_manager=BenchExchangeManager(prices, names, latency))
+
+        def trade():
+            record = executor.execute_arbitrage_trade(names[0], names[1], symbol, 0.01)
+            executor.trade_history.clear()
+            return record
+
+        assert trade().status == "completed"
+        seconds = measure(trade, min_time=scale["min_time"], repeats=3)
+        yield name, result(seconds, latency_ms=latency * 1000)
+
+
+@suite
+def database(scale: Dict, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, Dict]]:
+    import itertools
+    if not (wanted("db.save_trade") or wanted("db.save_balances[rows=60]")):
+        return
+    from database import db
+
+    db.init_db()
+    ids = itertools.count()
+    trade = {"timestamp": "2025-01-01T00:00:00", "symbol": "BTC/USDT", "quantity": 0.01,
+             "buy_exchange": "venue00", "sell_exchange": "venue01", "buy_price": 100.0,
+             "sell_price": 100.5, "pnl": 0.004, "status": "completed"}
+    if wanted("db.save_trade"):
+        seconds = measure(lambda: db.save_trade({**trade, "trade_id": f"bench-{next(ids)}"}),
+                          min_time=scale["min_time"])
+        yield "db.save_trade", result(seconds)
+
+    if wanted("db.save_balances[rows=60]"):
+        rows = [{"exchange": f"venue{i % 6:02d}", "asset": f"A{i}", "available": 1.0, "locked": 0.0,
+                 "total": 1.0} for i in range(60)]
+        seconds = measure(lambda: db.save_balances(rows), min_time=scale["min_time"])
+        yield "db.save_balances[rows=60]", result(seconds, rows=60)
+
+
+async def asgi_get(app, target: str, headers: Tuple = ()) -> int:
+    """Call an ASGI app in-process with a GET request and return the status"""
+    path, _, query = target.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+        "headers": [(b"host", b"localhost"), (b"accept-encoding", b"gzip")] +
+                   [(k.encode(), v.encode()) for k, v in headers],
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+@suite
+def api(scale: Dict, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, Dict]]:
+    requests = [
+        ("/health", ()),
+        ("/opportunities", ()),
+        ("/prices?pairs=BTC/USDT,ETH/USDT", ()),
+        ("/balances", "etag"),
+        ("/trades?limit=20", ()),
+    ]
+    requests = [(target, headers) for target, headers in requests
+                if wanted(f"api GET {target.split('?')[0]}" + (" (304)" if headers == "etag" else ""))]
+    if not requests:
+        return
+    from config.config import settings
+
+    # The API's services run on simulated venues without latency
+    settings.PAPER_TRADING = True
+    settings.SIM_LATENCY_MS = 0
+    from api import app as api_module
+
+    async def run() -> List[Tuple[str, Dict]]:
+        await api_module.database.aget()
+        await api_module.services.aget()
+        balances = await asgi_get(api_module.app, "/balances")
+        etag = api_module.balance_state.etag
+        measured = []
+        for target, headers in requests:
+            if headers == "etag":
+                headers = (("if-none-match", etag),)
+            status = await asgi_get(api_module.app, target, headers)
+            if status not in (200, 304) or balances != 200:
+                raise RuntimeError(f"GET {target} returned {status}")
+            seconds = await measure_async(lambda: asgi_get(api_module.app, target, headers),
+                                          min_time=scale["min_time"])
+            name = target.split("?")[0] + (" (304)" if status == 304 else "")
+            measured.append((f"api GET {name}", result(seconds, status=status)))
+        await api_module.services.get().stop()
+        return measured
+
+    yield from asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare with a baseline")
+    parser.add_argument("--quick", action="store_true", help="Smaller scales and shorter timings")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before flagging a regression (0.25 = 25%%)")
+    parser.add_argument("--save", action="store_true", help="Write the results into the baseline file")
+    parser.add_argument("--json", metavar="PATH", help="Also write this run's results to PATH")
+    args = parser.parse_args()
+
+    scale = QUICK if args.quick else FULL
+    baseline_path = os.path.abspath(args.baseline)
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    original_cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix="arbitrage-bench-")
+    os.chdir(scratch)
+    try:
+        results = {}
+        for run_suite in SUITES:
+            for name, measured in run_suite(scale, lambda name: args.filter in name):
+                results[name] = measured
+                print(f"  {name}: {measured['seconds'] * 1e6:.1f} µs/op", file=sys.stderr)
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    rows = compare(results, load_baseline(baseline_path), args.tolerance)
+    print_report(rows)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({"results": results, "comparison": rows}, f, indent=2)
+    if args.save:
+        save_results(baseline_path, results)
+        print(f"Saved {len(results)} results to {baseline_path}")
+        return
+    if any(row["status"] == "regression" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
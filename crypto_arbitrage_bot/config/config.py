@@ -3,6 +3,7 @@ Configuration loader and manager for the arbitrage bot.
 Handles loading settings from environment variables and config files.
 """
 import os
+from sys import intern
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,14 +11,69 @@ load_dotenv()
 class Settings:
     """Application settings"""
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
-    EXCHANGES = ["binance", "kucoin", "mexc", "okx", "gateio", "bybit"]
+    # Paper trading replaces every venue with a simulated one (exchanges/simulated.py);
+    # SIMULATED_EXCHANGES adds simulated venues alongside the real ones
+    PAPER_TRADING = os.getenv("PAPER_TRADING", "False").lower() == "true"
+    # Venue and pair names are interned, so every record shares one string per name (core/models.py)
+    SIMULATED_EXCHANGES = [intern(e.strip()) for e in os.getenv("SIMULATED_EXCHANGES", "").split(",") if e.strip()]
+    EXCHANGES = list(dict.fromkeys(["binance", "kucoin", "mexc", "okx", "gateio", "bybit"] + SIMULATED_EXCHANGES))
+    SIM_FEED = os.getenv("SIM_FEED", "synthetic").lower()
+    SIM_REPLAY_START = os.getenv("SIM_REPLAY_START", "")
+    SIM_REPLAY_END = os.getenv("SIM_REPLAY_END", "")
+    SIM_REPLAY_SPEED = float(os.getenv("SIM_REPLAY_SPEED", "1.0"))
+    SIM_SEED = int(os.getenv("SIM_SEED", "42"))
+    SIM_DISLOCATION = float(os.getenv("SIM_DISLOCATION", "0.002"))
+    SIM_BALANCES = os.getenv("SIM_BALANCES", "USDT=10000,BTC=0.1,ETH=2")
+    SIM_FEE = float(os.getenv("SIM_FEE", "0.001"))
+    SIM_MAKER_FEE = float(os.getenv("SIM_MAKER_FEE", os.getenv("SIM_FEE", "0.001")))
+    SIM_LATENCY_MS = float(os.getenv("SIM_LATENCY_MS", "50"))
+    SIM_FAILURE_RATE = float(os.getenv("SIM_FAILURE_RATE", "0"))
+    SIM_PARTIAL_FILL_RATE = float(os.getenv("SIM_PARTIAL_FILL_RATE", "0"))
+    SIM_CLOCK_SKEW_MS = float(os.getenv("SIM_CLOCK_SKEW_MS", "0"))
+    TRADING_PAIRS = [intern(p.strip()) for p in os.getenv("TRADING_PAIRS", "BTC/USDT,ETH/USDT").split(",") if p.strip()]
     MIN_SPREAD_THRESHOLD = float(os.getenv("MIN_SPREAD_THRESHOLD", "0.3"))
+    # Taker rate for venues whose fees haven't been fetched; overrides are
+    # EXCHANGE[:SYMBOL]=TAKER[/MAKER], comma separated (see core/fee_schedule.py)
+    DEFAULT_FEE = float(os.getenv("DEFAULT_FEE", "0.001"))
+    FEE_OVERRIDES = os.getenv("FEE_OVERRIDES", "")
+    FEE_REFRESH_INTERVAL = int(os.getenv("FEE_REFRESH_INTERVAL", "3600"))
     MAX_POSITION_SIZE = float(os.getenv("MAX_POSITION_SIZE", "1.0"))
+    # "taker" sends market orders on both legs; "maker_taker" rests the cheaper-fee leg
+    # as a post-only limit order, reprices it as the hedge venue moves and hedges its
+    # fills with a market order (core/maker_taker.py)
+    EXECUTION_MODE = os.getenv("EXECUTION_MODE", "taker").lower()
+    MAKER_REQUOTE_INTERVAL_MS = float(os.getenv("MAKER_REQUOTE_INTERVAL_MS", "100"))
+    MAKER_REQUOTE_BPS = float(os.getenv("MAKER_REQUOTE_BPS", "1.0"))
+    MAKER_TIMEOUT = float(os.getenv("MAKER_TIMEOUT", "20"))
     MAX_CONCURRENT_TRADES = int(os.getenv("MAX_CONCURRENT_TRADES", "3"))
     RE_ENTRY_DELAY = int(os.getenv("RE_ENTRY_DELAY", "5"))
     DAILY_LOSS_LIMIT = float(os.getenv("DAILY_LOSS_LIMIT", "-100.0"))
     MAX_TOTAL_EXPOSURE = float(os.getenv("MAX_TOTAL_EXPOSURE", "10.0"))
     PRICE_UPDATE_INTERVAL = int(os.getenv("PRICE_UPDATE_INTERVAL", "2"))
     BALANCE_UPDATE_INTERVAL = int(os.getenv("BALANCE_UPDATE_INTERVAL", "30"))
+    SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "0"))
+    # Circuit breaker per exchange (exchanges/health.py) and hedged market-data reads
+    BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+    BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+    BREAKER_LATENCY_MS = float(os.getenv("BREAKER_LATENCY_MS", "5000"))
+    BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+    HEDGE_READS = os.getenv("HEDGE_READS", "False").lower() == "true"
+    # Quotes older than this on the local clock (exchanges/clock.py) are not traded on
+    MAX_QUOTE_AGE_MS = float(os.getenv("MAX_QUOTE_AGE_MS", "5000"))
+    CLOCK_SYNC_INTERVAL = int(os.getenv("CLOCK_SYNC_INTERVAL", "60"))
+    SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "30"))
+    BALANCE_RAW_RETENTION_HOURS = int(os.getenv("BALANCE_RAW_RETENTION_HOURS", "48"))
+    BALANCE_HOURLY_RETENTION_DAYS = int(os.getenv("BALANCE_HOURLY_RETENTION_DAYS", "30"))
+    RETENTION_INTERVAL = int(os.getenv("RETENTION_INTERVAL", "300"))
+    RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+    RECORD_MARKET_DATA = os.getenv("RECORD_MARKET_DATA", "False").lower() == "true"
+    TICK_STORE_DIR = os.getenv("TICK_STORE_DIR", "data/ticks")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    # Profiling endpoints (utils/profiling.py) need this in X-Admin-Token; empty disables them
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    FUNCTION_TIMINGS = os.getenv("FUNCTION_TIMINGS", "False").lower() == "true"
+    TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+    TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "1395251148")
+    RUNTIME_CONFIG_FILE = os.getenv("RUNTIME_CONFIG_FILE", "runtime_config.json")
 
 settings = Settings()
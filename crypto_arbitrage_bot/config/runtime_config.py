@@ -0,0 +1,194 @@
+"""
+Runtime-reloadable trading configuration.
+
+A subset of `settings` can be changed while the bot and API are running, from
+a watched JSON file (RUNTIME_CONFIG_FILE) or the API's /config endpoint,
+which writes the same file so every process picks the change up. New values
+are written onto `settings` and listeners are told what changed so they can
+adjust in place (e.g. watch new pairs) without reconnecting exchanges.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from sys import intern
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.config import settings
+from utils.logger import logger
+
+# Settings that can change at runtime, with their types
+RELOADABLE = {
+    "TRADING_PAIRS": list,
+    "MIN_SPREAD_THRESHOLD": float,
+    "MAX_POSITION_SIZE": float,
+    "DAILY_LOSS_LIMIT": float,
+    "MAX_TOTAL_EXPOSURE": float,
+    "PRICE_UPDATE_INTERVAL": float,
+    "BALANCE_UPDATE_INTERVAL": float,
+    "FUNCTION_TIMINGS": bool,
+}
+
+Changes = Dict[str, Tuple[object, object]]
+
+
+def _coerce(name: str, value):
+    kind = RELOADABLE[name]
+    if kind is list:
+        if isinstance(value, str):
+            value = value.split(",")
+        pairs = [intern(str(p).strip().upper()) for p in value if str(p).strip()]
+        if not pairs or any("/" not in p for p in pairs):
+            raise ValueError("expected a non-empty list of BASE/QUOTE pairs")
+        return list(dict.fromkeys(pairs))
+    if kind is bool and isinstance(value, str):
+        if value.lower() not in ("true", "false"):
+            raise ValueError("expected true or false")
+        return value.lower() == "true"
+    value = kind(value)
+    if name in ("MAX_POSITION_SIZE", "PRICE_UPDATE_INTERVAL", "BALANCE_UPDATE_INTERVAL") and value <= 0:
+        raise ValueError("must be positive")
+    return value
+
+
+def validate(updates: Dict) -> Dict:
+    """Coerce updates to their setting types; raises ValueError on bad input"""
+    unknown = [k for k in updates if k.upper() not in RELOADABLE]
+    if unknown:
+        raise ValueError(f"Not reloadable: {', '.join(unknown)}")
+    result = {}
+    for name, value in updates.items():
+        name = name.upper()
+        try:
+            result[name] = _coerce(name, value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid {name}: {str(e)}")
+    return result
+
+
+class RuntimeConfig:
+    """Applies configuration changes live and notifies listeners"""
+
+    def __init__(self, path: str = settings.RUNTIME_CONFIG_FILE, poll_interval: float = 2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._listeners: List[Callable[[Changes], None]] = []
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add_listener(self, callback: Callable[[Changes], None]):
+        """Call `callback({name: (old, new)})` after changes are applied"""
+        self._listeners.append(callback)
+
+    def current(self) -> Dict:
+        return {name: getattr(settings, name) for name in RELOADABLE}
+
+    # ------------------------------------------------------------------
+    # Applying changes
+    # ------------------------------------------------------------------
+
+    def apply(self, updates: Dict, source: str = "api") -> Changes:
+        """Validate and apply updates to `settings`; returns what changed"""
+        values = validate(updates)
+        with self._lock:
+            changes = {}
+            for name, value in values.items():
+                old = getattr(settings, name)
+                if old != value:
+                    setattr(settings, name, value)
+                    changes[name] = (old, value)
+        if changes:
+            logger.info("Runtime config from %s: %s", source,
+                        ", ".join(f"{k}={new}" for k, (_, new) in changes.items()))
+            self._notify(changes)
+        return changes
+
+    def _notify(self, changes: Changes):
+        for callback in self._listeners:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._call, callback, changes)
+            else:
+                self._call(callback, changes)
+
+    @staticmethod
+    def _call(callback, changes: Changes):
+        try:
+            callback(changes)
+        except Exception as e:
+            logger.error("Runtime config listener failed: %s", e)
+
+    def update(self, updates: Dict) -> Changes:
+        """Apply updates here and persist them so other processes follow"""
+        values = validate(updates)
+        with self._lock:
+            stored = self._read_file() or {}
+            stored.update(values)
+            self._write_file(stored)
+        return self.apply(values, source="api")
+
+    # ------------------------------------------------------------------
+    # Watched file
+    # ------------------------------------------------------------------
+
+    def _read_file(self) -> Optional[Dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, values: Dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(values, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def check_file(self) -> Changes:
+        """Apply the file if it changed since the last check"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if mtime == self._mtime:
+            return {}
+        self._mtime = mtime
+        try:
+            values = self._read_file()
+            if not isinstance(values, dict):
+                raise ValueError("expected a JSON object")
+            return self.apply(values, source=self.path)
+        except ValueError as e:
+            logger.error("Ignoring runtime config %s: %s", self.path, e)
+            return {}
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Watch the file from a daemon thread
+
+        Pass the running event loop to have listeners called on it.
+        """
+        self._loop = loop
+        self.check_file()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="runtime-config", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check_file()
@@ -1,51 +1,125 @@
 """
 Encrypted secrets storage for sensitive credentials (e.g., API tokens).
 Uses Fernet symmetric encryption from the cryptography package.
+
+Decrypted secrets are cached in memory per secrets file and shared by every
+SecretsManager instance; the cache is invalidated when the file's mtime or
+size changes, so edits from another process are still picked up. Secrets are
+stored as JSON and written atomically (temp file + rename).
 """
+import ast
+import json
 import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional
 from cryptography.fernet import Fernet
 
 SECRETS_FILE = "secrets.enc"
 KEY_FILE = "secrets.key"
 
+# (secrets path, key path) -> (file signature, decrypted secrets)
+_cache: Dict[tuple, tuple] = {}
+_lock = threading.RLock()
+
 class SecretsManager:
     def __init__(self, key_path=KEY_FILE, secrets_path=SECRETS_FILE):
         self.key_path = key_path
         self.secrets_path = secrets_path
         self.key = self._load_or_create_key()
         self.fernet = Fernet(self.key)
+        self._cache_key = (os.path.abspath(secrets_path), os.path.abspath(key_path))
 
     def _load_or_create_key(self):
         if os.path.exists(self.key_path):
             with open(self.key_path, "rb") as f:
                 return f.read()
         key = Fernet.generate_key()
-        with open(self.key_path, "wb") as f:
-            f.write(key)
+        self._atomic_write(self.key_path, key)
         return key
 
-    def save_secret(self, name, value):
-        secrets = self.load_secrets()
-        secrets[name] = value
-        data = str(secrets).encode()
-        encrypted = self.fernet.encrypt(data)
-        with open(self.secrets_path, "wb") as f:
-            f.write(encrypted)
+    def _signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.secrets_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
 
-    def load_secrets(self):
-        if not os.path.exists(self.secrets_path):
-            return {}
+    def _cached(self) -> Dict:
+        """Decrypted secrets, re-read only when the file changed"""
+        signature = self._signature()
+        entry = _cache.get(self._cache_key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with _lock:
+            signature = self._signature()
+            secrets = self._read() if signature is not None else {}
+            _cache[self._cache_key] = (signature, secrets)
+            return secrets
+
+    def _read(self) -> Dict:
         with open(self.secrets_path, "rb") as f:
             encrypted = f.read()
         try:
-            data = self.fernet.decrypt(encrypted)
-            return eval(data.decode())
+            data = self.fernet.decrypt(encrypted).decode()
         except Exception:
             return {}
+        try:
+            return json.loads(data)
+        except ValueError:
+            pass
+        try:
+            # Files written before the JSON format hold a Python dict literal
+            secrets = ast.literal_eval(data)
+            return secrets if isinstance(secrets, dict) else {}
+        except (ValueError, SyntaxError):
+            return {}
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _write(self, secrets: Dict):
+        encrypted = self.fernet.encrypt(json.dumps(secrets).encode())
+        self._atomic_write(self.secrets_path, encrypted)
+        _cache[self._cache_key] = (self._signature(), secrets)
+
+    def save_secret(self, name, value):
+        self.save_secrets({name: value})
+
+    def save_secrets(self, values: Dict):
+        """Store several secrets in one write"""
+        with _lock:
+            secrets = dict(self._cached())
+            secrets.update(values)
+            self._write(secrets)
+
+    def delete_secrets(self, names: Iterable[str]) -> list:
+        """Remove secrets; returns the names that existed"""
+        with _lock:
+            secrets = dict(self._cached())
+            deleted = [name for name in names if name in secrets]
+            if deleted:
+                for name in deleted:
+                    del secrets[name]
+                self._write(secrets)
+            return deleted
+
+    def load_secrets(self):
+        return dict(self._cached())
 
     def get_secret(self, name):
-        secrets = self.load_secrets()
-        return secrets.get(name)
+        return self._cached().get(name)
 
 # Usage example:
 # secrets = SecretsManager()
@@ -1,20 +1,39 @@
 """
 Core arbitrage calculation engine.
 """
-from typing import Dict, List
+from typing import Dict, List, Optional
+from core.fee_schedule import FeeSchedule
+from core.models import Opportunity, Profit
 from utils.logger import logger
+from utils.profiling import timed
+from operator import attrgetter
+
+_by_spread = attrgetter("spread_pct")
 
 class ArbitrageEngine:
-    def __init__(self, min_spread: float = 0.3, max_position_size: float = 1.0):
+    def __init__(self, min_spread: float = 0.3, max_position_size: float = 1.0,
+                 fees: Optional[FeeSchedule] = None):
         self.min_spread = min_spread
         self.max_position_size = max_position_size
+        self.fees = fees or FeeSchedule([])
         self.active_trades = []
     
+    @timed
     def calculate_profit(self, buy_price: float, sell_price: float, quantity: float,
-                        buy_fee: float = 0.001, sell_fee: float = 0.001) -> Dict:
-        """Calculate profit for an arbitrage trade"""
+                        buy_fee: Optional[float] = None, sell_fee: Optional[float] = None,
+                        buy_exchange: Optional[str] = None, sell_exchange: Optional[str] = None,
+                        symbol: Optional[str] = None) -> Optional[Profit]:
+        """Calculate profit for an arbitrage trade (None for invalid inputs)
+
+        Fees not given are the taker rates for the exchanges and symbol from
+        the fee schedule (its default rate when the venue is unknown).
+        """
         if quantity <= 0 or buy_price <= 0:
-            return {"error": "Invalid inputs"}
+            return None
+        if buy_fee is None:
+            buy_fee = self.fees.taker(buy_exchange, symbol)
+        if sell_fee is None:
+            sell_fee = self.fees.taker(sell_exchange, symbol)
         
         buy_cost = buy_price * quantity
         buy_fee_cost = buy_cost * buy_fee
@@ -27,33 +46,24 @@ class ArbitrageEngine:
         profit_usd = net_revenue - total_buy_cost
         profit_pct = (profit_usd / total_buy_cost) * 100
         
-        return {
-            "buy_cost": buy_cost,
-            "buy_fee": buy_fee_cost,
-            "total_buy_cost": total_buy_cost,
-            "sell_revenue": sell_revenue,
-            "sell_fee": sell_fee_cost,
-            "net_revenue": net_revenue,
-            "profit_usd": profit_usd,
-            "profit_pct": profit_pct
-        }
+        return Profit(buy_cost, buy_fee_cost, total_buy_cost, sell_revenue, sell_fee_cost,
+                      net_revenue, profit_usd, profit_pct)
     
-    def rank_opportunities(self, opportunities: List[Dict]) -> List[Dict]:
+    @timed
+    def rank_opportunities(self, opportunities: List[Opportunity]) -> List[Opportunity]:
         """Rank opportunities by profitability"""
-        ranked = []
-        for opp in opportunities:
-            if opp["spread_pct"] >= self.min_spread:
-                ranked.append(opp)
-        return sorted(ranked, key=lambda x: x["spread_pct"], reverse=True)
+        min_spread = self.min_spread
+        ranked = [opp for opp in opportunities if opp.spread_pct >= min_spread]
+        return sorted(ranked, key=_by_spread, reverse=True)
     
-    def filter_by_liquidity(self, opportunities: List[Dict], min_volume: float = 0.1) -> List[Dict]:
+    def filter_by_liquidity(self, opportunities: List[Opportunity], min_volume: float = 0.1) -> List[Opportunity]:
         """Filter opportunities by minimum liquidity"""
         return opportunities
     
-    def validate_trade(self, opportunity: Dict, available_funds: Dict) -> bool:
+    def validate_trade(self, opportunity: Opportunity, available_funds: Dict) -> bool:
         """Validate if trade can be executed"""
-        buy_exchange = opportunity["buy_exchange"]
-        symbol = opportunity["symbol"]
+        buy_exchange = opportunity.buy_exchange
+        symbol = opportunity.symbol
         base_asset = symbol.split("/")[0]
         
         if buy_exchange not in available_funds:
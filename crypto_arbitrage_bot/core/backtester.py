@@ -0,0 +1,312 @@
+"""
+Offline replay and backtesting over recorded market data.
+
+Recorded ticks from the `TickStore` are replayed in timestamp order through the
+same `PriceMonitor.detect_opportunities` -> `ArbitrageEngine` -> `RiskManager`
+pipeline the live bot uses. Orders go to a simulated executor that fills after
+a configurable latency against the book as it looks at that point in the
+replay, applying per-venue fees and top-of-book depth. A venue that stopped
+updating keeps its last quote in the book, which is left out of detection once
+it is older than the quote-age budget.
+
+Replays are deterministic: the same data and parameters give the same report.
+
+Usage:
+    python -m core.backtester --start 2025-11-22 --end 2025-11-23 \\
+        --symbols BTC/USDT,ETH/USDT --min-spread 0.3 --quantity 0.01
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.config import settings
+from core.arbitrage_engine import ArbitrageEngine
+from core.fee_schedule import FeeSchedule, parse_fee_overrides
+from core.models import Opportunity, Quote
+from core.price_monitor import PriceMonitor
+from core.risk_manager import RiskManager
+from database.tick_store import TickStore
+from utils.logger import logger
+
+class ReplayExchangeManager:
+    """Offline stand-in exposing the venue names PriceMonitor iterates over"""
+
+    def __init__(self, exchange_names: List[str]):
+        self.exchanges = {name: None for name in exchange_names}
+
+
+# Stands in for a venue with no quote yet, so fills see zero prices and sizes
+_NO_QUOTE = Quote(0.0, 0.0)
+
+
+class SimulatedExecutor:
+    """Fills arbitrage legs against replayed books with fees, latency and depth"""
+
+    def __init__(self, engine: ArbitrageEngine, latency: float = 0.1):
+        self.engine = engine
+        self.latency = latency
+        self.pending = []
+        self.fills = []
+
+    def submit(self, opportunity: Opportunity, quantity: float, ts: float):
+        """Queue both legs to be filled once the latency has elapsed"""
+        self.pending.append({
+            "fill_at": ts + self.latency,
+            "submitted_at": ts,
+            "opportunity": opportunity,
+            "quantity": quantity
+        })
+
+    def process_due(self, ts: float, books: Dict) -> List[Dict]:
+        """Fill every pending order whose latency has elapsed by `ts`"""
+        if not self.pending:
+            return []
+        due = [order for order in self.pending if order["fill_at"] <= ts]
+        if not due:
+            return []
+        self.pending = [order for order in self.pending if order["fill_at"] > ts]
+        return [self._fill(order, books) for order in due]
+
+    def _fill(self, order: Dict, books: Dict) -> Dict:
+        opp = order["opportunity"]
+        symbol = opp.symbol
+        buy_ex = opp.buy_exchange
+        sell_ex = opp.sell_exchange
+        book = books.get(symbol, {})
+        buy_quote = book.get(buy_ex) or _NO_QUOTE
+        sell_quote = book.get(sell_ex) or _NO_QUOTE
+
+        result = {
+            "timestamp": order["fill_at"],
+            "symbol": symbol,
+            "buy_exchange": buy_ex,
+            "sell_exchange": sell_ex,
+            "requested_quantity": order["quantity"],
+            "detected_spread_pct": opp.spread_pct,
+            "quantity": 0.0,
+            "buy_price": buy_quote.ask,
+            "sell_price": sell_quote.bid,
+            "pnl": 0.0,
+            "status": "failed"
+        }
+
+        if result["buy_price"] <= 0 or result["sell_price"] <= 0:
+            self.fills.append(result)
+            return result
+
+        # Only the displayed top-of-book size is assumed to be available;
+        # an unknown size (0) is treated as deep enough for the whole order.
+        quantity = order["quantity"]
+        for size in (buy_quote.ask_size, sell_quote.bid_size):
+            if size > 0:
+                quantity = min(quantity, size)
+
+        profit = self.engine.calculate_profit(
+            result["buy_price"], result["sell_price"], quantity,
+            buy_exchange=buy_ex, sell_exchange=sell_ex, symbol=symbol
+        )
+        if profit is None:
+            # Non-positive order quantity: nothing fills
+            self.fills.append(result)
+            return result
+        result["quantity"] = quantity
+        result["pnl"] = profit.profit_usd
+        result["realized_spread_pct"] = profit.profit_pct
+        result["status"] = "completed" if quantity >= order["quantity"] else "partial"
+        self.fills.append(result)
+        return result
+
+
+class ReplayEngine:
+    """Replays recorded ticks through the live detection and risk pipeline"""
+
+    def __init__(self, tick_store: TickStore, symbols: List[str],
+                 min_spread: float = settings.MIN_SPREAD_THRESHOLD,
+                 quantity: float = 0.01,
+                 fees: Optional[FeeSchedule] = None,
+                 latency: float = 0.1,
+                 max_quote_age: Optional[float] = settings.MAX_QUOTE_AGE_MS / 1000,
+                 re_entry_delay: float = settings.RE_ENTRY_DELAY,
+                 max_concurrent_trades: int = settings.MAX_CONCURRENT_TRADES,
+                 daily_loss_limit: float = settings.DAILY_LOSS_LIMIT,
+                 max_exposure: float = settings.MAX_TOTAL_EXPOSURE):
+        self.tick_store = tick_store
+        self.symbols = symbols
+        self.min_spread = min_spread
+        self.quantity = quantity
+        self.max_quote_age = max_quote_age
+        self.re_entry_delay = re_entry_delay
+        self.max_concurrent_trades = max_concurrent_trades
+
+        # Detection and fills price fees from the same schedule
+        self.fees = fees or FeeSchedule(tick_store.exchange_names)
+        self.price_monitor = PriceMonitor(
+            exchange_manager=ReplayExchangeManager(tick_store.exchange_names),
+            fees=self.fees
+        )
+        self.arbitrage_engine = ArbitrageEngine(min_spread=min_spread, fees=self.fees)
+        self.risk_manager = RiskManager(daily_loss_limit=daily_loss_limit,
+                                        max_exposure=max_exposure)
+        self.executor = SimulatedExecutor(self.arbitrage_engine, latency=latency)
+
+    def _load_events(self, start: float, end: float):
+        """Merge every symbol's ticks into one timestamp-ordered stream"""
+        columns = {"ts": [], "symbol": [], "exchange": [], "bid": [], "ask": [],
+                   "bid_size": [], "ask_size": [], "last": []}
+        for symbol_index, symbol in enumerate(self.symbols):
+            ticks = self.tick_store.scan(symbol, start, end)
+            if not len(ticks):
+                continue
+            columns["symbol"].append(np.full(len(ticks), symbol_index, dtype=np.int32))
+            for field in ("ts", "exchange", "bid", "ask", "bid_size", "ask_size", "last"):
+                columns[field].append(ticks[field])
+
+        if not columns["ts"]:
+            return None
+        merged = {field: np.concatenate(chunks) for field, chunks in columns.items()}
+        # Stable sort keeps each symbol's recorded order for equal timestamps
+        order = np.lexsort((merged["symbol"], merged["ts"]))
+        return {field: values[order] for field, values in merged.items()}
+
+    def run(self, start: float, end: float) -> Dict:
+        """Replay [start, end) and return a PnL/fill report"""
+        wall_start = time.perf_counter()
+        events = self._load_events(start, end)
+        if events is None:
+            logger.warning("No recorded ticks for %s in range", self.symbols)
+            return self.report(0, 0, 0, 0.0, time.perf_counter() - wall_start, start, end)
+
+        names = self.tick_store.exchange_names
+        books: Dict[str, Dict[str, Quote]] = {symbol: {} for symbol in self.symbols}
+        last_entry: Dict[str, float] = {}
+        cycles = 0
+        opportunities_seen = 0
+
+        ts_col = events["ts"].tolist()
+        symbol_col = events["symbol"].tolist()
+        exchange_col = events["exchange"].tolist()
+        bid_col = events["bid"].tolist()
+        ask_col = events["ask"].tolist()
+        bid_size_col = events["bid_size"].tolist()
+        ask_size_col = events["ask_size"].tolist()
+        last_col = events["last"].tolist()
+        total = len(ts_col)
+
+        i = 0
+        while i < total:
+            cycle_ts = ts_col[i]
+
+            # Orders whose latency elapsed before this update fill against
+            # the book as it stood just before it.
+            for fill in self.executor.process_due(cycle_ts, books):
+                self.risk_manager.record_result(fill["pnl"], fill["status"])
+
+            # Apply every update sharing this timestamp as one scan cycle
+            while i < total and ts_col[i] == cycle_ts:
+                books[self.symbols[symbol_col[i]]][names[exchange_col[i]]] = Quote(
+                    bid_col[i], ask_col[i], last_col[i], bid_size_col[i], ask_size_col[i], cycle_ts
+                )
+                i += 1
+            cycles += 1
+
+            opportunities = self.price_monitor.detect_opportunities(
+                books, min_spread=self.min_spread, max_age=self.max_quote_age, now=cycle_ts
+            )
+            opportunities = self.arbitrage_engine.rank_opportunities(opportunities)
+            opportunities_seen += len(opportunities)
+
+            if not opportunities or not self.risk_manager.can_trade():
+                continue
+            if len(self.executor.pending) >= self.max_concurrent_trades:
+                continue
+
+            opp = opportunities[0]
+            if cycle_ts - last_entry.get(opp.symbol, float("-inf")) < self.re_entry_delay:
+                continue
+            last_entry[opp.symbol] = cycle_ts
+            self.executor.submit(opp, self.quantity, cycle_ts)
+
+        # Anything still in flight fills against the final book
+        for fill in self.executor.process_due(float("inf"), books):
+            self.risk_manager.record_result(fill["pnl"], fill["status"])
+
+        return self.report(total, cycles, opportunities_seen, ts_col[-1] - ts_col[0],
+                           time.perf_counter() - wall_start, start, end)
+
+    def report(self, events: int, cycles: int, opportunities_seen: int, replayed: float,
+               wall_time: float, start: float, end: float) -> Dict:
+        """Summarize fills and PnL"""
+        fills = self.executor.fills
+        pnls = [f["pnl"] for f in fills if f["status"] != "failed"]
+        per_symbol: Dict[str, Dict] = {}
+        for fill in fills:
+            stats = per_symbol.setdefault(fill["symbol"], {"trades": 0, "pnl": 0.0})
+            stats["trades"] += 1
+            stats["pnl"] += fill["pnl"]
+
+        return {
+            "start": datetime.fromtimestamp(start, tz=timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(end, tz=timezone.utc).isoformat(),
+            "events": events,
+            "cycles": cycles,
+            "opportunities": opportunities_seen,
+            "trades": len(fills),
+            "completed": sum(1 for f in fills if f["status"] == "completed"),
+            "partial": sum(1 for f in fills if f["status"] == "partial"),
+            "failed": sum(1 for f in fills if f["status"] == "failed"),
+            "winning_trades": sum(1 for p in pnls if p > 0),
+            "losing_trades": sum(1 for p in pnls if p < 0),
+            "total_pnl": sum(pnls),
+            "avg_detected_spread_pct": (sum(f["detected_spread_pct"] for f in fills) / len(fills)) if fills else 0.0,
+            "per_symbol": per_symbol,
+            "risk": self.risk_manager.get_status(),
+            "replayed_s": replayed,
+            "wall_time_s": wall_time,
+            "speedup": (replayed / wall_time) if wall_time > 0 else 0.0,
+            "fills": fills
+        }
+
+
+def _parse_date(value: str) -> float:
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ticks through the arbitrage pipeline")
+    parser.add_argument("--store", default=settings.TICK_STORE_DIR)
+    parser.add_argument("--start", required=True, help="UTC start date, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="UTC end date (exclusive), YYYY-MM-DD")
+    parser.add_argument("--symbols", default="BTC/USDT,ETH/USDT")
+    parser.add_argument("--min-spread", type=float, default=settings.MIN_SPREAD_THRESHOLD)
+    parser.add_argument("--quantity", type=float, default=0.01)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--max-quote-age-ms", type=float, default=settings.MAX_QUOTE_AGE_MS,
+                        help="Leave quotes older than this out of detection")
+    parser.add_argument("--fee", action="append", metavar="EXCHANGE[:SYMBOL]=RATE",
+                        help="Taker fee override, e.g. --fee binance=0.00075 --fee okx:BTC/USDT=0.0008")
+    parser.add_argument("--fills", action="store_true", help="Include individual fills in the output")
+    args = parser.parse_args()
+
+    store = TickStore(args.store)
+    fees = FeeSchedule(store.exchange_names, overrides=parse_fee_overrides(",".join(args.fee or [])))
+    replay = ReplayEngine(
+        store,
+        [s.strip() for s in args.symbols.split(",") if s.strip()],
+        min_spread=args.min_spread,
+        quantity=args.quantity,
+        fees=fees,
+        latency=args.latency_ms / 1000.0,
+        max_quote_age=args.max_quote_age_ms / 1000.0
+    )
+    report = replay.run(_parse_date(args.start), _parse_date(args.end))
+    if not args.fills:
+        report.pop("fills")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Per-venue, per-market trading fee rates.
+
+Rates come from each exchange's `fetch_trading_fees` (account tier, fee-token
+discounts) where supported, falling back to market metadata from
+`load_markets` and the exchange's published default. Manual overrides win
+over everything fetched.
+
+Detection reads fees as dense rows aligned with its exchange index, one row
+per symbol (taker, and maker for maker-taker execution), so applying fees to
+a candidate pair is a few list indexings.
+Rows are rebuilt only when rates change.
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from exchanges.health import ExchangeUnavailable
+from utils.logger import logger
+from utils.profiling import timed
+
+DEFAULT_FEE = 0.001
+
+# (taker, maker) as fractions, e.g. (0.001, 0.0008)
+Rates = Tuple[float, float]
+
+
+def parse_fee_overrides(spec: str) -> Dict[str, Dict[Optional[str], Rates]]:
+    """Parse "binance=0.00075,okx:BTC/USDT=0.0008/0.0006" into overrides
+
+    Each item is EXCHANGE[:SYMBOL]=TAKER[/MAKER]; the maker rate defaults
+    to the taker rate. Raises ValueError on malformed items.
+    """
+    overrides: Dict[str, Dict[Optional[str], Rates]] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        target, sep, rates = item.partition("=")
+        if not sep:
+            raise ValueError(f"Fee override {item!r} is not EXCHANGE[:SYMBOL]=TAKER[/MAKER]")
+        exchange, _, symbol = target.partition(":")
+        taker, _, maker = rates.partition("/")
+        overrides.setdefault(exchange.strip(), {})[symbol.strip().upper() or None] = (
+            float(taker), float(maker) if maker else float(taker)
+        )
+    return overrides
+
+
+def _rates(entry: Dict) -> Optional[Rates]:
+    """(taker, maker) from a ccxt fee or market structure, if it has a taker rate"""
+    taker = entry.get("taker")
+    if taker is None:
+        return None
+    maker = entry.get("maker")
+    return float(taker), float(taker if maker is None else maker)
+
+
+class FeeSchedule:
+    """Taker and maker rates per exchange and market, with dense per-symbol rows"""
+
+    def __init__(self, exchanges: List[str], default: float = DEFAULT_FEE,
+                 overrides: Optional[Dict[str, Dict[Optional[str], Rates]]] = None):
+        self.default = default
+        self.overrides = overrides or {}
+        # exchange -> {symbol or None for the venue default: rates}
+        self.fetched: Dict[str, Dict[Optional[str], Rates]] = {}
+        self.updated_at: Dict[str, float] = {}
+        # Bumped whenever any rate changes, so array consumers know to rebuild
+        self.version = 0
+        self.set_exchanges(exchanges)
+
+    def set_exchanges(self, exchanges: List[str]):
+        """Align rows with a (new) exchange index"""
+        self.exchanges = list(exchanges)
+        self.index = {name: i for i, name in enumerate(self.exchanges)}
+        self._changed()
+
+    def _changed(self):
+        self._taker_rows: Dict[str, List[float]] = {}
+        self._maker_rows: Dict[str, List[float]] = {}
+        self.version += 1
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def rates(self, exchange: Optional[str], symbol: Optional[str] = None) -> Rates:
+        """(taker, maker) for a market; unknown venues get the default rate"""
+        manual = self.overrides.get(exchange)
+        if manual:
+            if symbol in manual:
+                return manual[symbol]
+            if None in manual:
+                return manual[None]
+        fetched = self.fetched.get(exchange)
+        if fetched:
+            if symbol in fetched:
+                return fetched[symbol]
+            if None in fetched:
+                return fetched[None]
+        return self.default, self.default
+
+    def taker(self, exchange: Optional[str], symbol: Optional[str] = None) -> float:
+        return self.rates(exchange, symbol)[0]
+
+    def maker(self, exchange: Optional[str], symbol: Optional[str] = None) -> float:
+        return self.rates(exchange, symbol)[1]
+
+    def taker_pct_row(self, symbol: str) -> List[float]:
+        """Taker rates in percent for `symbol`, indexed like `exchanges`"""
+        row = self._taker_rows.get(symbol)
+        if row is None:
+            row = [self.rates(name, symbol)[0] * 100 for name in self.exchanges]
+            self._taker_rows[symbol] = row
+        return row
+
+    def maker_pct_row(self, symbol: str) -> List[float]:
+        """Maker rates in percent for `symbol`, indexed like `exchanges`"""
+        row = self._maker_rows.get(symbol)
+        if row is None:
+            row = [self.rates(name, symbol)[1] * 100 for name in self.exchanges]
+            self._maker_rows[symbol] = row
+        return row
+
+    def taker_matrix(self, symbols: List[str], exchanges: List[str]):
+        """Taker rates as a (symbols, exchanges) float64 array, for vectorized detection"""
+        return self._matrix(symbols, exchanges, 0)
+
+    def maker_matrix(self, symbols: List[str], exchanges: List[str]):
+        """Maker rates as a (symbols, exchanges) float64 array"""
+        return self._matrix(symbols, exchanges, 1)
+
+    def _matrix(self, symbols: List[str], exchanges: List[str], side: int):
+        import numpy as np
+        return np.array([[self.rates(name, symbol)[side] for name in exchanges] for symbol in symbols],
+                        dtype=np.float64)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def set_override(self, exchange: str, taker: float, maker: Optional[float] = None,
+                     symbol: Optional[str] = None):
+        """Pin a rate for an exchange, or for one of its markets"""
+        self.overrides.setdefault(exchange, {})[symbol] = (taker, taker if maker is None else maker)
+        self._changed()
+
+    def clear_override(self, exchange: str, symbol: Optional[str] = None):
+        self.overrides.get(exchange, {}).pop(symbol, None)
+        self._changed()
+
+    def update(self, exchange: str, rates: Dict[Optional[str], Rates]):
+        """Replace the fetched rates for an exchange"""
+        if rates and rates != self.fetched.get(exchange):
+            self.fetched[exchange] = rates
+            self._changed()
+        self.updated_at[exchange] = time.time()
+
+    @timed
+    async def refresh(self, exchange_manager, symbols: List[str]):
+        """Fetch current rates from every exchange of an AsyncExchangeManager"""
+        names = list(exchange_manager.exchanges.keys())
+        results = await asyncio.gather(
+            *(self._fetch(exchange_manager, name, symbols) for name in names),
+            return_exceptions=True
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, ExchangeUnavailable):
+                # Circuit breaker open: keep the last rates until it recovers
+                continue
+            if isinstance(result, Exception):
+                logger.warning("Could not refresh fees for %s: %s", name, result)
+                continue
+            self.update(name, result)
+
+    @staticmethod
+    async def _fetch(exchange_manager, name: str, symbols: List[str]) -> Dict[Optional[str], Rates]:
+        # Requests go through the manager so they count towards venue health and request metrics
+        client = exchange_manager.exchanges[name]
+        rates: Dict[Optional[str], Rates] = {}
+        # Published default, e.g. ccxt's exchange.fees["trading"]
+        venue = _rates((getattr(client, "fees", None) or {}).get("trading") or {})
+        if venue:
+            rates[None] = venue
+
+        # Market metadata carries the standard tier per market
+        if getattr(client, "markets", None) is None:
+            await exchange_manager._call(name, "load_markets")
+        markets = getattr(client, "markets", None) or {}
+        for symbol in symbols:
+            market = _rates(markets.get(symbol) or {})
+            if market:
+                rates[symbol] = market
+
+        # Account-specific rates (VIP tier, fee-token discounts) need credentials
+        if (getattr(client, "has", None) or {}).get("fetchTradingFees"):
+            try:
+                fees = await exchange_manager._call(name, "fetch_trading_fees")
+            except Exception as e:
+                logger.debug("fetch_trading_fees failed for %s: %s", name, e)
+            else:
+                for symbol in symbols:
+                    account = _rates(fees.get(symbol) or {})
+                    if account:
+                        rates[symbol] = account
+        return rates
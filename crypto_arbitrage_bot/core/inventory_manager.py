@@ -2,15 +2,22 @@
 Inventory and rebalancing manager.
 """
 from typing import Dict, List
-from exchanges.exchange_manager import ExchangeManager
 from utils.logger import logger
+from utils.profiling import timed
+
+# Top-level keys in a ccxt fetch_balance result that aren't assets
+BALANCE_META_KEYS = {"info", "free", "used", "total", "timestamp", "datetime", "debt"}
 
 class InventoryManager:
-    def __init__(self):
-        self.exchange_manager = ExchangeManager()
+    def __init__(self, exchange_manager=None):
+        if exchange_manager is None:
+            from exchanges.exchange_manager import ExchangeManager
+            exchange_manager = ExchangeManager()
+        self.exchange_manager = exchange_manager
         self.inventory_snapshots = []
         self.target_allocation = {}
     
+    @timed
     def get_all_balances(self) -> Dict:
         """Fetch balances from all exchanges"""
         all_balances = {}
@@ -19,6 +26,28 @@ class InventoryManager:
             all_balances[exchange_name] = balances
         return all_balances
     
+    @timed
+    async def get_all_balances_async(self) -> Dict:
+        """Fetch balances from all exchanges concurrently; requires an AsyncExchangeManager"""
+        return await self.exchange_manager.get_all_balances()
+    
+    @staticmethod
+    def compact_balances(all_balances: Dict) -> Dict:
+        """Reduce raw ccxt balances to non-zero {exchange: {asset: {free, used, total}}}"""
+        compact = {}
+        for exchange_name, balances in all_balances.items():
+            assets = {}
+            for asset, data in balances.items():
+                if asset in BALANCE_META_KEYS or not isinstance(data, dict):
+                    continue
+                free = data.get("free") or 0
+                used = data.get("used") or 0
+                total = data.get("total") or 0
+                if free or used or total:
+                    assets[asset] = {"free": free, "used": used, "total": total}
+            compact[exchange_name] = assets
+        return compact
+    
     def calculate_drift(self, all_balances: Dict, asset: str) -> Dict:
         """Calculate inventory drift for an asset"""
         drift_analysis = {}
@@ -80,7 +109,7 @@ class InventoryManager:
                 if amount > 0:
                     symbol = f"{asset}/USDT"
                     if symbol in prices and exchange_name in prices[symbol]:
-                        price = prices[symbol][exchange_name].get("last", 0)
+                        price = prices[symbol][exchange_name].last or 0
                         total_value += amount * price
         
         return total_value
@@ -0,0 +1,260 @@
+"""
+Maker-taker execution: rest one leg as a post-only limit order and hedge its fills.
+
+Instead of crossing the spread on both venues, the leg on the venue with the
+cheaper maker fee is posted as a post-only limit order priced so that, after
+maker and taker fees, hedging it at the other venue's touch still clears the
+minimum spread. While it rests:
+
+- the order is polled every MAKER_REQUOTE_INTERVAL_MS and any new fill is
+  hedged at once with a market order on the other venue;
+- when the hedge venue's touch moves the target price by MAKER_REQUOTE_BPS
+  or more, the order is cancelled and replaced at the new target (a fill
+  revealed by the cancel is hedged before the replacement goes out);
+- after MAKER_TIMEOUT seconds, or on shutdown, the order is cancelled and
+  whatever filled is hedged.
+
+Queue position is estimated from the displayed size at our price when the
+order is placed: nothing is ahead when we improve the touch, the whole best
+level is when we join it.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.models import TradeRecord
+from exchanges.clock import exchange_clock
+from utils.logger import logger
+from utils.metrics import MAKER_FILL_TO_HEDGE_SECONDS, MAKER_QUEUE_AHEAD, MAKER_REQUOTE_SECONDS
+
+# Quantities below this are treated as zero (float dust from partial fills)
+EPSILON = 1e-12
+
+
+def _filled(order: Dict) -> float:
+    return order.get("filled") or 0.0
+
+
+def summarize(orders: List[Dict], exchange: str, side: str) -> Optional[Dict]:
+    """One order-like dict for all orders of a leg: total fill, cost and average price"""
+    if not orders:
+        return None
+    filled = sum(_filled(order) for order in orders)
+    cost = sum(order.get("cost") or _filled(order) * (order.get("average") or 0.0) for order in orders)
+    return {
+        "exchange": exchange,
+        "side": side,
+        "ids": [order.get("id") for order in orders],
+        "filled": filled,
+        "cost": cost,
+        "average": cost / filled if filled > EPSILON else 0.0
+    }
+
+
+class MakerTaker:
+    """Cancel/replace loop for one maker leg and its taker hedge, run in the executor's thread"""
+
+    def __init__(self, exchange_manager, fees, requote_interval: float = 0.1,
+                 requote_bps: float = 1.0, timeout: float = 20.0):
+        self.exchange_manager = exchange_manager
+        self.fees = fees
+        self.requote_interval = requote_interval
+        self.requote_bps = requote_bps
+        self.timeout = timeout
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Cancel resting orders and hedge their fills now instead of waiting for the timeout
+
+        Stopping is terminal: later calls to execute() cancel at once and
+        return without trading. Build a new MakerTaker to trade again.
+        """
+        self._stop.set()
+
+    def maker_side(self, buy_exchange: str, sell_exchange: str, symbol: str) -> str:
+        """"buy" to rest the buy leg, "sell" to rest the sell leg; whichever pays less in fees"""
+        rest_buy = self.fees.maker(buy_exchange, symbol) + self.fees.taker(sell_exchange, symbol)
+        rest_sell = self.fees.taker(buy_exchange, symbol) + self.fees.maker(sell_exchange, symbol)
+        return "sell" if rest_sell < rest_buy else "buy"
+
+    def execute(self, record: TradeRecord, min_spread: float) -> TradeRecord:
+        """Fill `record.quantity` as maker on one venue, hedged as taker on the other"""
+        side = self.maker_side(record.buy_exchange, record.sell_exchange, record.symbol)
+        run = _Run(self, record, side, min_spread)
+        run.run()
+        return record
+
+
+class _Run:
+    """State of one maker-taker trade"""
+
+    def __init__(self, owner: MakerTaker, record: TradeRecord, side: str, min_spread: float):
+        self.owner = owner
+        self.manager = owner.exchange_manager
+        self.record = record
+        self.symbol = record.symbol
+        self.side = side
+        self.hedge_side = "sell" if side == "buy" else "buy"
+        self.maker, self.hedge = ((record.buy_exchange, record.sell_exchange) if side == "buy"
+                                  else (record.sell_exchange, record.buy_exchange))
+        fees = owner.fees
+        self.margin = 1 + min_spread / 100 + fees.maker(self.maker, self.symbol) + fees.taker(self.hedge, self.symbol)
+        # The resting order, as last seen, and the orders done with
+        self.order: Optional[Dict] = None
+        self.maker_orders: List[Dict] = []
+        self.hedge_orders: List[Dict] = []
+        self.hedged = 0.0
+        self.hedge_failed = False
+
+    def filled(self) -> float:
+        resting = _filled(self.order) if self.order is not None else 0.0
+        return sum(_filled(order) for order in self.maker_orders) + resting
+
+    def run(self):
+        owner = self.owner
+        deadline = time.monotonic() + owner.timeout
+        try:
+            while not self.hedge_failed:
+                if self.order is not None:
+                    self._poll()
+                if (self.record.quantity - self.filled() <= EPSILON or owner._stop.is_set()
+                        or time.monotonic() >= deadline):
+                    break
+                self._requote()
+                owner._stop.wait(owner.requote_interval)
+        finally:
+            self._finish()
+
+    # ------------------------------------------------------------------
+    # Steps
+    # ------------------------------------------------------------------
+
+    def _poll(self):
+        """Refresh the resting order and hedge anything new it filled"""
+        order = self.manager.get_order_status(self.maker, self.order["id"], self.symbol)
+        if order:
+            self._settle(order)
+
+    def _settle(self, order: Dict):
+        """Take `order` as the resting order's latest state, retiring it once it is done"""
+        self.order = order
+        self._hedge(order)
+        if order.get("status") not in (None, "open"):
+            self.maker_orders.append(order)
+            self.order = None
+
+    def _target(self) -> Optional[Tuple[float, Dict]]:
+        """Post-only price for the maker leg and the maker venue's ticker"""
+        hedge_ticker = self.manager.get_ticker(self.hedge, self.symbol)
+        maker_ticker = self.manager.get_ticker(self.maker, self.symbol)
+        if not (hedge_ticker.get("bid") and hedge_ticker.get("ask")
+                and maker_ticker.get("bid") and maker_ticker.get("ask")):
+            return None
+        if self.side == "buy":
+            price = hedge_ticker["bid"] / self.margin
+            # Would cross: rest at the best bid instead
+            if price >= maker_ticker["ask"]:
+                price = maker_ticker["bid"]
+        else:
+            price = hedge_ticker["ask"] * self.margin
+            if price <= maker_ticker["bid"]:
+                price = maker_ticker["ask"]
+        return price, maker_ticker
+
+    def _requote(self):
+        """Place the maker order, or replace it if its target moved far enough"""
+        target = self._target()
+        if target is None:
+            return
+        price, ticker = target
+        started = None
+        if self.order is not None:
+            if abs(price / self.order["price"] - 1) * 1e4 < self.owner.requote_bps:
+                return
+            started = time.perf_counter()
+            canceled = self.manager.cancel_order(self.maker, self.order["id"], self.symbol)
+            if "error" in canceled or canceled.get("filled") is None:
+                # Filled or gone before the cancel landed; its final state says which
+                canceled = self.manager.get_order_status(self.maker, self.order["id"], self.symbol)
+                if not canceled:
+                    return
+            self._settle(canceled)
+            if self.order is not None or self.hedge_failed:
+                return
+        remaining = self.record.quantity - self.filled()
+        if remaining <= EPSILON:
+            return
+        placed = self.manager.create_limit_order(self.maker, self.symbol, self.side, remaining, price,
+                                                 post_only=True)
+        if "error" in placed:
+            logger.debug("Maker order on %s not placed: %s", self.maker, placed["error"])
+            return
+        if started is not None:
+            MAKER_REQUOTE_SECONDS.labels(self.maker).observe(time.perf_counter() - started)
+            self.record.requotes += 1
+        self.order = placed
+        self._estimate_queue(price, remaining, ticker)
+
+    def _estimate_queue(self, price: float, amount: float, ticker: Dict):
+        if self.side == "buy":
+            best, size = ticker["bid"], ticker.get("bidVolume")
+            improves = price > best
+        else:
+            best, size = ticker["ask"], ticker.get("askVolume")
+            improves = price < best
+        ahead = 0.0 if improves else (size or 0.0)
+        self.record.queue_ahead = ahead
+        MAKER_QUEUE_AHEAD.labels(self.maker).observe(ahead / amount)
+
+    def _hedge(self, order: Dict):
+        """Take the other side of whatever has filled and isn't hedged yet"""
+        quantity = self.filled() - self.hedged
+        if quantity <= EPSILON or self.hedge_failed:
+            return
+        fill_time = exchange_clock.quote_time(self.maker, (order.get("lastTradeTimestamp") or 0) / 1000,
+                                              time.time())
+        result = self.manager.create_market_order(self.hedge, self.symbol, self.hedge_side, quantity)
+        if "error" in result:
+            self.hedge_failed = True
+            self.record.error = f"Hedge {self.hedge_side} failed: {result['error']}"
+            logger.error("Maker-taker hedge on %s failed: %s", self.hedge, result["error"])
+            return
+        elapsed = max(time.time() - fill_time, 0.0)
+        MAKER_FILL_TO_HEDGE_SECONDS.labels(self.hedge).observe(elapsed)
+        if self.record.fill_to_hedge is None or elapsed > self.record.fill_to_hedge:
+            self.record.fill_to_hedge = elapsed
+        self.hedge_orders.append(result)
+        self.hedged += _filled(result) or quantity
+
+    def _finish(self):
+        """Cancel what still rests, hedge the rest of the fills and fill in the record"""
+        if self.order is not None:
+            order_id = self.order["id"]
+            canceled = self.manager.cancel_order(self.maker, order_id, self.symbol)
+            if "error" in canceled or canceled.get("filled") is None:
+                canceled = self.manager.get_order_status(self.maker, order_id, self.symbol) or self.order
+            self._settle(canceled)
+            if self.order is not None:
+                # Still open after a failed cancel: keep it in the record and say so
+                self.maker_orders.append(self.order)
+                self.order = None
+                self.record.error = self.record.error or f"Maker order {order_id} may still be open"
+        self._hedge(self.maker_orders[-1] if self.maker_orders else {})
+
+        record = self.record
+        filled = self.filled()
+        maker_leg = summarize(self.maker_orders, self.maker, self.side)
+        hedge_leg = summarize(self.hedge_orders, self.hedge, self.hedge_side)
+        record.buy_order, record.sell_order = (maker_leg, hedge_leg) if self.side == "buy" else (hedge_leg, maker_leg)
+        record.filled = filled
+        record.hedged = self.hedged
+        if filled <= EPSILON:
+            record.status = "expired"
+        elif self.hedge_failed or filled - self.hedged > EPSILON:
+            record.status = "partial"
+            record.error = record.error or f"Unhedged {filled - self.hedged:.8f} on {self.maker}"
+        else:
+            record.status = "completed"
+            record.quantity = filled
+        logger.info("Maker-taker %s %s on %s, hedged on %s: %s, filled %.8f, %d requotes",
+                    self.side, self.symbol, self.maker, self.hedge, record.status, filled, record.requotes)
@@ -0,0 +1,161 @@
+"""
+Background market-data service for the API.
+
+One refresher task owns all upstream price fetching. HTTP and WebSocket
+clients read from its snapshot; symbols that aren't cached yet are fetched
+once no matter how many requests ask for them concurrently (singleflight).
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config.config import settings
+from core.price_monitor import PriceMonitor
+from utils.logger import logger
+
+
+class MarketDataService:
+    """Periodically refreshes watched symbols and serves prices from a snapshot"""
+
+    def __init__(self, price_monitor: PriceMonitor,
+                 interval: float = settings.PRICE_UPDATE_INTERVAL,
+                 symbol_ttl: float = 60.0):
+        self.price_monitor = price_monitor
+        self.interval = interval
+        self.symbol_ttl = symbol_ttl
+        self.snapshot: Dict[str, Dict] = {}
+        self.fetched_at: Dict[str, float] = {}
+        self._watched: Dict[str, float] = {}
+        self._pinned: set = set()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Call `callback(prices)` on the event loop after every refresh"""
+        self._listeners.append(callback)
+
+    # ------------------------------------------------------------------
+    # Watched symbols
+    # ------------------------------------------------------------------
+
+    def watch(self, symbols: Iterable[str], pin: bool = False):
+        """Keep symbols refreshed; unpinned ones expire after `symbol_ttl` idle seconds"""
+        now = time.time()
+        for symbol in symbols:
+            self._watched[symbol] = now
+            if pin:
+                self._pinned.add(symbol)
+
+    def unpin(self, symbols: Iterable[str]):
+        for symbol in symbols:
+            self._pinned.discard(symbol)
+
+    def watched_symbols(self) -> List[str]:
+        now = time.time()
+        expired = [s for s, seen in self._watched.items()
+                   if s not in self._pinned and now - seen > self.symbol_ttl]
+        for symbol in expired:
+            del self._watched[symbol]
+            self.snapshot.pop(symbol, None)
+            self.fetched_at.pop(symbol, None)
+        return sorted(self._watched)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def data_age(self, symbols: Iterable[str]) -> Optional[float]:
+        """Age in seconds of the oldest data among `symbols`"""
+        times = [self.fetched_at[s] for s in symbols if s in self.fetched_at]
+        if not times:
+            return None
+        return max(time.time() - min(times), 0.0)
+
+    async def get_prices(self, symbols: List[str]) -> Tuple[Dict, Optional[float]]:
+        """Return (prices, data_age) for symbols, fetching uncached ones once"""
+        self.watch(symbols)
+        missing = [s for s in symbols if s not in self.snapshot]
+        if missing:
+            await self._fetch(missing)
+        prices = {s: self.snapshot[s] for s in symbols if s in self.snapshot}
+        return prices, self.data_age(symbols)
+
+    # ------------------------------------------------------------------
+    # Upstream fetching
+    # ------------------------------------------------------------------
+
+    async def _fetch(self, symbols: List[str]):
+        """Fetch symbols upstream, joining any fetch already in flight for them"""
+        loop = asyncio.get_running_loop()
+        waiting = []
+        to_fetch = []
+        for symbol in symbols:
+            future = self._inflight.get(symbol)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[symbol] = future
+                to_fetch.append(symbol)
+            waiting.append(future)
+
+        if to_fetch:
+            try:
+                prices = await self.price_monitor.fetch_prices_async(to_fetch)
+                self._store(prices)
+                for symbol in to_fetch:
+                    self._inflight.pop(symbol).set_result(True)
+            except asyncio.CancelledError:
+                # Don't leave joined requests waiting on a fetch that will never finish
+                for symbol in to_fetch:
+                    self._inflight.pop(symbol).cancel()
+                raise
+            except Exception as e:
+                for symbol in to_fetch:
+                    self._inflight.pop(symbol).set_exception(e)
+
+        await asyncio.gather(*waiting, return_exceptions=True)
+
+    def _store(self, prices: Dict):
+        now = time.time()
+        for symbol, exchange_data in prices.items():
+            self.snapshot[symbol] = exchange_data
+            self.fetched_at[symbol] = now
+
+    async def refresh(self):
+        """Refresh every watched symbol in one upstream sweep"""
+        symbols = self.watched_symbols()
+        if not symbols:
+            return
+        await self._fetch(symbols)
+        current = {s: self.snapshot[s] for s in symbols if s in self.snapshot}
+        for callback in self._listeners:
+            try:
+                callback(current)
+            except Exception as e:
+                logger.error("Market data listener failed: %s", e)
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Market data refresh failed: %s", e)
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(self.interval - elapsed, 0.0))
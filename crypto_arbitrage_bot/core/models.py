@@ -0,0 +1,149 @@
+"""
+Compact records for the scan and execution paths.
+
+Quotes, opportunities, profit breakdowns and trade records are built on every
+cycle, so they are `__slots__` classes rather than dicts: no per-instance
+`__dict__`, attribute reads instead of string-key hashing, and a fixed field
+order. They are converted with `to_dict()` only where they leave the bot:
+API responses, WebSocket pushes and database rows.
+
+Exchange and symbol names are interned with `sys.intern` where they enter
+the bot (settings, runtime config, the tick store's registries), so every
+record carries the same string object per name. Dict lookups keyed on them
+still hash the key, but the string's hash is cached and the key comparison
+short-circuits on identity instead of comparing characters.
+"""
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional
+
+
+class Record:
+    """Base for slotted records: equality, repr and dict conversion by field"""
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # One C-level getter for all fields, so conversion doesn't loop in Python
+        cls._values = attrgetter(*cls.__slots__)
+
+    def to_dict(self) -> Dict:
+        return dict(zip(self.__slots__, self._values(self)))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values(self) == other._values(other)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self.__slots__, self._values(self)))
+        return f"{type(self).__name__}({fields})"
+
+
+class Quote(Record):
+    """Top of book on one venue
+
+    `timestamp` is when the venue made the quote on the local clock,
+    `exchange_ts` the venue's own stamp (seconds) and `age` the quote's age
+    when it was received.
+    """
+
+    __slots__ = ("bid", "ask", "last", "bid_size", "ask_size", "timestamp", "exchange_ts", "age")
+
+    def __init__(self, bid: float, ask: float, last: float = 0.0, bid_size: float = 0.0,
+                 ask_size: float = 0.0, timestamp: float = 0.0, exchange_ts: float = 0.0, age: float = 0.0):
+        self.bid = bid
+        self.ask = ask
+        self.last = last
+        self.bid_size = bid_size
+        self.ask_size = ask_size
+        self.timestamp = timestamp
+        self.exchange_ts = exchange_ts
+        self.age = age
+
+
+class Opportunity(Record):
+    """Buy `symbol` at the ask on one venue and sell at the bid on another
+
+    `spread_pct` is net of taker fees; `quote_time` is the timestamp of the
+    older leg.
+    """
+
+    __slots__ = ("symbol", "buy_exchange", "sell_exchange", "buy_price", "sell_price", "spread_pct",
+                 "quote_time")
+
+    def __init__(self, symbol: str, buy_exchange: str, sell_exchange: str, buy_price: float,
+                 sell_price: float, spread_pct: float, quote_time: Optional[float] = None):
+        self.symbol = symbol
+        self.buy_exchange = buy_exchange
+        self.sell_exchange = sell_exchange
+        self.buy_price = buy_price
+        self.sell_price = sell_price
+        self.spread_pct = spread_pct
+        self.quote_time = quote_time
+
+
+class Profit(Record):
+    """Cost, revenue and fees of one arbitrage trade, from `ArbitrageEngine.calculate_profit`"""
+
+    __slots__ = ("buy_cost", "buy_fee", "total_buy_cost", "sell_revenue", "sell_fee", "net_revenue",
+                 "profit_usd", "profit_pct")
+
+    def __init__(self, buy_cost: float, buy_fee: float, total_buy_cost: float, sell_revenue: float,
+                 sell_fee: float, net_revenue: float, profit_usd: float, profit_pct: float):
+        self.buy_cost = buy_cost
+        self.buy_fee = buy_fee
+        self.total_buy_cost = total_buy_cost
+        self.sell_revenue = sell_revenue
+        self.sell_fee = sell_fee
+        self.net_revenue = net_revenue
+        self.profit_usd = profit_usd
+        self.profit_pct = profit_pct
+
+
+class TradeRecord(Record):
+    """Both legs of one executed arbitrage trade
+
+    `buy_order` / `sell_order` are the exchanges' order structures; `status`
+    is pending, completed, partial (second leg failed), failed or expired
+    (a maker order that never filled). Maker-taker trades also carry how
+    often the maker order was repriced, the size queued ahead of its last
+    placement, the slowest fill-to-hedge time in seconds, and how much the
+    maker leg filled and the taker leg hedged.
+    """
+
+    __slots__ = ("trade_id", "timestamp", "symbol", "quantity", "buy_exchange", "sell_exchange",
+                 "buy_order", "sell_order", "status", "error", "pnl", "mode", "requotes", "queue_ahead",
+                 "fill_to_hedge", "filled", "hedged")
+
+    def __init__(self, trade_id: str, timestamp: str, symbol: str, quantity: float,
+                 buy_exchange: str, sell_exchange: str, buy_order: Optional[Dict] = None,
+                 sell_order: Optional[Dict] = None, status: str = "pending",
+                 error: Optional[str] = None, pnl: float = 0.0, mode: str = "taker"):
+        self.trade_id = trade_id
+        self.timestamp = timestamp
+        self.symbol = symbol
+        self.quantity = quantity
+        self.buy_exchange = buy_exchange
+        self.sell_exchange = sell_exchange
+        self.buy_order = buy_order
+        self.sell_order = sell_order
+        self.status = status
+        self.error = error
+        self.pnl = pnl
+        self.mode = mode
+        self.requotes = 0
+        self.queue_ahead: Optional[float] = None
+        self.fill_to_hedge: Optional[float] = None
+        self.filled: Optional[float] = None
+        self.hedged: Optional[float] = None
+
+
+def prices_to_dict(prices: Dict[str, Dict[str, Quote]]) -> Dict[str, Dict[str, Dict]]:
+    """{symbol: {exchange: Quote}} as plain dicts, for JSON"""
+    return {symbol: {name: quote.to_dict() for name, quote in quotes.items()}
+            for symbol, quotes in prices.items()}
+
+
+def to_dicts(records: Iterable[Record]) -> List[Dict]:
+    return [record.to_dict() for record in records]
@@ -0,0 +1,93 @@
+"""
+Continuous opportunity detection for the API.
+
+Runs detection once per market-data refresh and publishes the result as an
+immutable, versioned snapshot. Readers filter the snapshot instead of
+re-running detection on every request.
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+from core.market_data import MarketDataService
+from core.models import Opportunity
+from core.price_monitor import PriceMonitor
+from utils.logger import logger
+
+
+class OpportunitySnapshot:
+    """One detection pass over a market-data refresh"""
+
+    __slots__ = ("version", "generated_at", "data_age", "opportunities")
+
+    def __init__(self, version: int, generated_at: float, data_age: Optional[float],
+                 opportunities: List[Opportunity]):
+        self.version = version
+        self.generated_at = generated_at
+        self.data_age = data_age
+        self.opportunities = opportunities
+
+    def filter(self, symbol: Optional[str] = None, venue: Optional[str] = None,
+               min_spread: Optional[float] = None, limit: Optional[int] = None) -> List[Opportunity]:
+        """Opportunities matching the filters, best first"""
+        result = []
+        for opp in self.opportunities:
+            if symbol and opp.symbol != symbol:
+                continue
+            if venue and venue not in (opp.buy_exchange, opp.sell_exchange):
+                continue
+            if min_spread is not None and opp.spread_pct < min_spread:
+                # Sorted by spread, so nothing after this can match either
+                break
+            result.append(opp)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+
+class OpportunityService:
+    """Detects opportunities on every market-data refresh"""
+
+    def __init__(self, price_monitor: PriceMonitor, market_data: MarketDataService,
+                 symbols: List[str], min_spread: float = 0.0, max_age: Optional[float] = None):
+        self.price_monitor = price_monitor
+        self.market_data = market_data
+        self.symbols = list(symbols)
+        # Snapshot floor; requests can only narrow it with a higher min_spread
+        self.min_spread = min_spread
+        # Quotes older than this many seconds are left out of detection
+        self.max_age = max_age
+        self.snapshot = OpportunitySnapshot(0, 0.0, None, [])
+        self._listeners: List[Callable[[OpportunitySnapshot], None]] = []
+
+    def start(self):
+        """Keep the scanned symbols refreshed and detect on every refresh"""
+        self.market_data.watch(self.symbols, pin=True)
+        self.market_data.add_listener(self.update)
+
+    def set_symbols(self, symbols: List[str]):
+        """Change the scanned symbols, keeping data for ones that stay"""
+        removed = [s for s in self.symbols if s not in symbols]
+        self.market_data.unpin(removed)
+        self.market_data.watch(symbols, pin=True)
+        self.symbols = list(symbols)
+
+    def add_listener(self, callback: Callable[[OpportunitySnapshot], None]):
+        self._listeners.append(callback)
+
+    def update(self, prices: Dict):
+        """Run detection on a refresh and publish the new snapshot"""
+        opportunities = self.price_monitor.detect_opportunities(
+            prices, min_spread=self.min_spread, limit=None, max_age=self.max_age
+        )
+        # Swap in a new object so readers never see a half-built snapshot
+        self.snapshot = OpportunitySnapshot(
+            version=self.snapshot.version + 1,
+            generated_at=time.time(),
+            data_age=self.market_data.data_age(prices.keys()),
+            opportunities=opportunities
+        )
+        for callback in self._listeners:
+            try:
+                callback(self.snapshot)
+            except Exception as e:
+                logger.error("Opportunity listener failed: %s", e)
@@ -1,20 +1,65 @@
 """
 Real-time price monitoring across exchanges.
+
+Quote timestamps are on the local clock: each venue's timestamp is shifted
+by its estimated clock offset (exchanges/clock.py), so quotes from different
+venues compare and `age` is how long ago the venue made the quote.
 """
-from typing import Dict, List
-from exchanges.exchange_manager import ExchangeManager
+from typing import Dict, List, Optional
+from core.fee_schedule import FeeSchedule
+from core.models import Opportunity, Quote
+from exchanges.clock import exchange_clock
 from utils.logger import logger
+from utils.metrics import PRICE_CYCLE_SECONDS, OPPORTUNITIES_PER_CYCLE, STALE_QUOTES
+from utils.profiling import timed
+from operator import attrgetter
 import time
 
+_by_spread = attrgetter("spread_pct")
+
 class PriceMonitor:
-    def __init__(self):
-        self.exchange_manager = ExchangeManager()
+    def __init__(self, exchange_manager=None, tick_store=None, fees: Optional[FeeSchedule] = None):
+        if exchange_manager is None:
+            # Imported here so callers that pass a manager never load sync ccxt
+            from exchanges.exchange_manager import ExchangeManager
+            exchange_manager = ExchangeManager()
+        self.exchange_manager = exchange_manager
+        self.tick_store = tick_store
+        self.fees = fees or FeeSchedule(list(exchange_manager.exchanges.keys()))
         self.price_cache = {}
         self.last_update = {}
         self.update_interval = 2  # seconds
     
+    @staticmethod
+    def _to_quote(ticker: Dict, exchange: Optional[str] = None, received: Optional[float] = None) -> Quote:
+        """Reduce a ccxt ticker to the top-of-book fields the bot uses"""
+        if received is None:
+            received = time.time()
+        # ccxt timestamps are milliseconds
+        exchange_ts = (ticker.get("timestamp") or 0) / 1000
+        timestamp = exchange_clock.quote_time(exchange, exchange_ts, received)
+        return Quote(
+            ticker.get("bid", 0),
+            ticker.get("ask", 0),
+            ticker.get("last", 0),
+            ticker.get("bidVolume") or 0,
+            ticker.get("askVolume") or 0,
+            timestamp,
+            exchange_ts,
+            received - timestamp
+        )
+    
+    def _store_prices(self, symbols: List[str], prices: Dict):
+        if self.tick_store:
+            self.tick_store.record_prices(prices)
+        
+        self.price_cache = prices
+        self.last_update[str(symbols)] = time.time()
+    
+    @timed
     def fetch_prices(self, symbols: List[str]) -> Dict:
-        """Fetch prices from all exchanges for given symbols"""
+        """Fetch prices from all exchanges for given symbols as {symbol: {exchange: Quote}}"""
+        started = time.perf_counter()
         prices = {}
         
         for symbol in symbols:
@@ -22,15 +67,25 @@ class PriceMonitor:
             for exchange_name in self.exchange_manager.exchanges.keys():
                 ticker = self.exchange_manager.get_ticker(exchange_name, symbol)
                 if ticker:
-                    prices[symbol][exchange_name] = {
-                        "bid": ticker.get("bid", 0),
-                        "ask": ticker.get("ask", 0),
-                        "last": ticker.get("last", 0),
-                        "timestamp": ticker.get("timestamp", time.time())
-                    }
+                    prices[symbol][exchange_name] = self._to_quote(ticker, exchange_name)
         
-        self.price_cache = prices
-        self.last_update[str(symbols)] = time.time()
+        self._store_prices(symbols, prices)
+        PRICE_CYCLE_SECONDS.observe(time.perf_counter() - started)
+        return prices
+    
+    @timed
+    async def fetch_prices_async(self, symbols: List[str]) -> Dict:
+        """Fetch prices concurrently; requires an AsyncExchangeManager"""
+        started = time.perf_counter()
+        tickers = await self.exchange_manager.get_tickers(symbols)
+        received = time.time()
+        prices = {
+            symbol: {name: self._to_quote(ticker, name, received) for name, ticker in exchange_tickers.items()}
+            for symbol, exchange_tickers in tickers.items()
+        }
+        
+        self._store_prices(symbols, prices)
+        PRICE_CYCLE_SECONDS.observe(time.perf_counter() - started)
         return prices
     
     def get_cached_prices(self, symbols: List[str]) -> Dict:
@@ -39,43 +94,81 @@ class PriceMonitor:
     
     def calculate_spread(self, buy_exchange: str, sell_exchange: str, 
                         buy_price: float, sell_price: float,
-                        buy_fee: float = 0.001, sell_fee: float = 0.001) -> float:
-        """Calculate net spread percentage"""
+                        buy_fee: Optional[float] = None, sell_fee: Optional[float] = None,
+                        symbol: Optional[str] = None) -> float:
+        """Calculate net spread percentage (fees default to the venues' taker rates)"""
         if buy_price <= 0:
             return 0
+        if buy_fee is None:
+            buy_fee = self.fees.taker(buy_exchange, symbol)
+        if sell_fee is None:
+            sell_fee = self.fees.taker(sell_exchange, symbol)
         spread = ((sell_price - buy_price) / buy_price) * 100 - (buy_fee * 100) - (sell_fee * 100)
         return spread
     
-    def detect_opportunities(self, prices: Dict, min_spread: float = 0.3) -> List[Dict]:
-        """Detect arbitrage opportunities"""
+    @timed
+    def detect_opportunities(self, prices: Dict, min_spread: float = 0.3,
+                             limit: Optional[int] = 10, max_age: Optional[float] = None,
+                             now: Optional[float] = None, maker: bool = False) -> List[Opportunity]:
+        """Detect arbitrage opportunities, best first (pass limit=None for all)
+
+        With `max_age`, quotes made more than that many seconds before `now`
+        (default: the current time) are left out. With `maker`, spreads are
+        net of maker-taker fees: one leg rests as a post-only order on
+        whichever venue makes the pair cheaper (see core/maker_taker.py).
+        """
         opportunities = []
         exchanges = list(self.exchange_manager.exchanges.keys())
+        if exchanges != self.fees.exchanges:
+            self.fees.set_exchanges(exchanges)
+        
+        fee_row = self.fees.taker_pct_row
+        maker_row = self.fees.maker_pct_row if maker else fee_row
+        index = self.fees.index
+        # Quotes stamped before this are too old to trade on
+        oldest = None
+        if max_age is not None:
+            oldest = (now if now is not None else time.time()) - max_age
+        stale = 0
         
         for symbol, exchange_data in prices.items():
-            for buy_ex in exchanges:
-                for sell_ex in exchanges:
-                    if buy_ex == sell_ex:
-                        continue
-                    
-                    if buy_ex not in exchange_data or sell_ex not in exchange_data:
+            # Fees in percent, indexed like `exchanges`
+            fees = fee_row(symbol)
+            maker_fees = maker_row(symbol)
+            legs = []
+            for name, quote in exchange_data.items():
+                i = index.get(name)
+                if i is None:
+                    continue
+                ts = quote.timestamp or 0
+                if oldest is not None and ts < oldest:
+                    stale += 1
+                    continue
+                legs.append((name, quote.ask or 0, quote.bid or 0, fees[i], maker_fees[i], ts))
+            
+            for buy_ex, buy_ask, _, buy_fee, buy_maker, buy_ts in legs:
+                if buy_ask <= 0:
+                    continue
+                for sell_ex, _, sell_bid, sell_fee, sell_maker, sell_ts in legs:
+                    if sell_ex == buy_ex or sell_bid <= 0:
                         continue
                     
-                    buy_ask = exchange_data[buy_ex].get("ask", 0)
-                    sell_bid = exchange_data[sell_ex].get("bid", 0)
-                    
-                    if buy_ask <= 0 or sell_bid <= 0:
-                        continue
-                    
-                    spread = self.calculate_spread(buy_ex, sell_ex, buy_ask, sell_bid)
+                    fee = buy_fee + sell_fee
+                    if maker:
+                        fee = min(buy_maker + sell_fee, buy_fee + sell_maker)
+                    spread = (sell_bid - buy_ask) / buy_ask * 100 - fee
                     
                     if spread >= min_spread:
-                        opportunities.append({
-                            "symbol": symbol,
-                            "buy_exchange": buy_ex,
-                            "sell_exchange": sell_ex,
-                            "buy_price": buy_ask,
-                            "sell_price": sell_bid,
-                            "spread_pct": spread
-                        })
+                        opportunities.append(Opportunity(
+                            symbol, buy_ex, sell_ex, buy_ask, sell_bid, spread,
+                            buy_ts if buy_ts < sell_ts else sell_ts
+                        ))
+        
+        if stale:
+            STALE_QUOTES.labels("detection").inc(stale)
+        OPPORTUNITIES_PER_CYCLE.observe(len(opportunities))
+        if self.tick_store and opportunities:
+            self.tick_store.record_opportunities(opportunities)
         
-        return sorted(opportunities, key=lambda x: x["spread_pct"], reverse=True)[:10]
+        opportunities.sort(key=_by_spread, reverse=True)
+        return opportunities[:limit] if limit is not None else opportunities
@@ -2,7 +2,10 @@
 Risk management and circuit breaker logic.
 """
 from typing import Dict
+from core.models import TradeRecord
 from utils.logger import logger
+from utils.metrics import RISK_DENIALS
+from utils.profiling import timed
 from datetime import datetime, timedelta
 
 class RiskManager:
@@ -14,47 +17,65 @@ class RiskManager:
         self.failed_trades_count = 0
         self.last_trade_time = None
         self.circuit_breaker_active = False
+        self.breaker_reason = None
         self.trade_history = []
     
-    def record_trade(self, trade_result: Dict) -> bool:
+    @timed
+    def record_trade(self, trade: TradeRecord) -> bool:
         """Record a trade and check risk limits"""
-        pnl = trade_result.get("pnl", 0)
+        return self.record_result(trade.pnl or 0, trade.status)
+    
+    def record_result(self, pnl: float, status: str) -> bool:
+        """Record a trade's outcome and check risk limits"""
         self.daily_pnl += pnl
         self.last_trade_time = datetime.now()
         self.trade_history.append({
             "timestamp": datetime.now().isoformat(),
             "pnl": pnl,
-            "status": trade_result.get("status", "unknown")
+            "status": status
         })
         
-        if trade_result.get("status") == "failed":
+        if status == "failed":
             self.failed_trades_count += 1
         
         return self.check_risk_limits()
     
+    @timed
     def check_risk_limits(self) -> bool:
         """Check if risk limits are exceeded"""
         if self.daily_pnl <= self.daily_loss_limit:
-            logger.warning(f"Daily loss limit reached: {self.daily_pnl}")
+            logger.warning("Daily loss limit reached: %s", self.daily_pnl)
             self.circuit_breaker_active = True
+            self.breaker_reason = "daily_loss_limit"
             return False
         
         if self.total_exposure > self.max_exposure:
-            logger.warning(f"Max exposure exceeded: {self.total_exposure}")
+            logger.warning("Max exposure exceeded: %s", self.total_exposure)
             self.circuit_breaker_active = True
+            self.breaker_reason = "max_exposure"
             return False
         
         if self.failed_trades_count > 3:
-            logger.warning(f"Too many failed trades: {self.failed_trades_count}")
+            logger.warning("Too many failed trades: %s", self.failed_trades_count)
             self.circuit_breaker_active = True
+            self.breaker_reason = "failed_trades"
             return False
         
         self.circuit_breaker_active = False
+        self.breaker_reason = None
         return True
     
+    def load_daily_stats(self, stats: Dict) -> None:
+        """Seed today's P&L from precomputed daily statistics"""
+        self.daily_pnl = stats.get("total_pnl", 0.0)
+        self.check_risk_limits()
+    
     def can_trade(self) -> bool:
         """Check if trading is allowed"""
-        return not self.circuit_breaker_active
+        if self.circuit_breaker_active:
+            RISK_DENIALS.labels(self.breaker_reason or "circuit_breaker").inc()
+            return False
+        return True
     
     def reset_daily_stats(self) -> None:
         """Reset daily statistics"""
@@ -70,5 +91,6 @@ class RiskManager:
             "total_exposure": self.total_exposure,
             "failed_trades": self.failed_trades_count,
             "circuit_breaker_active": self.circuit_breaker_active,
-            "can_trade": self.can_trade()
+            "breaker_reason": self.breaker_reason,
+            "can_trade": not self.circuit_breaker_active
         }
@@ -0,0 +1,249 @@
+"""
+Multi-process symbol sharding.
+
+Each shard worker process owns a subset of the symbols: it runs its own async
+exchange clients, fetches and parses their tickers and writes top-of-book
+quotes into the shared quote matrix. The bot process only reads the matrix
+and runs detection over it as NumPy array operations, so feed handling and
+parsing scale with the number of cores. Workers keep their own venue clock
+estimates and write quote times on the local clock.
+"""
+import asyncio
+import multiprocessing
+import signal
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from core.fee_schedule import FeeSchedule
+from core.models import Opportunity
+from core.shared_quotes import SharedQuoteMatrix
+from config.config import settings
+from core.supervisor import run_every
+from exchanges.ccxt_wrapper import AsyncExchangeManager
+from exchanges.clock import exchange_clock
+from utils.logger import logger
+from utils.metrics import OPPORTUNITIES_PER_CYCLE, STALE_QUOTES
+from utils.profiling import timed
+
+
+def shard_symbols(symbols: List[str], workers: int) -> List[List[str]]:
+    """Split symbols round-robin into at most `workers` non-empty shards"""
+    workers = max(1, min(workers, len(symbols)))
+    return [symbols[i::workers] for i in range(workers)]
+
+
+# ----------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------
+
+def run_worker(matrix_name: str, symbols: List[str], exchanges: List[str], shard: List[str],
+               interval: float, manager_factory: Callable = AsyncExchangeManager):
+    """Process entry point: keep this shard's quotes in the matrix fresh"""
+    # Ctrl+C reaches the whole process group; the supervisor decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_worker_main(matrix_name, symbols, exchanges, shard, interval, manager_factory))
+
+
+async def _worker_main(matrix_name: str, symbols: List[str], exchanges: List[str],
+                       shard: List[str], interval: float, manager_factory: Callable):
+    task = asyncio.current_task()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+
+    matrix = SharedQuoteMatrix(symbols, exchanges, name=matrix_name)
+    manager = manager_factory()
+    rows = {symbol: matrix.symbol_index[symbol] for symbol in shard}
+    columns = {name: matrix.exchange_index[name] for name in manager.exchanges
+               if name in matrix.exchange_index}
+
+    async def step():
+        tickers = await manager.get_tickers(shard)
+        received = time.time()
+        for symbol, by_exchange in tickers.items():
+            row = rows[symbol]
+            for name, ticker in by_exchange.items():
+                column = columns.get(name)
+                if column is None:
+                    continue
+                ts = exchange_clock.quote_time(name, (ticker.get("timestamp") or 0) / 1000, received)
+                matrix.write(row, column, ticker.get("bid") or 0.0, ticker.get("ask") or 0.0,
+                             ticker.get("bidVolume") or 0.0, ticker.get("askVolume") or 0.0, ts)
+
+    async def sync_clocks():
+        await exchange_clock.sync(manager)
+
+    clock_task = asyncio.create_task(run_every(lambda: settings.CLOCK_SYNC_INTERVAL, sync_clocks))
+    try:
+        await run_every(lambda: interval, step)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        clock_task.cancel()
+        await manager.close()
+        matrix.close()
+
+
+# ----------------------------------------------------------------------
+# Supervisor (bot process)
+# ----------------------------------------------------------------------
+
+class ShardSupervisor:
+    """Owns the quote matrix and keeps one worker process per shard alive"""
+
+    def __init__(self, symbols: List[str], exchanges: List[str], workers: int, interval: float,
+                 manager_factory: Callable = AsyncExchangeManager, max_backoff: float = 30.0):
+        self.symbols = list(symbols)
+        self.exchanges = list(exchanges)
+        self.interval = interval
+        self.manager_factory = manager_factory
+        self.max_backoff = max_backoff
+        self.matrix = SharedQuoteMatrix(self.symbols, self.exchanges, create=True)
+        self.shards = shard_symbols(self.symbols, workers)
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * len(self.shards)
+        self.restarts = [0] * len(self.shards)
+        self._retry_at = [0.0] * len(self.shards)
+        self._started_at = [0.0] * len(self.shards)
+        # Spawn, not fork: each worker builds its own clients and event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = False
+
+    def start(self):
+        for index in range(len(self.shards)):
+            self._spawn(index)
+        logger.info("Started %d shard workers for %d symbols", len(self.shards), len(self.symbols))
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.matrix.name, self.symbols, self.exchanges, self.shards[index],
+                  self.interval, self.manager_factory),
+            name=f"shard-{index}",
+            daemon=True
+        )
+        process.start()
+        self.processes[index] = process
+        self._started_at[index] = time.monotonic()
+
+    def check(self) -> int:
+        """Restart dead workers (with backoff); returns how many were restarted"""
+        if self._stopping:
+            return 0
+        restarted = 0
+        now = time.monotonic()
+        for index, process in enumerate(self.processes):
+            if process is None or process.is_alive():
+                continue
+            if self._retry_at[index] == 0.0:
+                # Workers that stayed up for a while start over with a short backoff
+                if now - self._started_at[index] > self.max_backoff:
+                    self.restarts[index] = 0
+                backoff = min(2 ** self.restarts[index], self.max_backoff)
+                self._retry_at[index] = now + backoff
+                logger.error("Shard worker %d exited with code %s; restarting in %.0fs",
+                             index, process.exitcode, backoff)
+            if now >= self._retry_at[index]:
+                self._retry_at[index] = 0.0
+                self.restarts[index] += 1
+                self._spawn(index)
+                restarted += 1
+        return restarted
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping = True
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.matrix.close()
+
+
+# ----------------------------------------------------------------------
+# Detection over the matrix
+# ----------------------------------------------------------------------
+
+class MatrixDetector:
+    """Vectorized cross-exchange detection over the shared quote matrix"""
+
+    def __init__(self, matrix: SharedQuoteMatrix, fees: Optional[FeeSchedule] = None):
+        self.matrix = matrix
+        self.fees = fees or FeeSchedule(matrix.exchanges)
+        self._fee_version = None
+        self._fee_maker = None
+        n = len(matrix.exchanges)
+        self._other_venue = ~np.eye(n, dtype=bool)[None, :, :]
+
+    def _fee_pct(self, maker: bool = False) -> np.ndarray:
+        """fee_pct[s, i, j]: fees in percent for buying on i and selling on j
+
+        Both legs pay taker fees, or with `maker` one leg pays the maker
+        rate, on whichever venue makes the pair cheaper.
+        """
+        if self._fee_version != self.fees.version or self._fee_maker != maker:
+            m = self.matrix
+            taker = self.fees.taker_matrix(m.symbols, m.exchanges) * 100
+            if maker:
+                rest = self.fees.maker_matrix(m.symbols, m.exchanges) * 100
+                cube = np.minimum(rest[:, :, None] + taker[:, None, :], taker[:, :, None] + rest[:, None, :])
+            else:
+                cube = taker[:, :, None] + taker[:, None, :]
+            self._fee_pct_cube = cube
+            self._fee_version = self.fees.version
+            self._fee_maker = maker
+        return self._fee_pct_cube
+
+    @timed
+    def detect(self, min_spread: float, max_age: float, limit: Optional[int] = 10,
+               maker: bool = False) -> List[Opportunity]:
+        """Opportunities from quotes younger than `max_age` seconds, best first
+
+        `maker` nets spreads of maker-taker fees, as in
+        PriceMonitor.detect_opportunities.
+
+        Spreads are computed on views into shared memory; cells whose seqlock
+        shows a concurrent write are dropped and picked up on the next pass.
+        """
+        m = self.matrix
+        before = m.begin_read()
+        bid, ask, ts = m.bid, m.ask, m.ts
+        quoted = (bid > 0) & (ask > 0)
+        fresh = time.time() - ts <= max_age
+        live = quoted & fresh
+        stale = int(np.count_nonzero(quoted & ~fresh))
+        if stale:
+            STALE_QUOTES.labels("detection").inc(stale)
+
+        # spread[s, i, j]: buy symbol s on exchange i at the ask, sell on j at the bid
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spread = (bid[:, None, :] - ask[:, :, None]) / ask[:, :, None] * 100 - self._fee_pct(maker)
+        candidates = live[:, :, None] & live[:, None, :] & self._other_venue & (spread >= min_spread)
+        s_idx, buy_idx, sell_idx = np.nonzero(candidates)
+        buy_prices = ask[s_idx, buy_idx]
+        sell_prices = bid[s_idx, sell_idx]
+        spreads = spread[s_idx, buy_idx, sell_idx]
+        quote_times = np.minimum(ts[s_idx, buy_idx], ts[s_idx, sell_idx])
+
+        valid = m.valid_after(before)
+        keep = valid[s_idx, buy_idx] & valid[s_idx, sell_idx]
+        order = np.argsort(-spreads[keep], kind="stable")
+        if limit is not None:
+            order = order[:limit]
+
+        s_idx, buy_idx, sell_idx = s_idx[keep][order], buy_idx[keep][order], sell_idx[keep][order]
+        buy_prices, sell_prices, spreads = buy_prices[keep][order], sell_prices[keep][order], spreads[keep][order]
+        quote_times = quote_times[keep][order]
+        OPPORTUNITIES_PER_CYCLE.observe(int(keep.sum()))
+        symbols, exchanges = m.symbols, m.exchanges
+        return [
+            Opportunity(symbols[s], exchanges[b], exchanges[x], bp, sp, sd, qt)
+            for s, b, x, bp, sp, sd, qt in zip(s_idx.tolist(), buy_idx.tolist(), sell_idx.tolist(),
+                                               buy_prices.tolist(), sell_prices.tolist(), spreads.tolist(),
+                                               quote_times.tolist())
+        ]
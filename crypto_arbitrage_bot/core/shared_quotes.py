@@ -0,0 +1,108 @@
+"""
+Shared-memory top-of-book matrix for multi-process sharding.
+
+One shared-memory block holds a (symbols x exchanges) column for each field:
+seq, bid, ask, bid_size, ask_size and ts. Every cell has exactly one writer
+(the shard worker that owns the symbol), so a seqlock is enough for
+consistency: the writer makes `seq` odd, writes the fields, then makes it
+even again. Readers work on NumPy views straight into the block and discard
+cells whose sequence was odd or changed while they were reading.
+"""
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+FIELDS = (
+    ("seq", np.uint64),
+    ("bid", np.float64),
+    ("ask", np.float64),
+    ("bid_size", np.float64),
+    ("ask_size", np.float64),
+    ("ts", np.float64),
+)
+
+
+class SharedQuoteMatrix:
+    """Bid/ask/timestamp matrix in shared memory, indexed by symbol and exchange"""
+
+    def __init__(self, symbols: List[str], exchanges: List[str], name: Optional[str] = None,
+                 create: bool = False):
+        self.symbols = list(symbols)
+        self.exchanges = list(exchanges)
+        self.symbol_index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.exchange_index: Dict[str, int] = {e: i for i, e in enumerate(self.exchanges)}
+        shape = (len(self.symbols), len(self.exchanges))
+        cell_count = max(shape[0] * shape[1], 1)
+        size = cell_count * sum(np.dtype(dtype).itemsize for _, dtype in FIELDS)
+
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        offset = 0
+        for field, dtype in FIELDS:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, field, array)
+            offset += cell_count * np.dtype(dtype).itemsize
+        if create:
+            for field, _ in FIELDS:
+                getattr(self, field).fill(0)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # ------------------------------------------------------------------
+    # Writer side (one writer per symbol row)
+    # ------------------------------------------------------------------
+
+    def write(self, symbol: int, exchange: int, bid: float, ask: float,
+              bid_size: float, ask_size: float, ts: float):
+        seq = self.seq
+        seq[symbol, exchange] += 1  # odd: write in progress
+        self.bid[symbol, exchange] = bid
+        self.ask[symbol, exchange] = ask
+        self.bid_size[symbol, exchange] = bid_size
+        self.ask_size[symbol, exchange] = ask_size
+        self.ts[symbol, exchange] = ts
+        seq[symbol, exchange] += 1  # even: consistent again
+
+    # ------------------------------------------------------------------
+    # Reader side
+    # ------------------------------------------------------------------
+
+    def begin_read(self) -> np.ndarray:
+        """Sequence numbers to validate a read against (a small copy)"""
+        return self.seq.copy()
+
+    def valid_after(self, before: np.ndarray) -> np.ndarray:
+        """Mask of cells that were not being written and didn't change since `before`"""
+        return ((before & 1) == 0) & (self.seq == before)
+
+    def read_cell(self, symbol: int, exchange: int, retries: int = 100) -> Optional[Dict]:
+        """Consistent copy of one cell, or None if it never settled"""
+        for _ in range(retries):
+            before = int(self.seq[symbol, exchange])
+            if before & 1:
+                continue
+            quote = {
+                "bid": float(self.bid[symbol, exchange]),
+                "ask": float(self.ask[symbol, exchange]),
+                "bid_size": float(self.bid_size[symbol, exchange]),
+                "ask_size": float(self.ask_size[symbol, exchange]),
+                "timestamp": float(self.ts[symbol, exchange]),
+            }
+            if int(self.seq[symbol, exchange]) == before:
+                return quote
+        return None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def close(self):
+        # Drop the views before closing the buffer they point into
+        for field, _ in FIELDS:
+            setattr(self, field, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,64 @@
+"""
+Helpers for running the bot as supervised asyncio tasks.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from utils.logger import logger
+
+
+async def supervise(name: str, factory: Callable[[], Awaitable[None]],
+                    max_backoff: float = 30.0):
+    """Run `factory()` forever, restarting it with backoff if it crashes
+
+    Cancellation is passed through so the task can be shut down cleanly.
+    """
+    backoff = 1.0
+    while True:
+        started = time.monotonic()
+        try:
+            await factory()
+            logger.warning("Task %s exited; restarting", name)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Task %s crashed; restarting in %.0fs", name, backoff)
+        # A task that ran for a while before failing starts over with a short delay
+        if time.monotonic() - started > max_backoff:
+            backoff = 1.0
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, max_backoff)
+
+
+async def run_every(interval: Callable[[], float], step: Callable[[], Awaitable[None]]):
+    """Call `step()` on a fixed cadence of `interval()` seconds
+
+    The cadence is measured start to start. If a step overruns, missed ticks
+    are skipped rather than run back to back.
+    """
+    next_run = time.monotonic()
+    while True:
+        await step()
+        period = interval()
+        next_run += period
+        now = time.monotonic()
+        if next_run < now:
+            next_run = now + period - ((now - next_run) % period)
+        await asyncio.sleep(next_run - now)
+
+
+def put_latest(queue: asyncio.Queue, item) -> bool:
+    """Put without waiting, evicting the oldest item if the queue is full
+
+    Returns False if something was evicted.
+    """
+    evicted = False
+    while True:
+        try:
+            queue.put_nowait(item)
+            return not evicted
+        except asyncio.QueueFull:
+            queue.get_nowait()
+            queue.task_done()
+            evicted = True
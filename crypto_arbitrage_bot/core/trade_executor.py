@@ -1,58 +1,109 @@
 """
 Trade execution module for placing and monitoring orders.
 """
-from typing import Dict
-from exchanges.exchange_manager import ExchangeManager
+from typing import Dict, List
+from config.config import settings
+from core.maker_taker import MakerTaker
+from core.models import TradeRecord
 from utils.logger import logger
+from utils.metrics import TRADE_SECONDS, TRADE_OUTCOMES
+from utils.profiling import timed
 from datetime import datetime
+import time
 
 class TradeExecutor:
-    def __init__(self):
-        self.exchange_manager = ExchangeManager()
+    def __init__(self, exchange_manager=None, fees=None):
+        if exchange_manager is None:
+            from exchanges.exchange_manager import ExchangeManager
+            exchange_manager = ExchangeManager()
+        if fees is None:
+            from core.fee_schedule import FeeSchedule
+            fees = FeeSchedule(list(exchange_manager.exchanges), default=settings.DEFAULT_FEE)
+        self.exchange_manager = exchange_manager
+        self.maker_taker = MakerTaker(
+            exchange_manager, fees,
+            requote_interval=settings.MAKER_REQUOTE_INTERVAL_MS / 1000,
+            requote_bps=settings.MAKER_REQUOTE_BPS,
+            timeout=settings.MAKER_TIMEOUT
+        )
         self.trade_history = []
         self.active_orders = {}
     
+    @timed
     def execute_arbitrage_trade(self, buy_exchange: str, sell_exchange: str,
-                               symbol: str, quantity: float) -> Dict:
+                               symbol: str, quantity: float) -> TradeRecord:
         """Execute buy and sell orders for arbitrage"""
+        started = time.perf_counter()
+        trade_record = self._execute_legs(buy_exchange, sell_exchange, symbol, quantity)
+        TRADE_SECONDS.observe(time.perf_counter() - started)
+        TRADE_OUTCOMES.labels(trade_record.status).inc()
+        return trade_record
+    
+    @timed
+    def execute_maker_taker(self, buy_exchange: str, sell_exchange: str, symbol: str,
+                            quantity: float, min_spread: float) -> TradeRecord:
+        """Rest the cheaper-fee leg as a post-only order and hedge its fills as taker"""
+        started = time.perf_counter()
+        trade_record = self._new_record(buy_exchange, sell_exchange, symbol, quantity, "maker_taker")
+        if trade_record.status != "failed":
+            self.maker_taker.execute(trade_record, min_spread)
+            self.trade_history.append(trade_record)
+        TRADE_SECONDS.observe(time.perf_counter() - started)
+        TRADE_OUTCOMES.labels(trade_record.status).inc()
+        return trade_record
+    
+    def stop(self):
+        """Wind down a resting maker order early (shutdown); no maker-taker trades after this"""
+        self.maker_taker.stop()
+    
+    def _new_record(self, buy_exchange: str, sell_exchange: str, symbol: str,
+                    quantity: float, mode: str = "taker") -> TradeRecord:
+        """A pending trade record, already failed if either venue is out of service"""
         trade_id = f"{datetime.now().timestamp()}"
-        trade_record = {
-            "trade_id": trade_id,
-            "timestamp": datetime.now().isoformat(),
-            "symbol": symbol,
-            "quantity": quantity,
-            "buy_exchange": buy_exchange,
-            "sell_exchange": sell_exchange,
-            "buy_order": None,
-            "sell_order": None,
-            "status": "pending",
-            "error": None
-        }
+        trade_record = TradeRecord(trade_id, datetime.utcnow().isoformat(), symbol, quantity,
+                                   buy_exchange, sell_exchange, mode=mode)
+        
+        # Don't start a trade whose second leg would go to a venue out of service
+        health = getattr(self.exchange_manager, "health", None)
+        if health:
+            down = [name for name in (buy_exchange, sell_exchange) if not health.available(name)]
+            if down:
+                trade_record.error = f"Exchange out of service: {', '.join(down)}"
+                trade_record.status = "failed"
+                self.trade_history.append(trade_record)
+                logger.warning("Skipped trade: %s", trade_record.error)
+        return trade_record
+    
+    def _execute_legs(self, buy_exchange: str, sell_exchange: str,
+                      symbol: str, quantity: float) -> TradeRecord:
+        trade_record = self._new_record(buy_exchange, sell_exchange, symbol, quantity)
+        if trade_record.status == "failed":
+            return trade_record
         
         buy_result = self.exchange_manager.create_market_order(
             buy_exchange, symbol, "buy", quantity
         )
         
         if "error" in buy_result:
-            trade_record["error"] = f"Buy failed: {buy_result['error']}"
-            trade_record["status"] = "failed"
+            trade_record.error = f"Buy failed: {buy_result['error']}"
+            trade_record.status = "failed"
             self.trade_history.append(trade_record)
-            logger.error(f"Buy order failed: {buy_result['error']}")
+            logger.error("Buy order failed: %s", buy_result["error"])
             return trade_record
         
-        trade_record["buy_order"] = buy_result
+        trade_record.buy_order = buy_result
         
         sell_result = self.exchange_manager.create_market_order(
             sell_exchange, symbol, "sell", quantity
         )
         
         if "error" in sell_result:
-            trade_record["error"] = f"Sell failed: {sell_result['error']}"
-            trade_record["status"] = "partial"
-            logger.error(f"Sell order failed: {sell_result['error']}")
+            trade_record.error = f"Sell failed: {sell_result['error']}"
+            trade_record.status = "partial"
+            logger.error("Sell order failed: %s", sell_result["error"])
         else:
-            trade_record["sell_order"] = sell_result
-            trade_record["status"] = "completed"
+            trade_record.sell_order = sell_result
+            trade_record.status = "completed"
         
         self.trade_history.append(trade_record)
         return trade_record
@@ -63,25 +114,25 @@ class TradeExecutor:
     
     def cancel_order(self, exchange_name: str, order_id: str, symbol: str) -> Dict:
         """Cancel an open order"""
-        try:
-            exchange = self.exchange_manager.exchanges.get(exchange_name)
-            if not exchange:
-                return {"error": "Exchange not found"}
-            return exchange.cancel_order(order_id, symbol)
-        except Exception as e:
-            logger.error(f"Error canceling order: {str(e)}")
-            return {"error": str(e)}
+        return self.exchange_manager.cancel_order(exchange_name, order_id, symbol)
     
-    def get_trade_history(self, limit: int = 20) -> list:
+    def get_trade_history(self, limit: int = 20) -> List[TradeRecord]:
         """Get recent trade history"""
         return self.trade_history[-limit:]
     
-    def calculate_pnl(self, trade_record: Dict) -> float:
-        """Calculate profit/loss for a trade"""
-        if not trade_record.get("buy_order") or not trade_record.get("sell_order"):
+    def calculate_pnl(self, trade_record: TradeRecord) -> float:
+        """Calculate profit/loss for a trade
+        
+        Maker-taker trades count only the quantity filled on both legs; an
+        unhedged remainder is open inventory, not profit or loss.
+        """
+        if not trade_record.buy_order or not trade_record.sell_order:
             return 0.0
         
-        buy_cost = trade_record["quantity"] * trade_record["buy_order"].get("average", 0)
-        sell_revenue = trade_record["quantity"] * trade_record["sell_order"].get("average", 0)
+        quantity = trade_record.quantity
+        if trade_record.filled is not None:
+            quantity = min(trade_record.filled, trade_record.hedged or 0.0)
+        buy_cost = quantity * trade_record.buy_order.get("average", 0)
+        sell_revenue = quantity * trade_record.sell_order.get("average", 0)
         
         return sell_revenue - buy_cost
@@ -1,62 +1,238 @@
 """
 Database connection and operations.
 """
-from sqlalchemy import create_engine
+import base64
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, func, inspect, text, or_, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker
 from database.models import Base, Trade, Balance, DailyStats
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from utils.metrics import DB_WRITE_SECONDS
 
 DATABASE_URL = "sqlite:///./arbitrage_bot.db"
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL so background maintenance doesn't block readers and writers"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    _migrate_existing_tables()
+
+def _migrate_existing_tables():
+    """Bring tables created by older versions up to the current schema"""
+    inspector = inspect(engine)
+    daily_columns = {c["name"] for c in inspector.get_columns("daily_stats")}
+    if "venue_stats" not in daily_columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE daily_stats ADD COLUMN venue_stats JSON"))
+
+    # create_all() only adds indexes when it creates the table itself
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def _parse_timestamp(value) -> datetime:
+    """A naive UTC datetime, as the columns store them"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            value = None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    return datetime.utcnow()
+
+def _update_daily_stats(db, trade: Trade):
+    """Fold one trade into its day's precomputed aggregates
+
+    The counters are an upsert, so two writers creating the first row for a
+    day don't collide on the unique date. The upsert also takes SQLite's
+    write lock, which serializes the read-modify-write of the venue JSON.
+    """
+    date = trade.timestamp.date().isoformat()
+    pnl = trade.pnl or 0.0
+    won = 1 if pnl > 0 else 0
+    lost = 1 if pnl < 0 else 0
+    now = datetime.utcnow()
+
+    upsert = sqlite_insert(DailyStats).values(
+        date=date, total_trades=1, winning_trades=won, losing_trades=lost,
+        total_pnl=pnl, venue_stats={}, timestamp=now
+    )
+    db.execute(upsert.on_conflict_do_update(
+        index_elements=[DailyStats.date],
+        set_={
+            "total_trades": func.coalesce(DailyStats.total_trades, 0) + 1,
+            "winning_trades": func.coalesce(DailyStats.winning_trades, 0) + won,
+            "losing_trades": func.coalesce(DailyStats.losing_trades, 0) + lost,
+            "total_pnl": func.coalesce(DailyStats.total_pnl, 0.0) + pnl,
+            "timestamp": now
+        }
+    ))
+    stats = db.query(DailyStats).filter(DailyStats.date == date).populate_existing().one()
 
+    # JSON columns aren't change-tracked in place, so assign a new dict
+    venues = {name: dict(v) for name, v in (stats.venue_stats or {}).items()}
+    for exchange in {trade.buy_exchange, trade.sell_exchange}:
+        if not exchange:
+            continue
+        venue = venues.setdefault(exchange, {"trades": 0, "wins": 0, "losses": 0, "pnl": 0.0})
+        venue["trades"] += 1
+        venue["wins"] += won
+        venue["losses"] += lost
+        venue["pnl"] += pnl
+    stats.venue_stats = venues
+
+@contextmanager
+def _tracked_write(table: str):
+    """Time a write until it commits (usable as a decorator)"""
+    with DB_WRITE_SECONDS.labels(table).time():
+        yield
+
+def _leg_price(trade_data: dict, side: str) -> Optional[float]:
+    """A leg's fill price: the explicit `<side>_price`, else its order's average"""
+    price = trade_data.get(f"{side}_price")
+    if price is None:
+        order = trade_data.get(f"{side}_order") or {}
+        price = order.get("average") or order.get("price")
+    return price
+
+@_tracked_write("trades")
 def save_trade(trade_data: dict):
-    """Save a trade to database"""
+    """Save a trade to database and update its day's statistics"""
     db = SessionLocal()
     try:
         trade = Trade(
             trade_id=trade_data.get("trade_id"),
+            timestamp=_parse_timestamp(trade_data.get("timestamp")),
             symbol=trade_data.get("symbol"),
             quantity=trade_data.get("quantity"),
             buy_exchange=trade_data.get("buy_exchange"),
             sell_exchange=trade_data.get("sell_exchange"),
-            buy_price=trade_data.get("buy_price"),
-            sell_price=trade_data.get("sell_price"),
+            buy_price=_leg_price(trade_data, "buy"),
+            sell_price=_leg_price(trade_data, "sell"),
             pnl=trade_data.get("pnl"),
             status=trade_data.get("status"),
             error=trade_data.get("error")
         )
         db.add(trade)
+        _update_daily_stats(db, trade)
         db.commit()
     finally:
         db.close()
 
 def save_balance(balance_data: dict):
     """Save balance snapshot to database"""
+    save_balances([balance_data])
+
+@_tracked_write("balances")
+def save_balances(balance_rows: list):
+    """Save a batch of balance snapshot rows in one transaction"""
+    if not balance_rows:
+        return
     db = SessionLocal()
     try:
-        balance = Balance(
-            exchange=balance_data.get("exchange"),
-            asset=balance_data.get("asset"),
-            available=balance_data.get("available"),
-            locked=balance_data.get("locked"),
-            total=balance_data.get("total")
-        )
-        db.add(balance)
+        db.add_all([
+            Balance(
+                exchange=row.get("exchange"),
+                asset=row.get("asset"),
+                available=row.get("available"),
+                locked=row.get("locked"),
+                total=row.get("total")
+            )
+            for row in balance_rows
+        ])
         db.commit()
     finally:
         db.close()
 
+def encode_cursor(trade: Trade) -> str:
+    """Encode a trade's (timestamp, id) keyset position as an opaque cursor"""
+    raw = f"{trade.timestamp.isoformat()}|{trade.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Decode a cursor produced by encode_cursor"""
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    timestamp, _, trade_id = raw.rpartition("|")
+    return datetime.fromisoformat(timestamp), int(trade_id)
+
+def trade_to_dict(trade: Trade) -> Dict:
+    """Serialize a Trade row for the API"""
+    return {
+        "id": trade.id,
+        "trade_id": trade.trade_id,
+        "timestamp": trade.timestamp.isoformat() if trade.timestamp else None,
+        "symbol": trade.symbol,
+        "quantity": trade.quantity,
+        "buy_exchange": trade.buy_exchange,
+        "sell_exchange": trade.sell_exchange,
+        "buy_price": trade.buy_price,
+        "sell_price": trade.sell_price,
+        "pnl": trade.pnl,
+        "status": trade.status,
+        "error": trade.error
+    }
+
+def get_trades_page(limit: int = 20, cursor: Optional[str] = None,
+                    symbol: Optional[str] = None, exchange: Optional[str] = None) -> Dict:
+    """Retrieve a page of trades, newest first, using keyset pagination
+
+    Pass the returned `next_cursor` back in to fetch the following page.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Trade)
+        if symbol:
+            query = query.filter(Trade.symbol == symbol)
+        if exchange:
+            query = query.filter(or_(Trade.buy_exchange == exchange, Trade.sell_exchange == exchange))
+        if cursor:
+            timestamp, trade_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                Trade.timestamp < timestamp,
+                and_(Trade.timestamp == timestamp, Trade.id < trade_id)
+            ))
+        rows = query.order_by(Trade.timestamp.desc(), Trade.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "trades": rows,
+            "next_cursor": encode_cursor(rows[-1]) if has_more else None
+        }
+    finally:
+        db.close()
+
 def get_trades(limit: int = 20):
     """Retrieve recent trades"""
+    return get_trades_page(limit)["trades"]
+
+def get_trades_since(since_id: int, limit: int = 500):
+    """Trades inserted after `since_id`, oldest first"""
     db = SessionLocal()
     try:
-        return db.query(Trade).order_by(Trade.timestamp.desc()).limit(limit).all()
+        return db.query(Trade).filter(Trade.id > since_id).order_by(Trade.id).limit(limit).all()
+    finally:
+        db.close()
+
+def get_latest_trade_id() -> int:
+    """Id of the newest trade (0 if none); trades are append-only so this versions the table"""
+    db = SessionLocal()
+    try:
+        return db.query(func.max(Trade.id)).scalar() or 0
     finally:
         db.close()
 
@@ -67,3 +243,15 @@ def get_daily_stats(date: str):
         return db.query(DailyStats).filter(DailyStats.date == date).first()
     finally:
         db.close()
+
+def daily_stats_to_dict(stats: DailyStats) -> Dict:
+    """Serialize a DailyStats row for the API"""
+    return {
+        "date": stats.date,
+        "total_trades": stats.total_trades or 0,
+        "winning_trades": stats.winning_trades or 0,
+        "losing_trades": stats.losing_trades or 0,
+        "total_pnl": stats.total_pnl or 0.0,
+        "venues": stats.venue_stats or {},
+        "updated_at": stats.timestamp.isoformat() if stats.timestamp else None
+    }
@@ -2,7 +2,7 @@
 Database models for storing bot data.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, Integer, JSON
+from sqlalchemy import Column, String, Float, DateTime, Integer, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -14,36 +14,72 @@ class Trade(Base):
     id = Column(Integer, primary_key=True)
     trade_id = Column(String, unique=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    symbol = Column(String)
+    symbol = Column(String, index=True)
     quantity = Column(Float)
-    buy_exchange = Column(String)
-    sell_exchange = Column(String)
+    buy_exchange = Column(String, index=True)
+    sell_exchange = Column(String, index=True)
     buy_price = Column(Float)
     sell_price = Column(Float)
     pnl = Column(Float)
     status = Column(String)
     error = Column(String, nullable=True)
 
+    # (timestamp, id) is the keyset used for trade history pagination, with or
+    # without a symbol filter. Timestamps are naive UTC.
+    __table_args__ = (
+        Index("ix_trades_timestamp_id", "timestamp", "id"),
+        Index("ix_trades_symbol_timestamp_id", "symbol", "timestamp", "id"),
+    )
+
 class Balance(Base):
     """Balance snapshot model"""
     __tablename__ = "balances"
     
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     exchange = Column(String)
     asset = Column(String)
     available = Column(Float)
     locked = Column(Float)
     total = Column(Float)
 
+    __table_args__ = (
+        Index("ix_balances_exchange_asset_timestamp", "exchange", "asset", "timestamp"),
+    )
+
+class BalanceRollup(Base):
+    """Downsampled balance history (hourly or daily buckets)"""
+    __tablename__ = "balance_rollups"
+    
+    id = Column(Integer, primary_key=True)
+    resolution = Column(String)  # "hour" or "day"
+    bucket = Column(DateTime)
+    exchange = Column(String)
+    asset = Column(String)
+    samples = Column(Integer, default=0)
+    avg_total = Column(Float)
+    min_total = Column(Float)
+    max_total = Column(Float)
+    last_available = Column(Float)
+    last_locked = Column(Float)
+    last_total = Column(Float)
+    last_timestamp = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_balance_rollups_key", "resolution", "exchange", "asset", "bucket", unique=True),
+        Index("ix_balance_rollups_resolution_bucket", "resolution", "bucket"),
+    )
+
 class DailyStats(Base):
     """Daily statistics model"""
     __tablename__ = "daily_stats"
     
     id = Column(Integer, primary_key=True)
-    date = Column(String)
-    total_trades = Column(Integer)
-    winning_trades = Column(Integer)
-    losing_trades = Column(Integer)
-    total_pnl = Column(Float)
+    date = Column(String, unique=True, index=True)
+    total_trades = Column(Integer, default=0)
+    winning_trades = Column(Integer, default=0)
+    losing_trades = Column(Integer, default=0)
+    total_pnl = Column(Float, default=0.0)
+    # {exchange: {"trades", "wins", "losses", "pnl"}} for trades the venue took part in
+    venue_stats = Column(JSON, default=dict)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,293 @@
+"""
+Retention and downsampling for balance snapshots.
+
+Raw snapshots are kept at full resolution for a short window, then folded into
+hourly rollups; hourly rollups are later folded into daily ones. Each sample
+lives in exactly one tier at any time, because a batch is merged into the
+coarser tier and deleted from the finer one in the same short transaction.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, or_
+
+from config.config import settings
+from database.db import SessionLocal
+from database.models import Balance, BalanceRollup
+from utils.logger import logger
+
+HOUR = "hour"
+DAY = "day"
+RAW = "raw"
+
+
+def _bucket(ts: datetime, resolution: str) -> datetime:
+    if resolution == HOUR:
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _merge(rollup: BalanceRollup, samples: int, avg_total: float, min_total: float,
+           max_total: float, last_ts: datetime, last_available: float,
+           last_locked: float, last_total: float):
+    """Fold aggregated samples into an existing rollup row"""
+    existing = rollup.samples or 0
+    combined = existing + samples
+    rollup.avg_total = ((rollup.avg_total or 0.0) * existing + avg_total * samples) / combined
+    rollup.min_total = min_total if rollup.min_total is None else min(rollup.min_total, min_total)
+    rollup.max_total = max_total if rollup.max_total is None else max(rollup.max_total, max_total)
+    rollup.samples = combined
+    if rollup.last_timestamp is None or last_ts >= rollup.last_timestamp:
+        rollup.last_timestamp = last_ts
+        rollup.last_available = last_available
+        rollup.last_locked = last_locked
+        rollup.last_total = last_total
+
+
+class BalanceRetention:
+    """Background job that downsamples and prunes balance history in batches"""
+
+    def __init__(self,
+                 raw_retention: timedelta = timedelta(hours=settings.BALANCE_RAW_RETENTION_HOURS),
+                 hourly_retention: timedelta = timedelta(days=settings.BALANCE_HOURLY_RETENTION_DAYS),
+                 batch_size: int = settings.RETENTION_BATCH_SIZE,
+                 interval: float = settings.RETENTION_INTERVAL,
+                 batch_pause: float = 0.05):
+        self.raw_retention = raw_retention
+        self.hourly_retention = hourly_retention
+        self.batch_size = batch_size
+        self.interval = interval
+        self.batch_pause = batch_pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Run retention periodically in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="balance-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.run_once()
+                if result["raw_rolled"] or result["hourly_rolled"]:
+                    logger.info("Balance retention: %s", result)
+            except Exception as e:
+                logger.error("Balance retention failed: %s", e)
+            self._stop.wait(self.interval)
+
+    # ------------------------------------------------------------------
+    # Rollup passes
+    # ------------------------------------------------------------------
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict:
+        """Roll raw snapshots into hours and hours into days until caught up"""
+        now = now or datetime.utcnow()
+        raw_rolled = 0
+        hourly_rolled = 0
+
+        # Cut-offs are aligned to bucket starts so a bucket is only ever
+        # rolled once all of its samples are old enough.
+        raw_cutoff = _bucket(now - self.raw_retention, HOUR)
+        while not self._stop.is_set():
+            count = self._roll_raw_batch(raw_cutoff)
+            raw_rolled += count
+            if count < self.batch_size:
+                break
+            time.sleep(self.batch_pause)
+
+        hourly_cutoff = _bucket(now - self.hourly_retention, DAY)
+        while not self._stop.is_set():
+            count = self._roll_hourly_batch(hourly_cutoff)
+            hourly_rolled += count
+            if count < self.batch_size:
+                break
+            time.sleep(self.batch_pause)
+
+        return {"raw_rolled": raw_rolled, "hourly_rolled": hourly_rolled}
+
+    def _upsert(self, db, resolution: str, key: tuple, agg: Dict):
+        exchange, asset, bucket = key
+        rollup = db.query(BalanceRollup).filter(
+            BalanceRollup.resolution == resolution,
+            BalanceRollup.exchange == exchange,
+            BalanceRollup.asset == asset,
+            BalanceRollup.bucket == bucket
+        ).first()
+        if rollup is None:
+            rollup = BalanceRollup(resolution=resolution, exchange=exchange,
+                                   asset=asset, bucket=bucket, samples=0)
+            db.add(rollup)
+        _merge(rollup, agg["samples"], agg["sum"] / agg["samples"], agg["min"], agg["max"],
+               agg["last_ts"], agg["last_available"], agg["last_locked"], agg["last_total"])
+
+    def _roll_raw_batch(self, cutoff: datetime) -> int:
+        db = SessionLocal()
+        try:
+            rows = db.query(Balance).filter(Balance.timestamp < cutoff) \
+                .order_by(Balance.id).limit(self.batch_size).all()
+            if not rows:
+                return 0
+
+            groups: Dict[tuple, Dict] = {}
+            for row in rows:
+                total = row.total or 0.0
+                key = (row.exchange, row.asset, _bucket(row.timestamp, HOUR))
+                agg = groups.get(key)
+                if agg is None:
+                    agg = groups[key] = {"samples": 0, "sum": 0.0, "min": total, "max": total,
+                                         "last_ts": row.timestamp}
+                agg["samples"] += 1
+                agg["sum"] += total
+                agg["min"] = min(agg["min"], total)
+                agg["max"] = max(agg["max"], total)
+                if row.timestamp >= agg["last_ts"]:
+                    agg.update(last_ts=row.timestamp, last_available=row.available,
+                               last_locked=row.locked, last_total=row.total)
+
+            for key, agg in groups.items():
+                self._upsert(db, HOUR, key, agg)
+            # Insert the merged rows before deleting so new ids can't reuse freed ones
+            db.flush()
+            db.query(Balance).filter(Balance.id.in_([row.id for row in rows])) \
+                .delete(synchronize_session=False)
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _roll_hourly_batch(self, cutoff: datetime) -> int:
+        db = SessionLocal()
+        try:
+            rows = db.query(BalanceRollup).filter(
+                BalanceRollup.resolution == HOUR,
+                BalanceRollup.bucket < cutoff
+            ).order_by(BalanceRollup.id).limit(self.batch_size).all()
+            if not rows:
+                return 0
+
+            groups: Dict[tuple, Dict] = {}
+            for row in rows:
+                key = (row.exchange, row.asset, _bucket(row.bucket, DAY))
+                agg = groups.get(key)
+                if agg is None:
+                    agg = groups[key] = {"samples": 0, "sum": 0.0, "min": row.min_total,
+                                         "max": row.max_total, "last_ts": row.last_timestamp}
+                agg["samples"] += row.samples
+                agg["sum"] += row.avg_total * row.samples
+                agg["min"] = min(agg["min"], row.min_total)
+                agg["max"] = max(agg["max"], row.max_total)
+                if row.last_timestamp >= agg["last_ts"]:
+                    agg.update(last_ts=row.last_timestamp, last_available=row.last_available,
+                               last_locked=row.last_locked, last_total=row.last_total)
+
+            for key, agg in groups.items():
+                self._upsert(db, DAY, key, agg)
+            # Insert the merged rows before deleting so new ids can't reuse freed ones
+            db.flush()
+            db.query(BalanceRollup).filter(BalanceRollup.id.in_([row.id for row in rows])) \
+                .delete(synchronize_session=False)
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def pick_resolution(start: datetime, end: datetime) -> str:
+    """Choose the display resolution for a time range"""
+    span = end - start
+    if span <= timedelta(days=1):
+        return RAW
+    if span <= timedelta(days=30):
+        return HOUR
+    return DAY
+
+
+def get_balance_history(exchange: str, asset: str, start: datetime,
+                        end: Optional[datetime] = None, resolution: str = "auto") -> Dict:
+    """Read balance history for a range at the appropriate resolution
+
+    All tiers overlapping the range are read (each sample is stored in exactly
+    one), and finer points are folded into the requested bucket size.
+    """
+    end = end or datetime.utcnow()
+    if resolution == "auto":
+        resolution = pick_resolution(start, end)
+
+    db = SessionLocal()
+    try:
+        points: List[Dict] = []
+        # A rollup overlaps the range if its bucket starts before `end` and at or
+        # after `start` floored to that tier's own bucket size
+        rollups = db.query(BalanceRollup).filter(
+            BalanceRollup.exchange == exchange,
+            BalanceRollup.asset == asset,
+            or_(
+                and_(BalanceRollup.resolution == HOUR, BalanceRollup.bucket >= _bucket(start, HOUR)),
+                and_(BalanceRollup.resolution == DAY, BalanceRollup.bucket >= _bucket(start, DAY))
+            ),
+            BalanceRollup.bucket < end
+        ).order_by(BalanceRollup.bucket).all()
+        for r in rollups:
+            points.append({"timestamp": r.bucket, "samples": r.samples, "avg_total": r.avg_total,
+                           "min_total": r.min_total, "max_total": r.max_total,
+                           "total": r.last_total, "available": r.last_available,
+                           "locked": r.last_locked, "last_ts": r.last_timestamp})
+
+        raw = db.query(Balance).filter(
+            Balance.exchange == exchange,
+            Balance.asset == asset,
+            Balance.timestamp >= start,
+            Balance.timestamp < end
+        ).order_by(Balance.timestamp).all()
+        for b in raw:
+            total = b.total or 0.0
+            points.append({"timestamp": b.timestamp, "samples": 1, "avg_total": total,
+                           "min_total": total, "max_total": total, "total": b.total,
+                           "available": b.available, "locked": b.locked, "last_ts": b.timestamp})
+    finally:
+        db.close()
+
+    if resolution != RAW:
+        buckets: Dict[datetime, Dict] = {}
+        for p in points:
+            key = _bucket(p["timestamp"], resolution)
+            agg = buckets.get(key)
+            if agg is None:
+                buckets[key] = dict(p, timestamp=key)
+                continue
+            samples = agg["samples"] + p["samples"]
+            agg["avg_total"] = (agg["avg_total"] * agg["samples"] + p["avg_total"] * p["samples"]) / samples
+            agg["samples"] = samples
+            agg["min_total"] = min(agg["min_total"], p["min_total"])
+            agg["max_total"] = max(agg["max_total"], p["max_total"])
+            if p["last_ts"] >= agg["last_ts"]:
+                agg.update(total=p["total"], available=p["available"],
+                           locked=p["locked"], last_ts=p["last_ts"])
+        points = list(buckets.values())
+
+    points.sort(key=lambda p: p["timestamp"])
+    for p in points:
+        p["timestamp"] = p["timestamp"].isoformat()
+        p.pop("last_ts")
+    return {"exchange": exchange, "asset": asset, "resolution": resolution, "points": points}
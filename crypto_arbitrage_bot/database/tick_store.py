@@ -0,0 +1,287 @@
+"""
+Append-only columnar store for top-of-book ticks and detected opportunities.
+
+Rows are fixed-width binary records written into one file per day and symbol:
+
+    <root>/ticks/20251122/BTC-USDT.bin
+    <root>/opportunities/20251122/BTC-USDT.bin
+
+Because every partition is a flat array of a known NumPy dtype, it can be
+memory-mapped and used directly without parsing or copying. Exchange names and
+symbols are kept in small JSON registries next to the partitions, so file
+names never have to be turned back into symbols.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sys import intern
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from core.models import Opportunity
+from utils.logger import logger
+
+TICKS = "ticks"
+OPPORTUNITIES = "opportunities"
+
+# `ts` is the local receive time and the column range scans binary-search on.
+# Each flush writes its rows sorted by `ts`; a partition that still ends up out
+# of order (appends from several threads racing a flush) is sorted when read.
+# `exchange_ts` is the venue's own clock.
+TICK_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("exchange_ts", "<f8"),
+    ("exchange", "<u2"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("bid_size", "<f8"),
+    ("ask_size", "<f8"),
+    ("last", "<f8"),
+])
+
+OPPORTUNITY_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("buy_exchange", "<u2"),
+    ("sell_exchange", "<u2"),
+    ("buy_price", "<f8"),
+    ("sell_price", "<f8"),
+    ("spread_pct", "<f8"),
+])
+
+DTYPES = {TICKS: TICK_DTYPE, OPPORTUNITIES: OPPORTUNITY_DTYPE}
+
+
+def _day_key(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y%m%d")
+
+
+def _symbol_key(symbol: str) -> str:
+    return symbol.replace("/", "-").replace(":", "_")
+
+
+def _sorted(rows: np.ndarray) -> np.ndarray:
+    """`rows` in `ts` order; the array itself when it already is"""
+    ts = rows["ts"]
+    if len(ts) < 2 or not (ts[1:] < ts[:-1]).any():
+        return rows
+    return rows[np.argsort(ts, kind="stable")]
+
+
+class TickStore:
+    """Buffered append-only writer and zero-copy reader for market data"""
+
+    def __init__(self, root: str, flush_rows: int = 4096, flush_interval: float = 1.0):
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # Serializes flushes so batches land in the order they were taken
+        self._flush_lock = threading.Lock()
+        self._buffers: Dict[tuple, list] = {}
+        self._buffered_rows = 0
+        self._last_flush = time.time()
+        self._exchange_ids: Dict[str, int] = {}
+        self._exchange_names: List[str] = []
+        # Partition file name -> the symbol it holds
+        self._symbols: Dict[str, str] = {}
+        os.makedirs(root, exist_ok=True)
+        self._load_exchange_registry()
+        self._load_symbol_registry()
+
+    # ------------------------------------------------------------------
+    # Exchange id registry
+    # ------------------------------------------------------------------
+
+    def _registry_path(self) -> str:
+        return os.path.join(self.root, "exchanges.json")
+
+    def _symbol_registry_path(self) -> str:
+        return os.path.join(self.root, "symbols.json")
+
+    def _write_registry(self, path: str, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _load_exchange_registry(self):
+        path = self._registry_path()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._exchange_names = [intern(name) for name in json.load(f)]
+        self._exchange_ids = {name: i for i, name in enumerate(self._exchange_names)}
+
+    def exchange_id(self, name: str) -> int:
+        """Return the stable numeric id for an exchange, registering it if new"""
+        exchange_id = self._exchange_ids.get(name)
+        if exchange_id is not None:
+            return exchange_id
+        with self._lock:
+            if name not in self._exchange_ids:
+                self._exchange_ids[name] = len(self._exchange_names)
+                self._exchange_names.append(name)
+                self._write_registry(self._registry_path(), self._exchange_names)
+            return self._exchange_ids[name]
+
+    def exchange_name(self, exchange_id: int) -> str:
+        """Map a stored exchange id back to its name"""
+        return self._exchange_names[exchange_id]
+
+    @property
+    def exchange_names(self) -> List[str]:
+        return list(self._exchange_names)
+
+    # ------------------------------------------------------------------
+    # Symbol registry
+    # ------------------------------------------------------------------
+
+    def _load_symbol_registry(self):
+        path = self._symbol_registry_path()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._symbols = {key: intern(symbol) for key, symbol in json.load(f).items()}
+
+    def _register_symbol(self, symbol: str) -> str:
+        """File name key for `symbol`, recording the symbol it came from"""
+        key = _symbol_key(symbol)
+        if self._symbols.get(key) != symbol:
+            with self._lock:
+                if self._symbols.get(key) != symbol:
+                    self._symbols[key] = symbol
+                    self._write_registry(self._symbol_registry_path(), self._symbols)
+        return key
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _append(self, kind: str, symbol: str, ts: float, row: tuple):
+        key = (kind, _day_key(ts), self._register_symbol(symbol))
+        with self._lock:
+            self._buffers.setdefault(key, []).append(row)
+            self._buffered_rows += 1
+            due = (self._buffered_rows >= self.flush_rows
+                   or time.time() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def append_tick(self, symbol: str, exchange: str, bid: float, ask: float,
+                    last: float = 0.0, bid_size: float = 0.0, ask_size: float = 0.0,
+                    exchange_ts: float = 0.0, ts: Optional[float] = None):
+        """Buffer one top-of-book update"""
+        ts = ts if ts is not None else time.time()
+        row = (ts, exchange_ts, self.exchange_id(exchange),
+               bid or 0.0, ask or 0.0, bid_size or 0.0, ask_size or 0.0, last or 0.0)
+        self._append(TICKS, symbol, ts, row)
+
+    def append_opportunity(self, opportunity: Opportunity, ts: Optional[float] = None):
+        """Buffer one detected opportunity"""
+        ts = ts if ts is not None else time.time()
+        row = (ts,
+               self.exchange_id(opportunity.buy_exchange),
+               self.exchange_id(opportunity.sell_exchange),
+               opportunity.buy_price, opportunity.sell_price,
+               opportunity.spread_pct)
+        self._append(OPPORTUNITIES, opportunity.symbol, ts, row)
+
+    def record_prices(self, prices: Dict, ts: Optional[float] = None):
+        """Record a `PriceMonitor.fetch_prices` result as ticks"""
+        ts = ts if ts is not None else time.time()
+        for symbol, exchange_data in prices.items():
+            for exchange_name, quote in exchange_data.items():
+                self.append_tick(
+                    symbol, exchange_name,
+                    bid=quote.bid, ask=quote.ask, last=quote.last,
+                    bid_size=quote.bid_size, ask_size=quote.ask_size,
+                    exchange_ts=quote.exchange_ts or 0.0, ts=ts
+                )
+
+    def record_opportunities(self, opportunities: List[Opportunity], ts: Optional[float] = None):
+        """Record the output of `PriceMonitor.detect_opportunities`"""
+        ts = ts if ts is not None else time.time()
+        for opp in opportunities:
+            self.append_opportunity(opp, ts=ts)
+
+    def flush(self):
+        """Write all buffered rows to their partitions"""
+        with self._flush_lock:
+            with self._lock:
+                buffers = self._buffers
+                self._buffers = {}
+                self._buffered_rows = 0
+                self._last_flush = time.time()
+
+            for (kind, day, symbol_key), rows in buffers.items():
+                directory = os.path.join(self.root, kind, day)
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f"{symbol_key}.bin")
+                try:
+                    with open(path, "ab") as f:
+                        _sorted(np.array(rows, dtype=DTYPES[kind])).tofile(f)
+                except OSError as e:
+                    logger.error("Failed to write %d %s rows to %s: %s", len(rows), kind, path, e)
+
+    def close(self):
+        """Flush remaining rows"""
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def days(self, kind: str = TICKS) -> List[str]:
+        """List recorded days (YYYYMMDD) for a record kind"""
+        directory = os.path.join(self.root, kind)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(d for d in os.listdir(directory) if d.isdigit())
+
+    def symbols(self, day: str, kind: str = TICKS) -> List[str]:
+        """List symbols recorded on a given day"""
+        directory = os.path.join(self.root, kind, day)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(self._symbols.get(f[:-4], f[:-4]) for f in os.listdir(directory) if f.endswith(".bin"))
+
+    def load(self, symbol: str, day: str, kind: str = TICKS) -> np.ndarray:
+        """Memory-map a single day/symbol partition, in `ts` order
+
+        Zero-copy unless the partition was written out of order, in which case
+        a sorted copy is returned.
+        """
+        dtype = DTYPES[kind]
+        path = os.path.join(self.root, kind, day, f"{_symbol_key(symbol)}.bin")
+        if not os.path.exists(path):
+            return np.empty(0, dtype=dtype)
+        # Ignore a trailing partial row left by an interrupted write
+        rows = os.path.getsize(path) // dtype.itemsize
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return _sorted(np.memmap(path, dtype=dtype, mode="r", shape=(rows,)))
+
+    def iter_range(self, symbol: str, start: float, end: float,
+                   kind: str = TICKS) -> Iterator[np.ndarray]:
+        """Yield zero-copy views of the rows with start <= ts < end, one per day"""
+        day = datetime.fromtimestamp(start, tz=timezone.utc).date()
+        last_day = datetime.fromtimestamp(end, tz=timezone.utc).date()
+        while day <= last_day:
+            data = self.load(symbol, day.strftime("%Y%m%d"), kind)
+            if len(data):
+                ts = data["ts"]
+                lo = np.searchsorted(ts, start, side="left")
+                hi = np.searchsorted(ts, end, side="left")
+                if hi > lo:
+                    yield data[lo:hi]
+            day += timedelta(days=1)
+
+    def scan(self, symbol: str, start: float, end: float, kind: str = TICKS) -> np.ndarray:
+        """Return rows for a time range; zero-copy when it falls within one day"""
+        chunks = list(self.iter_range(symbol, start, end, kind))
+        if not chunks:
+            return np.empty(0, dtype=DTYPES[kind])
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
@@ -1 +1,158 @@
-# CCXT wrapper for unified exchange interface
+"""
+Async CCXT wrapper with the same interface as ExchangeManager.
+
+Uses `ccxt.async_support` clients so requests to different exchanges and
+symbols run concurrently on the event loop instead of tying up threads.
+Venues with an open circuit breaker are skipped (exchanges/health.py), and
+with HEDGE_READS a ticker request still outstanding at the venue's p95
+latency is sent a second time; the first answer wins. Ticker timestamps
+feed the per-venue clock offset estimates (exchanges/clock.py).
+"""
+import asyncio
+import time
+import ccxt.async_support as ccxt_async
+from typing import Dict, List
+from config.config import settings
+from config.secrets import SecretsManager
+from exchanges.clock import exchange_clock
+from exchanges.health import ExchangeUnavailable, exchange_health, is_venue_failure
+from exchanges.clients import build_clients
+from exchanges.simulated import AsyncSimulatedExchange
+from utils.logger import logger
+from utils.metrics import EXCHANGE_REQUEST_SECONDS, EXCHANGE_ERRORS, HEDGED_REQUESTS
+from utils.profiling import timed
+
+class AsyncExchangeManager:
+    # Shared with every other manager in the process
+    health = exchange_health
+    clock = exchange_clock
+
+    def __init__(self):
+        self.secrets = SecretsManager()
+        self.exchanges = {}
+        self.initialize_exchanges()
+
+    def initialize_exchanges(self):
+        """Initialize async CCXT connectors for all 6 exchanges"""
+        self.exchanges.update(build_clients(ccxt_async, AsyncSimulatedExchange, self.secrets, "async"))
+
+    @timed
+    async def _call(self, exchange_name: str, method: str, *args):
+        """Call a ccxt method, recording latency, errors and venue health"""
+        health = self.health.get(exchange_name)
+        if not health.allow():
+            raise ExchangeUnavailable(f"{exchange_name} is out of service: {health.reason}")
+        started = time.perf_counter()
+        try:
+            result = await getattr(self.exchanges[exchange_name], method)(*args)
+        except Exception as e:
+            EXCHANGE_ERRORS.labels(exchange_name, method).inc()
+            health.record(time.perf_counter() - started, is_venue_failure(e))
+            raise
+        else:
+            health.record(time.perf_counter() - started, False)
+            return result
+        finally:
+            EXCHANGE_REQUEST_SECONDS.labels(exchange_name, method).observe(time.perf_counter() - started)
+
+    async def _hedged_call(self, exchange_name: str, method: str, *args):
+        """`_call` for idempotent reads, re-sent once if the first passes the venue's p95"""
+        delay = self.health.get(exchange_name).hedge_delay() if settings.HEDGE_READS else None
+        if delay is None:
+            return await self._call(exchange_name, method, *args)
+
+        tasks = [asyncio.ensure_future(self._call(exchange_name, method, *args))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+
+            tasks.append(asyncio.ensure_future(self._call(exchange_name, method, *args)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in tasks if task in done and task.exception() is None]
+                if winners:
+                    winner = "hedge" if winners[0] is tasks[1] else "first"
+                    HEDGED_REQUESTS.labels(exchange_name, method, winner).inc()
+                    return winners[0].result()
+            HEDGED_REQUESTS.labels(exchange_name, method, "none").inc()
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def get_balance(self, exchange_name: str) -> Dict:
+        """Fetch balance from exchange"""
+        try:
+            if exchange_name not in self.exchanges:
+                return {}
+            return await self._call(exchange_name, "fetch_balance")
+        except ExchangeUnavailable:
+            return {}
+        except Exception as e:
+            logger.error("Error fetching balance from %s: %s", exchange_name, e)
+            return {}
+
+    async def get_all_balances(self) -> Dict:
+        """Fetch balances from every exchange concurrently"""
+        names = list(self.exchanges.keys())
+        results = await asyncio.gather(*(self.get_balance(name) for name in names))
+        return dict(zip(names, results))
+
+    async def get_ticker(self, exchange_name: str, symbol: str) -> Dict:
+        """Fetch ticker data"""
+        try:
+            if exchange_name not in self.exchanges:
+                return {}
+            sent = time.time()
+            ticker = await self._hedged_call(exchange_name, "fetch_ticker", symbol)
+            self.clock.observe_ticker(exchange_name, ticker, sent, time.time())
+            return ticker
+        except ExchangeUnavailable:
+            return {}
+        except Exception as e:
+            logger.error("Error fetching ticker %s from %s: %s", symbol, exchange_name, e)
+            return {}
+
+    @timed
+    async def get_tickers(self, symbols: List[str]) -> Dict:
+        """Fetch every symbol from every exchange concurrently
+
+        Returns {symbol: {exchange_name: ticker}}, omitting failed requests.
+        """
+        pairs = [(symbol, name) for symbol in symbols for name in self.exchanges.keys()]
+        results = await asyncio.gather(*(self.get_ticker(name, symbol) for symbol, name in pairs))
+        tickers = {symbol: {} for symbol in symbols}
+        for (symbol, name), ticker in zip(pairs, results):
+            if ticker:
+                tickers[symbol][name] = ticker
+        return tickers
+
+    async def create_market_order(self, exchange_name: str, symbol: str, side: str, amount: float) -> Dict:
+        """Create a market order"""
+        try:
+            if exchange_name not in self.exchanges:
+                return {"error": "Exchange not initialized"}
+            return await self._call(exchange_name, "create_market_order", symbol, side, amount)
+        except Exception as e:
+            logger.error("Error creating order on %s: %s", exchange_name, e)
+            return {"error": str(e)}
+
+    async def get_order_status(self, exchange_name: str, order_id: str, symbol: str) -> Dict:
+        """Check order status"""
+        try:
+            if exchange_name not in self.exchanges:
+                return {}
+            return await self._call(exchange_name, "fetch_order", order_id, symbol)
+        except ExchangeUnavailable:
+            return {}
+        except Exception as e:
+            logger.error("Error fetching order status: %s", e)
+            return {}
+
+    async def close(self):
+        """Close every client's HTTP session"""
+        await asyncio.gather(*(exchange.close() for exchange in self.exchanges.values()),
+                             return_exceptions=True)
@@ -0,0 +1,63 @@
+"""
+Client construction shared by the sync and async exchange managers.
+
+Both managers connect the same exchanges with the same credentials and
+options; only the ccxt flavour (`ccxt` or `ccxt.async_support`) and the
+simulated client class differ, so those are passed in.
+"""
+from typing import Dict, Optional
+
+from config.secrets import SecretsManager
+from exchanges.simulated import get_venue, simulated_exchange_names
+from utils.logger import logger
+
+EXCHANGE_NAMES = ("binance", "kucoin", "mexc", "okx", "gateio", "bybit")
+
+
+def client_config(secrets: SecretsManager, name: str) -> Optional[Dict]:
+    """ccxt constructor options for `name`, or None without stored credentials"""
+    api_key = secrets.get_secret(f"{name}_api_key")
+    api_secret = secrets.get_secret(f"{name}_api_secret")
+    if not (api_key and api_secret):
+        return None
+    config = {
+        "apiKey": api_key,
+        "secret": api_secret,
+        "enableRateLimit": True,
+        "options": {"defaultType": "spot"}
+    }
+    # KuCoin requires password
+    if name == "kucoin":
+        password = secrets.get_secret(f"{name}_password")
+        if password:
+            config["password"] = password
+        else:
+            logger.warning("KuCoin password not found for %s", name)
+    return config
+
+
+def build_clients(ccxt_module, simulated_class, secrets: SecretsManager, label: str = "") -> Dict:
+    """{name: client} for simulated venues and every exchange with credentials
+
+    `label` is prefixed to the log lines ("async") to tell the managers apart.
+    """
+    prefix = f"{label} " if label else ""
+    clients = {}
+    simulated = simulated_exchange_names()
+    for name in simulated:
+        clients[name] = simulated_class(get_venue(name))
+        logger.info("Initialized simulated %s%s exchange", prefix, name)
+
+    for name in EXCHANGE_NAMES:
+        if name in simulated:
+            continue
+        try:
+            config = client_config(secrets, name)
+            if config is None:
+                logger.warning("API credentials not found for %s", name)
+                continue
+            clients[name] = getattr(ccxt_module, name)(config)
+            logger.info("Initialized %s%s exchange", prefix, name)
+        except Exception as e:
+            logger.error("Failed to initialize %s%s: %s", prefix, name, e)
+    return clients
@@ -0,0 +1,166 @@
+"""
+Exchange clock offsets and quote ages.
+
+Ticker timestamps are stamped by each venue's own clock, which can run
+ahead of or behind ours, and a venue may serve a quote that sat in its cache
+for a while. To compare quotes across venues every timestamp is moved onto
+the local clock, which needs each venue's offset (venue clock - local clock):
+
+- Server time (`fetch_time`), NTP style: the server read its clock somewhere
+  between sending the request and receiving the answer, so the offset lies
+  within half the round trip of the midpoint. The sample with the shortest
+  round trip is the tightest, so the estimate uses that one.
+- Message timestamps: a quote can't be stamped after we received it, so
+  `timestamp - received` is a lower bound on the offset. For venues without
+  a server-time endpoint the freshest quote is assumed to be stamped one
+  one-way latency (half the shortest round trip) before it arrived.
+
+The tracker is per process and shared by every manager in it, like the
+health tracker.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from exchanges.health import ExchangeUnavailable
+from utils.logger import logger
+from utils.profiling import timed
+
+# Samples kept per venue, so estimates follow clock drift
+WINDOW = 32
+
+
+class VenueClock:
+    """Offset and one-way latency estimate for one venue"""
+
+    def __init__(self, name: str):
+        self.name = name
+        # (round trip, offset at the midpoint) per server-time sample
+        self._server: deque = deque(maxlen=WINDOW)
+        # timestamp - received per quote: lower bounds on the offset
+        self._bounds: deque = deque(maxlen=WINDOW)
+        self._round_trips: deque = deque(maxlen=WINDOW)
+        self._offset = 0.0
+        self._latency: Optional[float] = None
+        self._source: Optional[str] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def observe_server_time(self, server_time: float, sent: float, received: float):
+        """Record a server-time reading (venue seconds) and when its request went out and came back"""
+        round_trip = received - sent
+        self._server.append((round_trip, server_time - (sent + received) / 2))
+        self._round_trips.append(round_trip)
+        self._dirty = True
+
+    def observe_message(self, exchange_ts: float, sent: float, received: float):
+        """Record a quote stamped `exchange_ts` (venue seconds) by a request sent and received at these times"""
+        self._bounds.append(exchange_ts - received)
+        self._round_trips.append(received - sent)
+        self._dirty = True
+
+    def _estimate(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._latency = min(self._round_trips) / 2 if self._round_trips else None
+            lower = max(self._bounds) if self._bounds else None
+            if self._server:
+                offset = min(self._server)[1]
+                source = "server_time"
+                if lower is not None and offset < lower:
+                    # A quote proves the venue's clock is further ahead than measured
+                    offset, source = lower, "messages"
+            elif lower is not None:
+                offset, source = lower + (self._latency or 0.0), "messages"
+            else:
+                offset, source = 0.0, None
+            self._offset, self._source = offset, source
+
+    @property
+    def offset(self) -> float:
+        """Venue clock minus local clock, in seconds (0 until observed)"""
+        if self._dirty:
+            self._estimate()
+        return self._offset
+
+    @property
+    def latency(self) -> Optional[float]:
+        """One-way request latency in seconds, from the shortest round trip seen"""
+        if self._dirty:
+            self._estimate()
+        return self._latency
+
+    def snapshot(self) -> Dict:
+        offset, latency = self.offset, self.latency
+        return {
+            "offset_ms": offset * 1000,
+            "latency_ms": latency * 1000 if latency is not None else None,
+            "source": self._source,
+            "server_samples": len(self._server),
+            "message_samples": len(self._bounds)
+        }
+
+
+class ClockSync:
+    """Clock offsets of every venue this process talks to"""
+
+    def __init__(self):
+        self.venues: Dict[str, VenueClock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> VenueClock:
+        clock = self.venues.get(name)
+        if clock is None:
+            with self._lock:
+                clock = self.venues.setdefault(name, VenueClock(name))
+        return clock
+
+    def observe_ticker(self, name: str, ticker: Dict, sent: float, received: float):
+        """Learn from a ccxt ticker's timestamp (milliseconds), if it has one"""
+        timestamp = ticker.get("timestamp") if ticker else None
+        if timestamp:
+            self.get(name).observe_message(timestamp / 1000, sent, received)
+
+    def quote_time(self, name: Optional[str], exchange_ts: Optional[float], received: float) -> float:
+        """When a quote stamped `exchange_ts` (venue seconds) was made, on the local clock
+
+        Quotes without a timestamp are taken as made when received; none is
+        placed after its arrival.
+        """
+        if not exchange_ts:
+            return received
+        clock = self.venues.get(name)
+        local = exchange_ts - clock.offset if clock is not None else exchange_ts
+        return local if local < received else received
+
+    @timed
+    async def sync(self, exchange_manager):
+        """Sample server time from every venue of an AsyncExchangeManager that has it"""
+        names = [name for name, client in exchange_manager.exchanges.items()
+                 if (getattr(client, "has", None) or {}).get("fetchTime")]
+        results = await asyncio.gather(
+            *(self._sample(exchange_manager, name) for name in names),
+            return_exceptions=True
+        )
+        for name, result in zip(names, results):
+            # Venues with an open circuit breaker are simply skipped this round
+            if isinstance(result, Exception) and not isinstance(result, ExchangeUnavailable):
+                logger.warning("Could not read server time from %s: %s", name, result)
+
+    async def _sample(self, exchange_manager, name: str):
+        # Through the manager so probes count towards venue health and request metrics
+        sent = time.time()
+        server_ms = await exchange_manager._call(name, "fetch_time")
+        received = time.time()
+        if server_ms:
+            self.get(name).observe_server_time(server_ms / 1000, sent, received)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: clock.snapshot() for name, clock in sorted(self.venues.items())}
+
+
+exchange_clock = ClockSync()
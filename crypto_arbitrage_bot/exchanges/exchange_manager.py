@@ -2,11 +2,22 @@
 Exchange manager for unified CCXT interface across 6 exchanges.
 """
 import ccxt
+import time
 from typing import Dict
 from config.secrets import SecretsManager
+from exchanges.clock import exchange_clock
+from exchanges.health import ExchangeUnavailable, exchange_health, is_venue_failure
+from exchanges.clients import build_clients
+from exchanges.simulated import SimulatedExchange
 from utils.logger import logger
+from utils.metrics import EXCHANGE_REQUEST_SECONDS, EXCHANGE_ERRORS
+from utils.profiling import timed
 
 class ExchangeManager:
+    # Shared with every other manager in the process
+    health = exchange_health
+    clock = exchange_clock
+    
     def __init__(self):
         self.secrets = SecretsManager()
         self.exchanges = {}
@@ -14,52 +25,37 @@ class ExchangeManager:
     
     def initialize_exchanges(self):
         """Initialize CCXT connectors for all 6 exchanges"""
-        exchange_configs = {
-            "binance": ccxt.binance,
-            "kucoin": ccxt.kucoin,
-            "mexc": ccxt.mexc,
-            "okx": ccxt.okx,
-            "gateio": ccxt.gateio,
-            "bybit": ccxt.bybit
-        }
-        
-        for name, exchange_class in exchange_configs.items():
-            try:
-                api_key = self.secrets.get_secret(f"{name}_api_key")
-                api_secret = self.secrets.get_secret(f"{name}_api_secret")
-                
-                if api_key and api_secret:
-                    config = {
-                        "apiKey": api_key,
-                        "secret": api_secret,
-                        "enableRateLimit": True,
-                        "options": {"defaultType": "spot"}
-                    }
-                    
-                    # KuCoin requires password
-                    if name.lower() == "kucoin":
-                        password = self.secrets.get_secret(f"{name}_password")
-                        if password:
-                            config["password"] = password
-                        else:
-                            logger.warning(f"KuCoin password not found for {name}")
-                    
-                    self.exchanges[name] = exchange_class(config)
-                    logger.info(f"Initialized {name} exchange")
-                else:
-                    logger.warning(f"API credentials not found for {name}")
-            except Exception as e:
-                logger.error(f"Failed to initialize {name}: {str(e)}")
+        self.exchanges.update(build_clients(ccxt, SimulatedExchange, self.secrets))
+    
+    @timed
+    def _call(self, exchange_name: str, method: str, *args):
+        """Call a ccxt method, recording latency, errors and venue health"""
+        health = self.health.get(exchange_name)
+        if not health.allow():
+            raise ExchangeUnavailable(f"{exchange_name} is out of service: {health.reason}")
+        started = time.perf_counter()
+        try:
+            result = getattr(self.exchanges[exchange_name], method)(*args)
+        except Exception as e:
+            EXCHANGE_ERRORS.labels(exchange_name, method).inc()
+            health.record(time.perf_counter() - started, is_venue_failure(e))
+            raise
+        else:
+            health.record(time.perf_counter() - started, False)
+            return result
+        finally:
+            EXCHANGE_REQUEST_SECONDS.labels(exchange_name, method).observe(time.perf_counter() - started)
     
     def get_balance(self, exchange_name: str) -> Dict:
         """Fetch balance from exchange"""
         try:
             if exchange_name not in self.exchanges:
                 return {}
-            exchange = self.exchanges[exchange_name]
-            return exchange.fetch_balance()
+            return self._call(exchange_name, "fetch_balance")
+        except ExchangeUnavailable:
+            return {}
         except Exception as e:
-            logger.error(f"Error fetching balance from {exchange_name}: {str(e)}")
+            logger.error("Error fetching balance from %s: %s", exchange_name, e)
             return {}
     
     def get_ticker(self, exchange_name: str, symbol: str) -> Dict:
@@ -67,10 +63,14 @@ class ExchangeManager:
         try:
             if exchange_name not in self.exchanges:
                 return {}
-            exchange = self.exchanges[exchange_name]
-            return exchange.fetch_ticker(symbol)
+            sent = time.time()
+            ticker = self._call(exchange_name, "fetch_ticker", symbol)
+            self.clock.observe_ticker(exchange_name, ticker, sent, time.time())
+            return ticker
+        except ExchangeUnavailable:
+            return {}
         except Exception as e:
-            logger.error(f"Error fetching ticker {symbol} from {exchange_name}: {str(e)}")
+            logger.error("Error fetching ticker %s from %s: %s", symbol, exchange_name, e)
             return {}
     
     def create_market_order(self, exchange_name: str, symbol: str, side: str, amount: float) -> Dict:
@@ -78,10 +78,31 @@ class ExchangeManager:
         try:
             if exchange_name not in self.exchanges:
                 return {"error": "Exchange not initialized"}
-            exchange = self.exchanges[exchange_name]
-            return exchange.create_market_order(symbol, side, amount)
+            return self._call(exchange_name, "create_market_order", symbol, side, amount)
         except Exception as e:
-            logger.error(f"Error creating order on {exchange_name}: {str(e)}")
+            logger.error("Error creating order on %s: %s", exchange_name, e)
+            return {"error": str(e)}
+    
+    def create_limit_order(self, exchange_name: str, symbol: str, side: str, amount: float,
+                           price: float, post_only: bool = False) -> Dict:
+        """Create a limit order; post-only orders are rejected instead of taking liquidity"""
+        try:
+            if exchange_name not in self.exchanges:
+                return {"error": "Exchange not initialized"}
+            params = {"postOnly": True} if post_only else {}
+            return self._call(exchange_name, "create_limit_order", symbol, side, amount, price, params)
+        except Exception as e:
+            logger.error("Error creating limit order on %s: %s", exchange_name, e)
+            return {"error": str(e)}
+    
+    def cancel_order(self, exchange_name: str, order_id: str, symbol: str) -> Dict:
+        """Cancel an open order"""
+        try:
+            if exchange_name not in self.exchanges:
+                return {"error": "Exchange not initialized"}
+            return self._call(exchange_name, "cancel_order", order_id, symbol)
+        except Exception as e:
+            logger.warning("Error canceling order %s on %s: %s", order_id, exchange_name, e)
             return {"error": str(e)}
     
     def get_order_status(self, exchange_name: str, order_id: str, symbol: str) -> Dict:
@@ -89,8 +110,9 @@ class ExchangeManager:
         try:
             if exchange_name not in self.exchanges:
                 return {}
-            exchange = self.exchanges[exchange_name]
-            return exchange.fetch_order(order_id, symbol)
+            return self._call(exchange_name, "fetch_order", order_id, symbol)
+        except ExchangeUnavailable:
+            return {}
         except Exception as e:
-            logger.error(f"Error fetching order status: {str(e)}")
+            logger.error("Error fetching order status: %s", e)
             return {}
@@ -0,0 +1,199 @@
+"""
+Per-exchange health tracking and circuit breaking.
+
+Every call made through ExchangeManager / AsyncExchangeManager is recorded:
+latency, whether the venue failed (network errors, timeouts, outages) and
+failures in a row. A venue that fails several times in a row, fails too large
+a share of recent calls, or whose p95 latency passes the ceiling is taken out
+of scans and execution (breaker open). After a cooldown one probe request is
+let through (half-open); success brings the venue back, failure reopens the
+breaker with a doubled cooldown.
+
+The tracker is per process and shared by every manager in it, so orders skip
+a venue the market-data path has found degraded.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from config.config import settings
+from utils.logger import logger
+from utils.metrics import EXCHANGE_BREAKER_OPEN
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Recent calls kept per venue, and how many are needed before rates and
+# percentiles are trusted
+WINDOW = 100
+MIN_SAMPLES = 20
+MAX_COOLDOWN = 300.0
+
+
+class ExchangeUnavailable(Exception):
+    """Raised instead of calling a venue whose breaker is open"""
+
+
+def is_venue_failure(error: Exception) -> bool:
+    """Whether an error means the venue is unhealthy, not that the request was bad
+
+    Network errors and non-ccxt errors (timeouts, broken connections) count;
+    exchange errors such as InsufficientFunds or BadSymbol mean it answered.
+    """
+    import ccxt
+    return isinstance(error, ccxt.NetworkError) or not isinstance(error, ccxt.BaseError)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ExchangeHealth:
+    """Rolling latency and error statistics plus the breaker for one venue"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, error_rate: float = 0.5,
+                 latency_ceiling: float = 5.0, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate
+        self.latency_ceiling = latency_ceiling
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.reason: Optional[str] = None
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.p95: Optional[float] = None
+        # Latencies of successful calls; failures are kept as flags
+        self.latencies: deque = deque(maxlen=WINDOW)
+        self.failures: deque = deque(maxlen=WINDOW)
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether the venue is in service, without starting a probe"""
+        return self.state == CLOSED
+
+    def allow(self) -> bool:
+        """Whether a request may go out now; may turn it into the half-open probe"""
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probe_started = now
+                return True
+            if self.state == HALF_OPEN and now - self._probe_started >= self.cooldown:
+                # The last probe never reported back (e.g. it was cancelled)
+                self._probe_started = now
+                return True
+            return self.state == CLOSED
+
+    def record(self, seconds: float, failed: bool):
+        """Record a finished call and move the breaker if needed"""
+        with self._lock:
+            self.failures.append(failed)
+            if failed:
+                self.consecutive_failures += 1
+            else:
+                self.consecutive_failures = 0
+                self.latencies.append(seconds)
+                if len(self.latencies) >= MIN_SAMPLES:
+                    self.p95 = _percentile(sorted(self.latencies), 0.95)
+
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open("probe failed", min(self.cooldown * 2, MAX_COOLDOWN))
+                else:
+                    self._close()
+            elif self.state == CLOSED:
+                reason = self._trip_reason()
+                if reason:
+                    self._open(reason, self.base_cooldown)
+
+    def _trip_reason(self) -> Optional[str]:
+        if self.consecutive_failures >= self.failure_threshold:
+            return f"{self.consecutive_failures} consecutive failures"
+        if len(self.failures) >= MIN_SAMPLES:
+            rate = sum(self.failures) / len(self.failures)
+            if rate >= self.error_rate_threshold:
+                return f"error rate {rate:.0%}"
+        if self.p95 is not None and self.p95 > self.latency_ceiling:
+            return f"p95 latency {self.p95 * 1000:.0f}ms"
+        return None
+
+    def _open(self, reason: str, cooldown: float):
+        self.state = OPEN
+        self.reason = reason
+        self.opened_at = time.monotonic()
+        self.cooldown = cooldown
+        EXCHANGE_BREAKER_OPEN.labels(self.name).set(1)
+        logger.warning("Taking %s out of service for %gs: %s", self.name, cooldown, reason)
+
+    def _close(self):
+        self.state = CLOSED
+        self.reason = None
+        self.cooldown = self.base_cooldown
+        self.consecutive_failures = 0
+        # Start over so the statistics that tripped the breaker don't trip it again
+        self.latencies.clear()
+        self.failures.clear()
+        self.p95 = None
+        EXCHANGE_BREAKER_OPEN.labels(self.name).set(0)
+        logger.info("%s is back in service", self.name)
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 latency to wait before hedging a read, once enough calls are seen"""
+        return self.p95 if self.state == CLOSED else None
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            ordered = sorted(self.latencies)
+            failures = list(self.failures)
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "reason": self.reason,
+            "retry_in": retry_in,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": (sum(failures) / len(failures)) if failures else None,
+            "p50_ms": _percentile(ordered, 0.50) * 1000 if ordered else None,
+            "p95_ms": _percentile(ordered, 0.95) * 1000 if ordered else None,
+            "p99_ms": _percentile(ordered, 0.99) * 1000 if ordered else None,
+            "samples": len(failures)
+        }
+
+
+class HealthTracker:
+    """Health of every venue this process talks to"""
+
+    def __init__(self, **config):
+        self.config = config
+        self.venues: Dict[str, ExchangeHealth] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ExchangeHealth:
+        health = self.venues.get(name)
+        if health is None:
+            with self._lock:
+                health = self.venues.setdefault(name, ExchangeHealth(name, **self.config))
+        return health
+
+    def available(self, name: str) -> bool:
+        return self.get(name).available()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: health.snapshot() for name, health in sorted(self.venues.items())}
+
+
+exchange_health = HealthTracker(
+    failure_threshold=settings.BREAKER_FAILURES,
+    error_rate=settings.BREAKER_ERROR_RATE,
+    latency_ceiling=settings.BREAKER_LATENCY_MS / 1000,
+    cooldown=settings.BREAKER_COOLDOWN
+)
@@ -0,0 +1,611 @@
+"""
+Simulated ccxt-compatible exchange for paper trading and offline load tests.
+
+A `SimulatedVenue` keeps one venue's balances and orders in memory and
+prices them off a market feed:
+
+- `SyntheticFeed`: a seeded, stateless market. Prices are a function of the
+  seed and the clock only, so every process (and every shard worker) sees
+  the same quotes. Each venue deviates from the common mid by its own noise,
+  which is where cross-venue spreads come from.
+- `ReplayFeed`: ticks recorded in the TickStore, replayed against the wall
+  clock and looped at the end of the range.
+
+`SimulatedExchange` and `AsyncSimulatedExchange` expose a venue under the
+ccxt method names that ExchangeManager and AsyncExchangeManager call. They
+add request latency, taker/maker fees, partial fills, post-only rejection,
+injected failures and clock skew, and raise ccxt's own exception types.
+
+Venues are shared per process (see `get_venue`), so orders placed through
+the sync executor show up in balances read through the async manager.
+"""
+import asyncio
+import itertools
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import ccxt
+
+from config.config import settings
+from utils.logger import logger
+
+# Rough starting prices; unknown assets get a stable pseudo-random price
+BASE_PRICES = {"BTC": 60000.0, "ETH": 3000.0, "SOL": 150.0, "BNB": 550.0, "XRP": 0.6, "DOGE": 0.15}
+
+# Periods (seconds) of the slow waves the synthetic mid price is built from
+WAVE_PERIODS = (60.0, 600.0, 3600.0, 21600.0)
+
+
+def _split(symbol: str):
+    base, _, quote = symbol.partition("/")
+    return base, quote or "USDT"
+
+
+def _gauss(*key) -> float:
+    """Deterministic standard normal for a key (same in every process)"""
+    return random.Random(":".join(str(part) for part in key)).gauss(0.0, 1.0)
+
+
+# ----------------------------------------------------------------------
+# Market feeds
+# ----------------------------------------------------------------------
+
+class SyntheticFeed:
+    """Seeded synthetic quotes: slow common waves plus per-venue dislocations"""
+
+    def __init__(self, seed: int = 42, volatility: float = 0.0005, dislocation: float = 0.002,
+                 spread_bps: float = 2.0, top_size_usd: float = 20000.0, step: float = 1.0):
+        self.seed = seed
+        self.volatility = volatility
+        self.dislocation = dislocation
+        self.spread_bps = spread_bps
+        self.top_size_usd = top_size_usd
+        self.step = step
+        self._waves: Dict[str, tuple] = {}
+
+    def _base_price(self, symbol: str) -> float:
+        base, _ = _split(symbol)
+        if base in BASE_PRICES:
+            return BASE_PRICES[base]
+        return random.Random(f"{self.seed}:price:{symbol}").uniform(0.1, 100.0)
+
+    def _mid(self, symbol: str, now: float) -> float:
+        waves = self._waves.get(symbol)
+        if waves is None:
+            rng = random.Random(f"{self.seed}:waves:{symbol}")
+            waves = (self._base_price(symbol),
+                     [(period, rng.uniform(0, 2 * math.pi)) for period in WAVE_PERIODS])
+            self._waves[symbol] = waves
+        base_price, phases = waves
+        log_move = sum(self.volatility * math.sqrt(period) * math.sin(2 * math.pi * now / period + phase)
+                       for period, phase in phases) / len(phases)
+        return base_price * math.exp(log_move)
+
+    def quote(self, venue: str, symbol: str, now: float) -> Optional[Dict]:
+        step = int(now // self.step)
+        mid = self._mid(symbol, step * self.step)
+        venue_mid = mid * (1 + self.dislocation * _gauss(self.seed, venue, symbol, step))
+        half_spread = venue_mid * self.spread_bps / 2e4
+        size_noise = random.Random(f"{self.seed}:size:{venue}:{symbol}:{step}")
+        return {
+            "bid": venue_mid - half_spread,
+            "ask": venue_mid + half_spread,
+            "bid_size": self.top_size_usd / mid * size_noise.uniform(0.5, 1.5),
+            "ask_size": self.top_size_usd / mid * size_noise.uniform(0.5, 1.5),
+            "last": venue_mid,
+            "timestamp": step * self.step
+        }
+
+
+class ReplayFeed:
+    """Recorded TickStore ticks replayed against the wall clock
+
+    A venue replays the ticks recorded under the same exchange name. Replay
+    time runs `speed` times faster than the wall clock and wraps around at
+    the end of [start, end).
+    """
+
+    def __init__(self, tick_store, start: float, end: float, speed: float = 1.0):
+        self.tick_store = tick_store
+        self.start = start
+        self.end = end
+        self.speed = speed
+        self.started_at = time.time()
+        # (venue, symbol) -> recorded rows for that venue, in ts order
+        self._rows: Dict[tuple, object] = {}
+        self._loaded = set()
+        self._lock = threading.Lock()
+
+    def _load(self, symbol: str):
+        with self._lock:
+            if symbol in self._loaded:
+                return
+            ticks = self.tick_store.scan(symbol, self.start, self.end)
+            for exchange_id in set(ticks["exchange"].tolist()):
+                name = self.tick_store.exchange_name(exchange_id)
+                self._rows[(name, symbol)] = ticks[ticks["exchange"] == exchange_id]
+            self._loaded.add(symbol)
+
+    def quote(self, venue: str, symbol: str, now: float) -> Optional[Dict]:
+        if symbol not in self._loaded:
+            self._load(symbol)
+        rows = self._rows.get((venue, symbol))
+        if rows is None or not len(rows):
+            return None
+        replay_ts = self.start + ((now - self.started_at) * self.speed) % (self.end - self.start)
+        index = int(rows["ts"].searchsorted(replay_ts, side="right")) - 1
+        if index < 0:
+            return None
+        row = rows[index]
+        # When this row "happened" on the wall clock, so repeated reads of one row agree
+        happened = now - (replay_ts - float(row["ts"])) / self.speed
+        return {
+            "bid": float(row["bid"]),
+            "ask": float(row["ask"]),
+            "bid_size": float(row["bid_size"]),
+            "ask_size": float(row["ask_size"]),
+            "last": float(row["last"]),
+            "timestamp": happened
+        }
+
+
+# ----------------------------------------------------------------------
+# Venue
+# ----------------------------------------------------------------------
+
+class SimulatedVenue:
+    """In-memory balances and orders for one simulated exchange"""
+
+    def __init__(self, name: str, feed, balances: Optional[Dict[str, float]] = None,
+                 fee: float = 0.001, maker_fee: Optional[float] = None, latency: float = 0.05,
+                 failure_rate: float = 0.0, partial_fill_rate: float = 0.0,
+                 depth_levels: int = 10, seed: int = 42, clock_offset: float = 0.0):
+        self.name = name
+        self.feed = feed
+        self.fee = fee
+        self.maker_fee = fee if maker_fee is None else maker_fee
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.partial_fill_rate = partial_fill_rate
+        self.depth_levels = depth_levels
+        # Seconds this venue's clock runs ahead of ours; applied to market-data timestamps
+        self.clock_offset = clock_offset
+        self.rng = random.Random(f"{seed}:{name}")
+        # asset -> [free, used]
+        self.balances: Dict[str, List[float]] = {
+            asset: [float(amount), 0.0] for asset, amount in (balances or {}).items()
+        }
+        self.orders: Dict[str, Dict] = {}
+        # order id -> timestamp of the quote it last filled against
+        self._matched: Dict[str, float] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # -- helpers ---------------------------------------------------------
+
+    def delay(self) -> float:
+        """Request latency for one call, jittered +/-50%"""
+        return self.latency * self.rng.uniform(0.5, 1.5) if self.latency > 0 else 0.0
+
+    def _maybe_fail(self, method: str):
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            raise ccxt.NetworkError(f"{self.name} {method}: simulated network failure")
+
+    def _quote(self, symbol: str) -> Dict:
+        quote = self.feed.quote(self.name, symbol, time.time())
+        if not quote or quote["bid"] <= 0 or quote["ask"] <= 0:
+            raise ccxt.BadSymbol(f"{self.name} has no market data for {symbol}")
+        return quote
+
+    def _levels(self, quote: Dict, side: str) -> List[List[float]]:
+        """Book levels on one side, widening one spread per level"""
+        spread = max(quote["ask"] - quote["bid"], quote["ask"] * 1e-5)
+        if side == "asks":
+            return [[quote["ask"] + i * spread, quote["ask_size"] * (1 + 0.5 * i)]
+                    for i in range(self.depth_levels)]
+        return [[quote["bid"] - i * spread, quote["bid_size"] * (1 + 0.5 * i)]
+                for i in range(self.depth_levels)]
+
+    def _account(self, asset: str) -> List[float]:
+        return self.balances.setdefault(asset, [0.0, 0.0])
+
+    # -- market data -----------------------------------------------------
+
+    def load_markets(self, reload: bool = False) -> Dict:
+        return {}
+
+    def fetch_time(self, params=None) -> int:
+        self._maybe_fail("fetch_time")
+        return int((time.time() + self.clock_offset) * 1000)
+
+    def fetch_ticker(self, symbol: str) -> Dict:
+        self._maybe_fail("fetch_ticker")
+        quote = self._quote(symbol)
+        timestamp = int((quote["timestamp"] + self.clock_offset) * 1000)
+        return {
+            "symbol": symbol,
+            "timestamp": timestamp,
+            "datetime": datetime.fromtimestamp(timestamp / 1000, timezone.utc).isoformat(),
+            "bid": quote["bid"],
+            "ask": quote["ask"],
+            "bidVolume": quote["bid_size"],
+            "askVolume": quote["ask_size"],
+            "last": quote["last"],
+            "close": quote["last"],
+            "info": {}
+        }
+
+    def fetch_order_book(self, symbol: str, limit: Optional[int] = None) -> Dict:
+        self._maybe_fail("fetch_order_book")
+        quote = self._quote(symbol)
+        depth = limit or self.depth_levels
+        return {
+            "symbol": symbol,
+            "bids": self._levels(quote, "bids")[:depth],
+            "asks": self._levels(quote, "asks")[:depth],
+            "timestamp": int((quote["timestamp"] + self.clock_offset) * 1000),
+            "nonce": None
+        }
+
+    # -- account ---------------------------------------------------------
+
+    def fetch_balance(self, params: Optional[Dict] = None) -> Dict:
+        self._maybe_fail("fetch_balance")
+        with self._lock:
+            self._match_resting()
+            result = {"info": {}, "free": {}, "used": {}, "total": {}}
+            for asset, (free, used) in self.balances.items():
+                result[asset] = {"free": free, "used": used, "total": free + used}
+                result["free"][asset] = free
+                result["used"][asset] = used
+                result["total"][asset] = free + used
+            return result
+
+    # -- orders ----------------------------------------------------------
+
+    def create_market_order(self, symbol: str, side: str, amount: float, price=None, params=None) -> Dict:
+        return self.create_order(symbol, "market", side, amount)
+
+    def create_limit_order(self, symbol: str, side: str, amount: float, price: float, params=None) -> Dict:
+        return self.create_order(symbol, "limit", side, amount, price, params)
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float,
+                     price: Optional[float] = None, params: Optional[Dict] = None) -> Dict:
+        self._maybe_fail("create_order")
+        if side not in ("buy", "sell"):
+            raise ccxt.InvalidOrder(f"{self.name}: unknown side {side}")
+        if type not in ("market", "limit"):
+            raise ccxt.InvalidOrder(f"{self.name}: unsupported order type {type}")
+        if amount <= 0 or (type == "limit" and not price):
+            raise ccxt.InvalidOrder(f"{self.name}: invalid amount or price")
+
+        with self._lock:
+            self._match_resting()
+            quote = self._quote(symbol)
+            if type == "limit" and (params or {}).get("postOnly") and (
+                    price >= quote["ask"] if side == "buy" else price <= quote["bid"]):
+                raise ccxt.OrderImmediatelyFillable(f"{self.name}: post-only {side} at {price} would take liquidity")
+            now = time.time()
+            order = {
+                "id": f"{self.name}-{next(self._ids)}",
+                "clientOrderId": None,
+                "timestamp": int(now * 1000),
+                "datetime": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+                "lastTradeTimestamp": None,
+                "symbol": symbol,
+                "type": type,
+                "side": side,
+                "price": price,
+                "average": None,
+                "amount": amount,
+                "filled": 0.0,
+                "remaining": amount,
+                "cost": 0.0,
+                "status": "open",
+                "fee": {"cost": 0.0, "currency": _split(symbol)[1], "rate": self.fee},
+                "trades": [],
+                "info": {"simulated": True}
+            }
+            if type == "limit":
+                self._reserve(order)
+            else:
+                self._check_market_funds(order, quote)
+
+            # Take liquidity from the book (limit orders only down to their price)
+            fillable = amount
+            if self.partial_fill_rate and self.rng.random() < self.partial_fill_rate:
+                fillable = amount * self.rng.uniform(0.1, 0.9)
+            levels = self._levels(quote, "asks" if side == "buy" else "bids")
+            for level_price, level_size in levels:
+                if fillable <= 1e-12:
+                    break
+                if type == "limit" and (level_price > price if side == "buy" else level_price < price):
+                    break
+                quantity = min(fillable, level_size)
+                self._fill(order, quantity, level_price, self.fee)
+                fillable -= quantity
+
+            if type == "market" or order["remaining"] <= 1e-12:
+                # Market orders never rest: anything the book couldn't take expires
+                order["status"] = "closed" if order["remaining"] <= 1e-12 else "expired"
+                self._release(order)
+            self.orders[order["id"]] = order
+            return dict(order)
+
+    def _reserve_rate(self) -> float:
+        return 1 + max(self.fee, self.maker_fee)
+
+    def _reserve(self, order: Dict):
+        """Move the funds a limit order could use from free to used"""
+        base, quote_asset = _split(order["symbol"])
+        if order["side"] == "buy":
+            asset, needed = quote_asset, order["amount"] * order["price"] * self._reserve_rate()
+        else:
+            asset, needed = base, order["amount"]
+        account = self._account(asset)
+        if account[0] < needed:
+            raise ccxt.InsufficientFunds(f"{self.name}: need {needed:.8f} {asset}, have {account[0]:.8f}")
+        account[0] -= needed
+        account[1] += needed
+
+    def _release(self, order: Dict):
+        """Return the reservation for an order's unfilled remainder"""
+        if order["type"] != "limit" or order["remaining"] <= 0:
+            return
+        base, quote_asset = _split(order["symbol"])
+        if order["side"] == "buy":
+            asset, amount = quote_asset, order["remaining"] * order["price"] * self._reserve_rate()
+        else:
+            asset, amount = base, order["remaining"]
+        account = self._account(asset)
+        account[1] -= amount
+        account[0] += amount
+
+    def _check_market_funds(self, order: Dict, quote: Dict):
+        base, quote_asset = _split(order["symbol"])
+        if order["side"] == "buy":
+            # Walk the book to estimate what the whole order would cost
+            remaining, cost = order["amount"], 0.0
+            for level_price, level_size in self._levels(quote, "asks"):
+                quantity = min(remaining, level_size)
+                cost += quantity * level_price
+                remaining -= quantity
+                if remaining <= 0:
+                    break
+            asset, needed = quote_asset, cost * (1 + self.fee)
+        else:
+            asset, needed = base, order["amount"]
+        available = self._account(asset)[0]
+        if available < needed:
+            raise ccxt.InsufficientFunds(f"{self.name}: need {needed:.8f} {asset}, have {available:.8f}")
+
+    def _fill(self, order: Dict, quantity: float, price: float, fee_rate: float):
+        base, quote_asset = _split(order["symbol"])
+        base_account = self._account(base)
+        quote_account = self._account(quote_asset)
+        notional = quantity * price
+        fee_cost = notional * fee_rate
+        reserved = order["type"] == "limit"
+
+        if order["side"] == "buy":
+            if reserved:
+                held = quantity * order["price"] * self._reserve_rate()
+                quote_account[1] -= held
+                quote_account[0] += held - notional - fee_cost
+            else:
+                quote_account[0] -= notional + fee_cost
+            base_account[0] += quantity
+        else:
+            if reserved:
+                base_account[1] -= quantity
+            else:
+                base_account[0] -= quantity
+            quote_account[0] += notional - fee_cost
+
+        order["filled"] += quantity
+        order["remaining"] = max(order["amount"] - order["filled"], 0.0)
+        order["cost"] += notional
+        order["average"] = order["cost"] / order["filled"]
+        order["fee"]["cost"] += fee_cost
+        order["lastTradeTimestamp"] = int(time.time() * 1000)
+        order["trades"].append({"price": price, "amount": quantity, "cost": notional,
+                                "fee": {"cost": fee_cost, "currency": quote_asset, "rate": fee_rate}})
+
+    def _match_resting(self):
+        """Fill open limit orders the market has moved through (maker fills)
+
+        Each quote update can fill an order once, up to its displayed size.
+        """
+        for order in self.orders.values():
+            if order["status"] != "open":
+                continue
+            try:
+                quote = self._quote(order["symbol"])
+            except ccxt.BadSymbol:
+                continue
+            if self._matched.get(order["id"]) == quote["timestamp"]:
+                continue
+            if order["side"] == "buy" and quote["ask"] <= order["price"]:
+                available = quote["ask_size"]
+            elif order["side"] == "sell" and quote["bid"] >= order["price"]:
+                available = quote["bid_size"]
+            else:
+                continue
+            self._matched[order["id"]] = quote["timestamp"]
+            self._fill(order, min(order["remaining"], available), order["price"], self.maker_fee)
+            if order["remaining"] <= 1e-12:
+                order["status"] = "closed"
+                self._matched.pop(order["id"], None)
+
+    def fetch_order(self, id: str, symbol: Optional[str] = None, params=None) -> Dict:
+        self._maybe_fail("fetch_order")
+        with self._lock:
+            self._match_resting()
+            order = self.orders.get(id)
+            if order is None:
+                raise ccxt.OrderNotFound(f"{self.name}: order {id} not found")
+            return dict(order)
+
+    def fetch_open_orders(self, symbol: Optional[str] = None, since=None, limit=None, params=None) -> List[Dict]:
+        self._maybe_fail("fetch_open_orders")
+        with self._lock:
+            self._match_resting()
+            return [dict(order) for order in self.orders.values()
+                    if order["status"] == "open" and (symbol is None or order["symbol"] == symbol)]
+
+    def cancel_order(self, id: str, symbol: Optional[str] = None, params=None) -> Dict:
+        self._maybe_fail("cancel_order")
+        with self._lock:
+            self._match_resting()
+            order = self.orders.get(id)
+            if order is None:
+                raise ccxt.OrderNotFound(f"{self.name}: order {id} not found")
+            if order["status"] != "open":
+                raise ccxt.OrderNotFound(f"{self.name}: order {id} is {order['status']}")
+            self._release(order)
+            order["status"] = "canceled"
+            self._matched.pop(order["id"], None)
+            return dict(order)
+
+
+# ----------------------------------------------------------------------
+# ccxt-style clients
+# ----------------------------------------------------------------------
+
+VENUE_METHODS = {
+    "load_markets", "fetch_time", "fetch_ticker", "fetch_order_book", "fetch_balance", "create_order",
+    "create_market_order", "create_limit_order", "fetch_order", "fetch_open_orders", "cancel_order"
+}
+
+
+class SimulatedExchange:
+    """Sync ccxt-style client for a simulated venue; each call waits out the latency"""
+
+    def __init__(self, venue: SimulatedVenue):
+        self.venue = venue
+        self.id = venue.name
+        self.fees = {"trading": {"taker": venue.fee, "maker": venue.maker_fee}}
+        self.has = {"fetchTime": True}
+
+    def __getattr__(self, name):
+        if name not in VENUE_METHODS:
+            raise AttributeError(name)
+        method = getattr(self.venue, name)
+
+        def call(*args, **kwargs):
+            time.sleep(self.venue.delay())
+            return method(*args, **kwargs)
+        return call
+
+    def close(self):
+        pass
+
+
+class AsyncSimulatedExchange:
+    """Async ccxt-style client for a simulated venue"""
+
+    def __init__(self, venue: SimulatedVenue):
+        self.venue = venue
+        self.id = venue.name
+        self.fees = {"trading": {"taker": venue.fee, "maker": venue.maker_fee}}
+        self.has = {"fetchTime": True}
+
+    def __getattr__(self, name):
+        if name not in VENUE_METHODS:
+            raise AttributeError(name)
+        method = getattr(self.venue, name)
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(self.venue.delay())
+            return method(*args, **kwargs)
+        return call
+
+    async def close(self):
+        pass
+
+
+# ----------------------------------------------------------------------
+# Per-process venues built from settings
+# ----------------------------------------------------------------------
+
+_venues: Dict[str, SimulatedVenue] = {}
+_feed = None
+_lock = threading.Lock()
+
+
+def simulated_exchange_names() -> List[str]:
+    """Venues to simulate: every configured exchange in paper-trading mode, plus extras"""
+    names = list(settings.EXCHANGES) if settings.PAPER_TRADING else []
+    names += [name for name in settings.SIMULATED_EXCHANGES if name not in names]
+    return names
+
+
+def _parse_balances(spec: str) -> Dict[str, float]:
+    balances = {}
+    for item in spec.split(","):
+        asset, _, amount = item.partition("=")
+        if asset.strip():
+            balances[asset.strip().upper()] = float(amount or 0)
+    return balances
+
+
+def _day_start(day: str) -> float:
+    return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def _recorded_range(store) -> tuple:
+    """First and last recorded tick times for the trading pairs"""
+    days = store.days()
+    firsts = [store.load(symbol, days[0]) for symbol in settings.TRADING_PAIRS]
+    lasts = [store.load(symbol, days[-1]) for symbol in settings.TRADING_PAIRS]
+    start = min((float(rows["ts"][0]) for rows in firsts if len(rows)), default=None)
+    end = max((float(rows["ts"][-1]) for rows in lasts if len(rows)), default=None)
+    if start is None or end is None:
+        raise ValueError(f"No recorded ticks for {settings.TRADING_PAIRS} in {settings.TICK_STORE_DIR}")
+    return start, end + 1.0
+
+
+def _build_feed():
+    if settings.SIM_FEED == "replay":
+        from database.tick_store import TickStore
+        store = TickStore(settings.TICK_STORE_DIR)
+        if not store.days():
+            raise ValueError(f"SIM_FEED=replay but {settings.TICK_STORE_DIR} has no recorded ticks")
+        start, end = _recorded_range(store)
+        if settings.SIM_REPLAY_START:
+            start = _day_start(settings.SIM_REPLAY_START)
+        if settings.SIM_REPLAY_END:
+            end = _day_start(settings.SIM_REPLAY_END)
+        logger.info("Simulated venues replay %s from %s", settings.TICK_STORE_DIR,
+                    datetime.fromtimestamp(start, timezone.utc).isoformat())
+        return ReplayFeed(store, start, end, speed=settings.SIM_REPLAY_SPEED)
+    return SyntheticFeed(seed=settings.SIM_SEED, dislocation=settings.SIM_DISLOCATION)
+
+
+def get_venue(name: str) -> SimulatedVenue:
+    """The process-wide simulated venue `name`, created from settings on first use"""
+    global _feed
+    with _lock:
+        venue = _venues.get(name)
+        if venue is None:
+            if _feed is None:
+                _feed = _build_feed()
+            venue = SimulatedVenue(
+                name, _feed,
+                balances=_parse_balances(settings.SIM_BALANCES),
+                fee=settings.SIM_FEE,
+                maker_fee=settings.SIM_MAKER_FEE,
+                latency=settings.SIM_LATENCY_MS / 1000,
+                failure_rate=settings.SIM_FAILURE_RATE,
+                partial_fill_rate=settings.SIM_PARTIAL_FILL_RATE,
+                seed=settings.SIM_SEED,
+                # A stable per-venue skew within +/-SIM_CLOCK_SKEW_MS
+                clock_offset=settings.SIM_CLOCK_SKEW_MS / 1000 * (2 * random.Random(
+                    f"{settings.SIM_SEED}:clock:{name}").random() - 1)
+            )
+            _venues[name] = venue
+        return venue
@@ -18,11 +18,9 @@ document.querySelectorAll('.tab-button').forEach(button => {
     });
 });
 
-// Load credential status on page load and periodically
+// Load credential status on page load; it is refreshed after saves and deletes
 window.addEventListener('load', () => {
     loadCredentialStatus();
-    // Refresh every 5 seconds
-    setInterval(loadCredentialStatus, 5000);
 });
 
 // Load and display credential status with masked hashes
@@ -152,6 +150,7 @@ async function saveCredentials() {
                 showCredentialStatus('✅ ' + data.message + '\n🔒 Credentials encrypted and saved!', 'success');
                 // Clear the form
                 document.querySelectorAll('.exchange-input').forEach(input => input.value = '');
+                loadCredentialStatus();
                 setTimeout(() => showCredentialStatus('', ''), 5000);
             } else {
                 showCredentialStatus('❌ ' + (data.message || 'Error saving credentials'), 'error');
@@ -202,6 +201,7 @@ async function deleteCredentials(exchange) {
             });
             
             showCredentialStatus(`✅ ${exchange.toUpperCase()} credentials deleted successfully!`, 'success');
+            loadCredentialStatus();
             setTimeout(() => showCredentialStatus('', ''), 3000);
         } else {
             showCredentialStatus('❌ ' + (data.message || 'Error deleting credentials'), 'error');
@@ -212,8 +212,130 @@ async function deleteCredentials(exchange) {
     }
 }
 
+// Live updates pushed over WebSocket; REST polling is only a fallback while disconnected
+const LIVE_TOPICS = ['prices', 'opportunities', 'balances', 'trades'];
+const liveState = { prices: {}, opportunities: {}, balances: {}, trades: {} };
+const liveMeta = { prices: {}, opportunities: {}, balances: {}, trades: {} };
+let liveSocket = null;
+let reconnectDelay = 1000;
+let pollTimer = null;
+
+function isLive() {
+    return liveSocket && liveSocket.readyState === WebSocket.OPEN;
+}
+
+function currentPairs() {
+    const pairsInput = document.getElementById('pairs-input');
+    const pairs = pairsInput ? pairsInput.value : "BTC/USDT,ETH/USDT";
+    return pairs.split(',').map(p => p.trim()).filter(p => p);
+}
+
+function connectLive() {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    liveSocket = new WebSocket(`${protocol}//${window.location.host}/ws`);
+    
+    liveSocket.onopen = () => {
+        reconnectDelay = 1000;
+        stopPolling();
+        setConnectionStatus(true);
+        subscribeLive();
+    };
+    
+    liveSocket.onmessage = (event) => {
+        applyLiveMessage(JSON.parse(event.data));
+    };
+    
+    liveSocket.onclose = () => {
+        setConnectionStatus(false);
+        startPolling();
+        setTimeout(connectLive, reconnectDelay);
+        reconnectDelay = Math.min(reconnectDelay * 2, 30000);
+    };
+}
+
+function subscribeLive() {
+    if (!isLive()) return;
+    liveSocket.send(JSON.stringify({
+        action: 'subscribe',
+        topics: LIVE_TOPICS,
+        symbols: currentPairs()
+    }));
+}
+
+function applyLiveMessage(message) {
+    const topic = message.topic;
+    if (!(topic in liveState)) return;
+    
+    if (message.type === 'snapshot') {
+        liveState[topic] = message.data || {};
+    } else {
+        Object.assign(liveState[topic], message.data || {});
+        (message.removed || []).forEach(key => delete liveState[topic][key]);
+    }
+    if (message.meta) {
+        liveMeta[topic] = message.meta;
+    }
+    renderLive(topic);
+}
+
+function renderLive(topic) {
+    if (topic === 'prices') {
+        const exchangeFilter = document.getElementById('exchange-filter');
+        displayPrices({
+            prices: liveState.prices,
+            configured_exchanges: liveMeta.prices.configured_exchanges || []
+        }, exchangeFilter ? exchangeFilter.value : "");
+    } else if (topic === 'opportunities') {
+        const opportunities = Object.values(liveState.opportunities);
+        opportunities.sort((a, b) => b.spread_pct - a.spread_pct);
+        displayOpportunities(opportunities);
+    } else if (topic === 'balances') {
+        const exchangeFilter = document.getElementById('balance-exchange-filter');
+        const assetFilter = document.getElementById('asset-filter');
+        displayBalances(liveState.balances,
+            exchangeFilter ? exchangeFilter.value : "",
+            assetFilter ? assetFilter.value.toUpperCase() : "");
+    } else if (topic === 'trades') {
+        const trades = Object.values(liveState.trades);
+        trades.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+        displayTrades(trades);
+    }
+}
+
+function pollOnce() {
+    fetchPrices(currentPairs().join(','));
+    fetchOpportunities();
+    fetchBalances();
+    fetchTrades();
+}
+
+function startPolling() {
+    if (pollTimer) return;
+    pollTimer = setInterval(pollOnce, 5000);
+}
+
+function stopPolling() {
+    if (pollTimer) {
+        clearInterval(pollTimer);
+        pollTimer = null;
+    }
+}
+
+function setConnectionStatus(connected) {
+    const indicator = document.getElementById('status-indicator');
+    const text = document.getElementById('status-text');
+    indicator.style.color = connected ? '#27ae60' : '#e74c3c';
+    text.textContent = connected ? 'Connected (live)' : 'Reconnecting...';
+}
+
 // Fetch and display prices with custom pairs
 async function updatePrices() {
+    if (isLive()) {
+        subscribeLive();
+        renderLive('prices');
+        return;
+    }
+    
     const pairsInput = document.getElementById('pairs-input');
     const exchangeFilter = document.getElementById('exchange-filter');
     
@@ -313,8 +435,8 @@ function displayPrices(data, exchangeFilter = "") {
 async function fetchOpportunities() {
     try {
         const response = await fetch(`${API_BASE}/opportunities`);
-        const opportunities = await response.json();
-        displayOpportunities(opportunities);
+        const data = await response.json();
+        displayOpportunities(data.opportunities || []);
     } catch (error) {
         console.error('Error fetching opportunities:', error);
     }
@@ -348,6 +470,11 @@ function displayOpportunities(opportunities) {
 
 // Fetch and display balances with filters
 async function updateBalances() {
+    if (isLive()) {
+        renderLive('balances');
+        return;
+    }
+    
     const exchangeFilter = document.getElementById('balance-exchange-filter');
     const assetFilter = document.getElementById('asset-filter');
     
@@ -357,12 +484,23 @@ async function updateBalances() {
     await fetchBalances(exchange, asset);
 }
 
-// Fetch and display balances
+// Fetch and display balances; after the first load only changed exchanges are sent
+let balanceCache = {};
+let balanceVersion = null;
+
 async function fetchBalances(exchangeFilter = "", assetFilter = "") {
     try {
-        const response = await fetch(`${API_BASE}/balances`);
-        const balances = await response.json();
-        displayBalances(balances, exchangeFilter, assetFilter);
+        const query = balanceVersion === null ? '' : `?since=${balanceVersion}`;
+        const response = await fetch(`${API_BASE}/balances${query}`);
+        const body = await response.json();
+        if (body.full) {
+            balanceCache = body.data || {};
+        } else {
+            Object.assign(balanceCache, body.data || {});
+            (body.removed || []).forEach(exchange => delete balanceCache[exchange]);
+        }
+        balanceVersion = body.version;
+        displayBalances(balanceCache, exchangeFilter, assetFilter);
     } catch (error) {
         console.error('Error fetching balances:', error);
         const tbody = document.getElementById('balances-tbody');
@@ -444,9 +582,9 @@ function displayBalances(balances, exchangeFilter = "", assetFilter = "") {
 // Fetch and display trade history
 async function fetchTrades() {
     try {
-        const response = await fetch(`${API_BASE}/trades`);
-        const trades = await response.json();
-        displayTrades(trades);
+        const response = await fetch(`${API_BASE}/trades/history?limit=50`);
+        const data = await response.json();
+        displayTrades(data.trades || []);
     } catch (error) {
         console.error('Error fetching trades:', error);
     }
@@ -492,7 +630,7 @@ function updateStatus() {
     fetch(`${API_BASE}/health`)
         .then(r => {
             indicator.style.color = '#27ae60';
-            text.textContent = 'Connected';
+            text.textContent = isLive() ? 'Connected (live)' : 'Connected';
         })
         .catch(() => {
             indicator.style.color = '#e74c3c';
@@ -503,10 +641,11 @@ function updateStatus() {
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
     updateStatus();
-    fetchPrices();
-    fetchOpportunities();
-    fetchBalances();
-    fetchTrades();
+    pollOnce();
+    connectLive();
+    
+    // Bot status isn't pushed over the WebSocket, so keep checking it
+    setInterval(updateStatus, 5000);
     
     // Add credential save listener
     const saveCredentialsBtn = document.getElementById('save-credentials');
@@ -521,12 +660,4 @@ document.addEventListener('DOMContentLoaded', () => {
             alert('Settings saved!');
         });
     }
-    
-    // Refresh every 5 seconds
-    setInterval(() => {
-        fetchPrices();
-        fetchOpportunities();
-        fetchBalances();
-        updateStatus();
-    }, 5000);
 });
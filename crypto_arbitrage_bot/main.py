@@ -1,80 +1,420 @@
 """
 Main entry point for the arbitrage bot.
+
+Only light modules are imported up front. Exchange clients, the database,
+the tick store and the notifier are built when the bot starts running (in
+worker threads, concurrently), and the sync order clients are built in the
+background while market data is already flowing.
 """
+import functools
 import sys
+import time
+import signal
 import asyncio
+from typing import List, Optional
 from utils.logger import logger
 from config.config import settings
-from core.price_monitor import PriceMonitor
+from config.runtime_config import RuntimeConfig
 from core.arbitrage_engine import ArbitrageEngine
-from core.trade_executor import TradeExecutor
-from core.inventory_manager import InventoryManager
+from core.fee_schedule import FeeSchedule, parse_fee_overrides
+from core.models import Opportunity
 from core.risk_manager import RiskManager
-from database.db import init_db
-from utils.notifications import TelegramNotifier
+from core.supervisor import supervise, run_every, put_latest
+from datetime import datetime
+from exchanges.clock import exchange_clock
+from utils.lazy import Lazy
+from utils.metrics import DB_WRITE_QUEUE, STALE_QUOTES, start_http_server
+from utils.profiling import function_timings, register_loop
+
+def _build_trade_executor(fees: FeeSchedule):
+    # Sync ccxt is only needed for placing orders
+    from core.trade_executor import TradeExecutor
+    return TradeExecutor(fees=fees)
 
 class ArbitrageBot:
+    """Asyncio runtime: supervised tasks connected by queues
+
+    market data -> (latest prices) -> detection -> (opportunities) -> execution
+    balances ----------------------------------------------------------+
+    execution / balances -> (writes) -> persistence
+    """
+    
     def __init__(self):
-        self.price_monitor = PriceMonitor()
+        # Realigned with the connected exchanges once the clients are built
+        self.fee_schedule = FeeSchedule(settings.EXCHANGES, default=settings.DEFAULT_FEE,
+                                        overrides=parse_fee_overrides(settings.FEE_OVERRIDES))
         self.arbitrage_engine = ArbitrageEngine(
             min_spread=settings.MIN_SPREAD_THRESHOLD,
-            max_position_size=settings.MAX_POSITION_SIZE
+            max_position_size=settings.MAX_POSITION_SIZE,
+            fees=self.fee_schedule
         )
-        self.trade_executor = TradeExecutor()
-        self.inventory_manager = InventoryManager()
         self.risk_manager = RiskManager(
             daily_loss_limit=settings.DAILY_LOSS_LIMIT,
             max_exposure=settings.MAX_TOTAL_EXPOSURE
         )
-        self.telegram_notifier = TelegramNotifier()
+        self.trade_executor = Lazy(lambda: _build_trade_executor(self.fee_schedule), "trade_executor")
         self.auto_trading_enabled = False
-        self.trading_pairs = ["BTC/USDT", "ETH/USDT"]
+        self.trading_pairs = list(settings.TRADING_PAIRS)
+        self.runtime_config = RuntimeConfig()
+        self.runtime_config.add_listener(self.apply_config)
+        # Built by _build_clients() / _open_database() when the bot starts
+        self.tick_store = None
+        self.exchange_manager = None
+        self.price_monitor = None
+        self.inventory_manager = None
+        self.telegram_notifier = None
+        self.db = None
+        self.balance_retention = None
+        self.shards = None
+        self.matrix_detector = None
+        # Stops of shard supervisors replaced by a TRADING_PAIRS reload
+        self._retiring_shards: List[asyncio.Task] = []
+        self._stopping: Optional[asyncio.Event] = None
+    
+    def _build_clients(self):
+        """Async exchange clients and the services that use them"""
+        from exchanges.ccxt_wrapper import AsyncExchangeManager
+        from core.price_monitor import PriceMonitor
+        from core.inventory_manager import InventoryManager
+        from utils.notifications import TelegramNotifier
+        
+        if settings.RECORD_MARKET_DATA:
+            from database.tick_store import TickStore
+            self.tick_store = TickStore(settings.TICK_STORE_DIR)
+        # One set of async clients for market data and balances; orders keep the sync executor
+        self.exchange_manager = AsyncExchangeManager()
+        self.price_monitor = PriceMonitor(exchange_manager=self.exchange_manager, tick_store=self.tick_store,
+                                          fees=self.fee_schedule)
+        self.inventory_manager = InventoryManager(exchange_manager=self.exchange_manager)
+        self.telegram_notifier = TelegramNotifier()
+    
+    def _open_database(self):
+        """Create tables and indexes and load today's stats into the risk manager"""
+        from database import db
+        from database.retention import BalanceRetention
+        
+        db.init_db()
+        self.db = db
+        self.balance_retention = BalanceRetention()
+        today = db.get_daily_stats(datetime.utcnow().date().isoformat())
+        if today:
+            self.risk_manager.load_daily_stats(db.daily_stats_to_dict(today))
     
     def start(self):
-        """Start the bot"""
+        """Start the bot and block until it is stopped (Ctrl+C or SIGTERM)"""
+        asyncio.run(self.run())
+    
+    def stop(self):
+        """Ask the running bot to shut down gracefully"""
+        if self._stopping is not None:
+            self._stopping.set()
+    
+    async def run(self):
+        """Run every task until stopped, then shut down in order"""
         logger.info("Starting arbitrage bot...")
-        init_db()
-        self.monitoring_loop()
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        # Profiles attribute samples from this thread to the running task
+        register_loop(loop)
+        function_timings.enabled = settings.FUNCTION_TIMINGS
+        if settings.METRICS_PORT:
+            start_http_server(settings.METRICS_PORT, admin_token=settings.ADMIN_TOKEN)
+            logger.info("Serving metrics on :%s/metrics", settings.METRICS_PORT)
+        await asyncio.gather(asyncio.to_thread(self._build_clients),
+                             asyncio.to_thread(self._open_database))
+        # Orders need the sync clients; build them while market data starts
+        warm_executor = asyncio.create_task(self.trade_executor.aget())
+        warm_executor.add_done_callback(self._log_warm_up_failure)
+        self.balance_retention.start()
+        self.runtime_config.start(loop)
+        self.telegram_notifier.start()
+        
+        # Detection only cares about the newest prices; stale ones are dropped
+        self.price_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.execution_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.MAX_CONCURRENT_TRADES)
+        self.persist_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        # Writes waiting for the persistence task; the one being written isn't counted
+        DB_WRITE_QUEUE.set_function(self.persist_queue.qsize)
+        
+        if settings.SHARD_WORKERS > 0:
+            # Worker processes own the feeds and write into shared memory; this
+            # process only runs detection over the matrix
+            self._start_shards()
+            producers = [
+                asyncio.create_task(supervise("shards", self.shard_monitor_task), name="shards"),
+                asyncio.create_task(supervise("detection", self.matrix_detection_task), name="detection"),
+            ]
+        else:
+            producers = [
+                asyncio.create_task(supervise("market_data", self.market_data_task), name="market_data"),
+                asyncio.create_task(supervise("detection", self.detection_task), name="detection"),
+            ]
+        producers.append(asyncio.create_task(supervise("balances", self.balance_task), name="balances"))
+        producers.append(asyncio.create_task(supervise("fees", self.fee_task), name="fees"))
+        producers.append(asyncio.create_task(supervise("clock", self.clock_task), name="clock"))
+        executor = asyncio.create_task(supervise("execution", self.execution_task), name="execution")
+        persister = asyncio.create_task(supervise("persistence", self.persistence_task), name="persistence")
+        try:
+            await self._stopping.wait()
+            logger.info("Shutting down...")
+        finally:
+            # Stop producing, let an in-flight trade finish, then flush pending writes
+            await self._cancel(producers + [warm_executor])
+            if self._retiring_shards:
+                await asyncio.gather(*self._retiring_shards, return_exceptions=True)
+            if self.shards:
+                await asyncio.to_thread(self.shards.stop)
+            self._discard_pending(self.execution_queue)
+            if self.trade_executor.ready:
+                # Don't sit out a resting maker order's timeout
+                self.trade_executor.get().stop()
+            await self._drain(self.execution_queue, executor, settings.SHUTDOWN_TIMEOUT)
+            await self._drain(self.persist_queue, persister, settings.SHUTDOWN_TIMEOUT)
+            self.telegram_notifier.stop()
+            self.runtime_config.stop()
+            self.balance_retention.stop()
+            await self.exchange_manager.close()
+            if self.tick_store:
+                self.tick_store.close()
+            logger.info("Bot stopped")
+    
+    @staticmethod
+    def _log_warm_up_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Warm-up of trade_executor failed: %s", task.exception())
+    
+    @staticmethod
+    async def _cancel(tasks: List[asyncio.Task]):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    @staticmethod
+    def _discard_pending(queue: asyncio.Queue):
+        """Drop queued items nobody has started on (stale opportunities)"""
+        while not queue.empty():
+            queue.get_nowait()
+            queue.task_done()
+    
+    def _start_shards(self):
+        """Start shard workers for the current trading pairs and detect over their matrix"""
+        from core.sharding import ShardSupervisor, MatrixDetector
+        shards = ShardSupervisor(self.trading_pairs, settings.EXCHANGES,
+                                 settings.SHARD_WORKERS, settings.PRICE_UPDATE_INTERVAL)
+        shards.start()
+        self.shards = shards
+        self.matrix_detector = MatrixDetector(shards.matrix, fees=self.fee_schedule)
+    
+    def _reshard(self):
+        """Replace the shard workers after the symbol set changed
+        
+        The quote matrix is sized for a fixed set of symbols, so a new
+        supervisor is started before detection is switched over to it and
+        the old one is stopped in the background.
+        """
+        old = self.shards
+        self._start_shards()
+        logger.info("Resharded %d symbols across %d workers", len(self.shards.symbols), len(self.shards.shards))
+        task = asyncio.create_task(asyncio.to_thread(old.stop))
+        self._retiring_shards.append(task)
+        task.add_done_callback(self._retiring_shards.remove)
+    
+    async def _drain(self, queue: asyncio.Queue, task: asyncio.Task, timeout: float):
+        """Wait for a consumer to finish its queue, then cancel it"""
+        try:
+            await asyncio.wait_for(queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Gave up waiting for %d queued items on shutdown", queue.qsize())
+        await self._cancel([task])
+    
+    def apply_config(self, changes: dict):
+        """Apply live configuration changes; exchange connections are left alone"""
+        if "TRADING_PAIRS" in changes:
+            self.trading_pairs = list(settings.TRADING_PAIRS)
+            if self.shards:
+                self._reshard()
+        if "MIN_SPREAD_THRESHOLD" in changes:
+            self.arbitrage_engine.min_spread = settings.MIN_SPREAD_THRESHOLD
+        if "MAX_POSITION_SIZE" in changes:
+            self.arbitrage_engine.max_position_size = settings.MAX_POSITION_SIZE
+        if "DAILY_LOSS_LIMIT" in changes or "MAX_TOTAL_EXPOSURE" in changes:
+            self.risk_manager.daily_loss_limit = settings.DAILY_LOSS_LIMIT
+            self.risk_manager.max_exposure = settings.MAX_TOTAL_EXPOSURE
+            self.risk_manager.check_risk_limits()
+        if "FUNCTION_TIMINGS" in changes:
+            function_timings.enabled = settings.FUNCTION_TIMINGS
+    
+    # ------------------------------------------------------------------
+    # Tasks
+    # ------------------------------------------------------------------
     
-    def monitoring_loop(self):
-        """Main monitoring and trading loop"""
+    async def shard_monitor_task(self, interval: float = 1.0):
+        """Restart dead shard workers of whichever supervisor is current"""
         while True:
+            self.shards.check()
+            await asyncio.sleep(interval)
+    
+    async def market_data_task(self):
+        """Fetch prices every PRICE_UPDATE_INTERVAL seconds"""
+        async def step():
             try:
-                prices = self.price_monitor.fetch_prices(self.trading_pairs)
-                opportunities = self.price_monitor.detect_opportunities(
-                    prices, 
-                    min_spread=settings.MIN_SPREAD_THRESHOLD
-                )
-                
-                logger.info(f"Detected {len(opportunities)} opportunities")
-                
-                if opportunities and self.auto_trading_enabled and self.risk_manager.can_trade():
-                    for opp in opportunities[:1]:  # Execute top opportunity
-                        self.execute_opportunity(opp)
-                
-                asyncio.sleep(settings.PRICE_UPDATE_INTERVAL)
-            except KeyboardInterrupt:
-                logger.info("Bot stopped by user")
-                break
+                prices = await self.price_monitor.fetch_prices_async(self.trading_pairs)
+                put_latest(self.price_queue, prices)
             except Exception as e:
-                logger.error(f"Error in monitoring loop: {str(e)}")
-                asyncio.sleep(5)
+                logger.error("Error fetching prices: %s", e)
+        
+        await run_every(lambda: settings.PRICE_UPDATE_INTERVAL, step)
     
-    def execute_opportunity(self, opportunity: dict):
+    async def detection_task(self):
+        """Find opportunities in each price update and hand the best to execution"""
+        while True:
+            prices = await self.price_queue.get()
+            self.price_queue.task_done()
+            opportunities = self.price_monitor.detect_opportunities(
+                prices,
+                min_spread=settings.MIN_SPREAD_THRESHOLD,
+                max_age=settings.MAX_QUOTE_AGE_MS / 1000,
+                maker=settings.EXECUTION_MODE == "maker_taker"
+            )
+            logger.info("Detected %d opportunities", len(opportunities))
+            
+            if opportunities and self.auto_trading_enabled and self.risk_manager.can_trade():
+                # Execute top opportunity; if execution is backed up, replace the stalest one
+                put_latest(self.execution_queue, opportunities[0])
+    
+    async def matrix_detection_task(self):
+        """Scan the shared quote matrix every PRICE_UPDATE_INTERVAL seconds"""
+        async def step():
+            opportunities = self.matrix_detector.detect(
+                min_spread=settings.MIN_SPREAD_THRESHOLD,
+                max_age=settings.MAX_QUOTE_AGE_MS / 1000,
+                maker=settings.EXECUTION_MODE == "maker_taker"
+            )
+            logger.info("Detected %d opportunities", len(opportunities))
+            
+            if opportunities and self.auto_trading_enabled and self.risk_manager.can_trade():
+                put_latest(self.execution_queue, opportunities[0])
+        
+        await run_every(lambda: settings.PRICE_UPDATE_INTERVAL, step)
+    
+    async def execution_task(self):
+        """Execute queued opportunities one at a time"""
+        while True:
+            opportunity = await self.execution_queue.get()
+            try:
+                if self.risk_manager.can_trade():
+                    await self.execute_opportunity(opportunity)
+            except Exception as e:
+                logger.error("Error executing opportunity: %s", e)
+            finally:
+                self.execution_queue.task_done()
+    
+    async def balance_task(self):
+        """Snapshot balances every BALANCE_UPDATE_INTERVAL seconds"""
+        async def step():
+            try:
+                balances = await self.inventory_manager.get_all_balances_async()
+                rows = [
+                    {"exchange": exchange, "asset": asset, "available": data["free"],
+                     "locked": data["used"], "total": data["total"]}
+                    for exchange, assets in self.inventory_manager.compact_balances(balances).items()
+                    for asset, data in assets.items()
+                ]
+                if rows:
+                    await self.persist_queue.put((self.db.save_balances, rows))
+            except Exception as e:
+                logger.error("Error refreshing balances: %s", e)
+        
+        await run_every(lambda: settings.BALANCE_UPDATE_INTERVAL, step)
+    
+    async def fee_task(self):
+        """Refresh trading fees every FEE_REFRESH_INTERVAL seconds"""
+        async def step():
+            try:
+                await self.fee_schedule.refresh(self.exchange_manager, self.trading_pairs)
+            except Exception as e:
+                logger.error("Error refreshing fees: %s", e)
+        
+        await run_every(lambda: settings.FEE_REFRESH_INTERVAL, step)
+    
+    async def clock_task(self):
+        """Sample exchange server time every CLOCK_SYNC_INTERVAL seconds"""
+        async def step():
+            try:
+                await exchange_clock.sync(self.exchange_manager)
+            except Exception as e:
+                logger.error("Error syncing exchange clocks: %s", e)
+        
+        await run_every(lambda: settings.CLOCK_SYNC_INTERVAL, step)
+    
+    async def persistence_task(self):
+        """Write queued records to the database off the event loop"""
+        while True:
+            write, payload = await self.persist_queue.get()
+            try:
+                await asyncio.to_thread(write, payload)
+            except Exception as e:
+                logger.error("Error persisting %s: %s", write.__name__, e)
+            finally:
+                self.persist_queue.task_done()
+    
+    async def execute_opportunity(self, opportunity: Opportunity):
         """Execute an arbitrage opportunity"""
-        logger.info(f"Executing opportunity: {opportunity['symbol']} {opportunity['buy_exchange']} -> {opportunity['sell_exchange']}")
+        # The opportunity may have waited in the queue behind another trade
+        age = time.time() - (opportunity.quote_time or time.time())
+        if age > settings.MAX_QUOTE_AGE_MS / 1000:
+            STALE_QUOTES.labels("execution").inc()
+            logger.warning("Skipping opportunity %s %s -> %s: quotes are %.0fms old", opportunity.symbol,
+                           opportunity.buy_exchange, opportunity.sell_exchange, age * 1000)
+            return
         
-        trade_result = self.trade_executor.execute_arbitrage_trade(
-            opportunity["buy_exchange"],
-            opportunity["sell_exchange"],
-            opportunity["symbol"],
-            0.01  # Fixed small amount for testing
-        )
+        logger.info("Executing opportunity: %s %s -> %s", opportunity.symbol,
+                    opportunity.buy_exchange, opportunity.sell_exchange)
         
-        if trade_result["status"] == "completed":
-            logger.info(f"Trade executed successfully: {trade_result['trade_id']}")
-            msg = f"✅ Trade executed: {opportunity['symbol']} spread {opportunity['spread_pct']:.2f}%"
-            self.telegram_notifier.send_message("1395251148", msg)
+        # Orders go through the sync executor in a worker thread; shield it so
+        # shutdown can't abandon a trade between its two legs
+        trade_executor = await self.trade_executor.aget()
+        if settings.EXECUTION_MODE == "maker_taker":
+            trade = functools.partial(trade_executor.execute_maker_taker,
+                                      min_spread=settings.MIN_SPREAD_THRESHOLD)
+        else:
+            trade = trade_executor.execute_arbitrage_trade
+        pending = asyncio.ensure_future(asyncio.to_thread(
+            trade,
+            opportunity.buy_exchange,
+            opportunity.sell_exchange,
+            opportunity.symbol,
+            self.trade_quantity()
+        ))
+        try:
+            trade_result = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # The orders keep going in their thread: wait for the outcome and
+            # record it before passing the cancellation on
+            await self._record_trade(trade_executor, await asyncio.shield(pending))
+            raise
+        await self._record_trade(trade_executor, trade_result)
+        
+        if trade_result.status == "completed":
+            logger.info("Trade executed successfully: %s", trade_result.trade_id)
+            msg = f"✅ Trade executed: {opportunity.symbol} spread {opportunity.spread_pct:.2f}%"
+            self.telegram_notifier.notify(settings.TELEGRAM_CHAT_ID, msg)
+
+    def trade_quantity(self) -> float:
+        """Fixed small amount for testing, capped by MAX_POSITION_SIZE"""
+        return min(0.01, self.arbitrage_engine.max_position_size)
+
+    async def _record_trade(self, trade_executor, trade_result):
+        """Count a finished trade against the risk limits and queue it for saving"""
+        trade_result.pnl = trade_executor.calculate_pnl(trade_result)
+        self.risk_manager.record_trade(trade_result)
+        await self.persist_queue.put((self.db.save_trade, trade_result.to_dict()))
 
 def main():
     """Main entry point"""
@@ -82,7 +422,7 @@ def main():
         bot = ArbitrageBot()
         bot.start()
     except Exception as e:
-        logger.error(f"Fatal error: {str(e)}")
+        logger.error("Fatal error: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
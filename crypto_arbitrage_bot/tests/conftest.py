@@ -0,0 +1,34 @@
+"""
+Shared test setup.
+
+The bot keeps its database, logs, secrets and runtime config relative to the
+working directory, so the suite runs from a scratch directory and never
+touches the real `arbitrage_bot.db`, `logs/` or `secrets.enc`.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+_scratch = tempfile.mkdtemp(prefix="arbitrage-tests-")
+os.chdir(_scratch)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_scratch, ignore_errors=True)
+
+
+@pytest.fixture
+def fresh_db():
+    """The database module with empty tables"""
+    from database import db
+    db.init_db()
+    with db.engine.begin() as conn:
+        for table in reversed(db.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    return db
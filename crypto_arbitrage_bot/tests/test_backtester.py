@@ -0,0 +1,55 @@
+# Unit tests for replaying recorded ticks through the backtester
+from datetime import datetime, timezone
+
+import pytest
+
+from core.backtester import ReplayEngine
+from core.fee_schedule import FeeSchedule, parse_fee_overrides
+from database.tick_store import TickStore
+
+DAY = datetime(2025, 11, 22, tzinfo=timezone.utc).timestamp()
+FEES = {"binance": 0.001, "okx": 0.002}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TickStore(str(tmp_path))
+    tick = store.append_tick
+    tick("BTC/USDT", "binance", bid=99.9, ask=100.0, bid_size=0.5, ask_size=0.5, ts=DAY)
+    tick("BTC/USDT", "okx", bid=99.8, ask=100.1, bid_size=0.5, ask_size=0.5, ts=DAY)
+    # okx jumps 1% above binance, but only 0.004 is bid there
+    tick("BTC/USDT", "okx", bid=101.0, ask=101.2, bid_size=0.004, ask_size=0.5, ts=DAY + 1)
+    # The binance ask moves up while our order is in flight
+    tick("BTC/USDT", "binance", bid=100.1, ask=100.2, bid_size=0.5, ask_size=0.5, ts=DAY + 1.2)
+    tick("BTC/USDT", "okx", bid=99.8, ask=100.1, bid_size=0.5, ask_size=0.5, ts=DAY + 2)
+    store.flush()
+    return store
+
+
+def _replay(store):
+    fees = FeeSchedule(store.exchange_names,
+                       overrides=parse_fee_overrides(",".join(f"{k}={v}" for k, v in FEES.items())))
+    engine = ReplayEngine(store, ["BTC/USDT"], min_spread=0.3, quantity=0.01, fees=fees, latency=0.5,
+                          max_quote_age=None, re_entry_delay=5, max_concurrent_trades=3)
+    report = engine.run(DAY, DAY + 60)
+    for timing in ("wall_time_s", "speedup"):
+        report.pop(timing)
+    return report
+
+
+def test_replays_are_deterministic(store):
+    assert _replay(store) == _replay(store)
+
+
+def test_fills_pay_fees_slippage_and_depth(store):
+    report = _replay(store)
+
+    assert (report["events"], report["cycles"], report["trades"], report["partial"]) == (5, 4, 1, 1)
+    (fill,) = report["fills"]
+    # Filled after the latency at the moved ask, and only as much as okx showed
+    assert (fill["buy_price"], fill["sell_price"], fill["quantity"]) == (100.2, 101.0, 0.004)
+    expected = 0.004 * 101.0 * (1 - FEES["okx"]) - 0.004 * 100.2 * (1 + FEES["binance"])
+    assert fill["pnl"] == pytest.approx(expected)
+    assert report["total_pnl"] == pytest.approx(expected)
+    # The spread detected at 100.0 was wider than the one realized
+    assert fill["realized_spread_pct"] < fill["detected_spread_pct"]
@@ -0,0 +1,92 @@
+# Unit tests for venue clock offsets and the stale-quote cutoff
+import asyncio
+
+import pytest
+
+from core.fee_schedule import FeeSchedule
+from core.models import Quote
+from core.price_monitor import PriceMonitor
+from exchanges.ccxt_wrapper import AsyncExchangeManager
+from exchanges.clock import ClockSync, VenueClock, exchange_clock
+from exchanges.health import HealthTracker
+from exchanges.simulated import AsyncSimulatedExchange, SimulatedVenue, SyntheticFeed
+
+
+def test_server_time_uses_the_tightest_round_trip():
+    clock = VenueClock("binance")
+    assert (clock.offset, clock.latency) == (0.0, None)
+
+    clock.observe_server_time(104.5, sent=100.0, received=101.0)   # 1 s round trip, offset 4.0
+    clock.observe_server_time(205.1, sent=200.0, received=200.2)   # 0.2 s round trip, offset 5.0
+    assert clock.offset == pytest.approx(5.0)
+    assert clock.latency == pytest.approx(0.1)
+    assert clock.snapshot()["source"] == "server_time"
+
+
+def test_quotes_stamped_after_receipt_raise_the_offset():
+    clock = VenueClock("okx")
+    clock.observe_server_time(105.1, sent=100.0, received=100.2)
+    clock.observe_message(306.0, sent=300.2, received=300.5)
+
+    assert clock.offset == pytest.approx(5.5)
+    assert clock.snapshot()["source"] == "messages"
+
+
+def test_message_only_venues_assume_one_way_latency():
+    clock = VenueClock("mexc")
+    clock.observe_message(98.0, sent=99.8, received=100.0)
+    clock.observe_message(98.5, sent=100.3, received=100.4)
+
+    # Freshest bound -1.9, plus half the shortest round trip
+    assert clock.offset == pytest.approx(-1.9 + 0.05)
+
+
+def test_quote_time_moves_stamps_onto_the_local_clock():
+    sync = ClockSync()
+    sync.get("bybit").observe_server_time(102.0, sent=100.0, received=100.0)
+
+    assert sync.quote_time("bybit", 150.0, received=149.0) == pytest.approx(148.0)
+    # Never after the quote arrived, and unstamped quotes are taken as made on arrival
+    assert sync.quote_time("bybit", 152.0, received=149.0) == 149.0
+    assert sync.quote_time("bybit", None, received=149.0) == 149.0
+    assert sync.quote_time("unknown", 150.0, received=151.0) == 150.0
+
+
+def test_sync_probes_server_time_through_the_manager():
+    manager = AsyncExchangeManager()
+    venue = SimulatedVenue("skewed", SyntheticFeed(), latency=0.0, clock_offset=2.0)
+    broken = SimulatedVenue("broken", SyntheticFeed(), latency=0.0, failure_rate=1.0)
+    manager.exchanges = {"skewed": AsyncSimulatedExchange(venue), "broken": AsyncSimulatedExchange(broken)}
+    manager.health = HealthTracker(failure_threshold=1)
+    sync = ClockSync()
+
+    asyncio.run(sync.sync(manager))
+
+    assert sync.get("skewed").offset == pytest.approx(2.0, abs=0.05)
+    assert sync.get("broken").snapshot()["server_samples"] == 0
+    # The failed probe counted against the venue's health
+    assert not manager.health.available("broken")
+
+
+class _Manager:
+    exchanges = {"binance": None, "okx": None}
+
+
+def test_detection_drops_stale_quotes():
+    monitor = PriceMonitor(exchange_manager=_Manager(), fees=FeeSchedule(["binance", "okx"], default=0.0))
+    prices = {"BTC/USDT": {"binance": Quote(99.0, 100.0, timestamp=1000.0),
+                           "okx": Quote(102.0, 103.0, timestamp=995.0)}}
+
+    assert len(monitor.detect_opportunities(prices, min_spread=0.5, max_age=10, now=1000.0)) == 1
+    assert monitor.detect_opportunities(prices, min_spread=0.5, max_age=2, now=1000.0) == []
+    (opportunity,) = monitor.detect_opportunities(prices, min_spread=0.5)
+    # The pair is as old as its older leg
+    assert opportunity.quote_time == 995.0
+
+
+def test_ticker_age_accounts_for_the_venue_offset():
+    exchange_clock.get("ahead").observe_server_time(1010.0, sent=1000.0, received=1000.0)
+
+    quote = PriceMonitor._to_quote({"bid": 1.0, "ask": 2.0, "timestamp": 1012_000}, "ahead", received=1003.0)
+    assert quote.timestamp == pytest.approx(1002.0)
+    assert quote.age == pytest.approx(1.0)
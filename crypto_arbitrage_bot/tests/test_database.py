@@ -0,0 +1,77 @@
+# Unit tests for trade storage, /trades/history pagination and daily statistics
+from fastapi.testclient import TestClient
+
+
+def _trade(trade_id, timestamp, pnl=0.0, symbol="BTC/USDT", buy="binance", sell="okx"):
+    return {"trade_id": trade_id, "timestamp": timestamp, "symbol": symbol, "quantity": 0.01,
+            "buy_exchange": buy, "sell_exchange": sell, "pnl": pnl, "status": "completed"}
+
+
+def test_history_pages_through_every_trade_once(fresh_db):
+    # Two trades share a timestamp, so the cursor has to break the tie by id
+    timestamps = ["2025-11-22T10:00:00", "2025-11-22T10:01:00", "2025-11-22T10:01:00",
+                  "2025-11-22T10:02:00", "2025-11-22T10:03:00"]
+    for i, timestamp in enumerate(timestamps):
+        fresh_db.save_trade(_trade(f"t{i}", timestamp))
+
+    from api.app import app
+    client = TestClient(app)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/trades/history", params=params).json()
+        seen.extend(trade["trade_id"] for trade in page["trades"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["t4", "t3", "t2", "t1", "t0"]
+
+
+def test_history_filters_and_rejects_bad_cursors(fresh_db):
+    fresh_db.save_trade(_trade("a", "2025-11-22T10:00:00", symbol="ETH/USDT", buy="kucoin"))
+    fresh_db.save_trade(_trade("b", "2025-11-22T10:01:00"))
+
+    from api.app import app
+    client = TestClient(app)
+    by_exchange = client.get("/trades/history", params={"exchange": "kucoin"}).json()
+    assert [trade["trade_id"] for trade in by_exchange["trades"]] == ["a"]
+    by_symbol = client.get("/trades/history", params={"symbol": "BTC/USDT"}).json()
+    assert [trade["trade_id"] for trade in by_symbol["trades"]] == ["b"]
+    assert client.get("/trades/history", params={"cursor": "not-a-cursor"}).json()["error"] == "Invalid cursor"
+
+
+def test_daily_stats_accumulate_per_day_and_venue(fresh_db):
+    fresh_db.save_trade(_trade("w", "2025-11-22T10:00:00", pnl=5.0))
+    fresh_db.save_trade(_trade("l", "2025-11-22T11:00:00", pnl=-2.0, sell="bybit"))
+    fresh_db.save_trade(_trade("next", "2025-11-23T00:30:00", pnl=1.0))
+
+    stats = fresh_db.daily_stats_to_dict(fresh_db.get_daily_stats("2025-11-22"))
+    assert (stats["total_trades"], stats["winning_trades"], stats["losing_trades"]) == (2, 1, 1)
+    assert stats["total_pnl"] == 3.0
+    assert stats["venues"]["binance"] == {"trades": 2, "wins": 1, "losses": 1, "pnl": 3.0}
+    assert stats["venues"]["okx"]["trades"] == 1
+    assert stats["venues"]["bybit"]["pnl"] == -2.0
+    assert fresh_db.get_daily_stats("2025-11-23").total_trades == 1
+
+
+def test_aware_timestamps_are_stored_as_utc(fresh_db):
+    fresh_db.save_trade(_trade("tz", "2025-11-22T23:30:00-02:00", pnl=1.0))
+
+    assert fresh_db.get_trades(1)[0].timestamp.isoformat() == "2025-11-23T01:30:00"
+    assert fresh_db.get_daily_stats("2025-11-23").total_trades == 1
+
+
+def test_prices_come_from_the_leg_orders(fresh_db):
+    trade = _trade("p", "2025-11-22T10:00:00")
+    trade["buy_order"] = {"id": "1", "average": 100.0, "price": 99.0}
+    trade["sell_order"] = {"id": "2", "average": None, "price": 101.0}
+    fresh_db.save_trade(trade)
+    fresh_db.save_trade({**_trade("explicit", "2025-11-22T10:01:00"), "buy_price": 98.0, "sell_price": 102.0})
+    fresh_db.save_trade(_trade("unfilled", "2025-11-22T10:02:00"))
+
+    stored = {t.trade_id: (t.buy_price, t.sell_price) for t in fresh_db.get_trades(10)}
+    # An order without an average (not filled yet) falls back to its limit price
+    assert stored == {"p": (100.0, 101.0), "explicit": (98.0, 102.0), "unfilled": (None, None)}
@@ -0,0 +1,110 @@
+# Unit tests for fee override parsing and rate resolution
+import asyncio
+
+import pytest
+
+from core.fee_schedule import FeeSchedule, parse_fee_overrides
+from exchanges.ccxt_wrapper import AsyncExchangeManager
+from exchanges.health import HealthTracker
+
+
+def test_parse_overrides():
+    assert parse_fee_overrides("binance=0.00075, okx:btc/usdt=0.0008/0.0006,") == {
+        "binance": {None: (0.00075, 0.00075)},
+        "okx": {"BTC/USDT": (0.0008, 0.0006)},
+    }
+    assert parse_fee_overrides("") == {}
+    with pytest.raises(ValueError):
+        parse_fee_overrides("binance")
+    with pytest.raises(ValueError):
+        parse_fee_overrides("binance=cheap")
+
+
+def test_rates_resolve_market_then_venue_then_default():
+    fees = FeeSchedule(["binance", "okx", "bybit"], default=0.002)
+    fees.update("binance", {None: (0.001, 0.0008), "BTC/USDT": (0.0007, 0.0002)})
+
+    assert fees.rates("binance", "BTC/USDT") == (0.0007, 0.0002)
+    assert fees.rates("binance", "ETH/USDT") == (0.001, 0.0008)
+    assert fees.rates("okx", "BTC/USDT") == (0.002, 0.002)
+    assert fees.rates(None) == (0.002, 0.002)
+
+
+def test_overrides_win_over_fetched_rates():
+    fees = FeeSchedule(["binance"], overrides=parse_fee_overrides("binance=0.0005"))
+    fees.update("binance", {None: (0.001, 0.0008), "BTC/USDT": (0.0007, 0.0002)})
+    assert fees.taker("binance", "BTC/USDT") == 0.0005
+
+    fees.set_override("binance", 0.0003, 0.0001, symbol="ETH/USDT")
+    assert fees.rates("binance", "ETH/USDT") == (0.0003, 0.0001)
+    fees.clear_override("binance")
+    # The market override stays; other markets fall back to what was fetched
+    assert fees.maker("binance", "ETH/USDT") == 0.0001
+    assert fees.taker("binance", "BTC/USDT") == 0.0007
+
+
+def test_rows_follow_rate_changes():
+    fees = FeeSchedule(["binance", "okx"], default=0.001)
+    assert fees.taker_pct_row("BTC/USDT") == pytest.approx([0.1, 0.1])
+    version = fees.version
+
+    fees.update("okx", {None: (0.0008, 0.0002)})
+    assert fees.version > version
+    assert fees.taker_pct_row("BTC/USDT") == pytest.approx([0.1, 0.08])
+    assert fees.maker_pct_row("BTC/USDT") == pytest.approx([0.1, 0.02])
+    assert fees.taker_matrix(["BTC/USDT"], ["okx", "binance"]).tolist() == [[0.0008, 0.001]]
+
+    # Unchanged rates don't invalidate the rows
+    version = fees.version
+    fees.update("okx", {None: (0.0008, 0.0002)})
+    assert fees.version == version
+
+
+class _Client:
+    id = "tiered"
+    fees = {"trading": {"taker": 0.001, "maker": 0.0009}}
+    has = {"fetchTradingFees": True}
+
+    def __init__(self):
+        self.markets = None
+        self.calls = []
+
+    async def load_markets(self):
+        self.calls.append("load_markets")
+        self.markets = {"BTC/USDT": {"taker": 0.0008, "maker": 0.0006}, "ETH/USDT": {}}
+
+    async def fetch_trading_fees(self):
+        self.calls.append("fetch_trading_fees")
+        # The account's VIP tier on one market
+        return {"BTC/USDT": {"taker": 0.0004, "maker": 0.0}}
+
+
+def _manager(**health):
+    manager = AsyncExchangeManager()
+    manager.exchanges = {"tiered": _Client()}
+    manager.health = HealthTracker(**health)
+    return manager
+
+
+def test_refresh_prefers_account_tier_over_market_and_venue_defaults():
+    manager = _manager()
+    fees = FeeSchedule(["tiered"])
+    asyncio.run(fees.refresh(manager, ["BTC/USDT", "ETH/USDT"]))
+
+    assert fees.rates("tiered", "BTC/USDT") == (0.0004, 0.0)
+    assert fees.rates("tiered", "ETH/USDT") == (0.001, 0.0009)
+    assert "tiered" in fees.updated_at
+    # Both requests went through the manager and count towards the venue's health
+    assert manager.exchanges["tiered"].calls == ["load_markets", "fetch_trading_fees"]
+    assert manager.health.get("tiered").snapshot()["samples"] == 2
+
+
+def test_refresh_skips_venues_with_an_open_breaker():
+    manager = _manager(failure_threshold=1, cooldown=60.0)
+    manager.health.get("tiered").record(0.1, True)
+    fees = FeeSchedule(["tiered"], default=0.002)
+    asyncio.run(fees.refresh(manager, ["BTC/USDT"]))
+
+    assert manager.exchanges["tiered"].calls == []
+    assert fees.rates("tiered", "BTC/USDT") == (0.002, 0.002)
+    assert "tiered" not in fees.updated_at
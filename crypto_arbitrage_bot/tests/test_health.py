@@ -0,0 +1,95 @@
+# Unit tests for per-exchange health tracking and the circuit breaker
+import asyncio
+
+import ccxt
+import pytest
+
+from exchanges.ccxt_wrapper import AsyncExchangeManager
+from exchanges.health import (CLOSED, HALF_OPEN, MIN_SAMPLES, OPEN, ExchangeHealth, ExchangeUnavailable,
+                              HealthTracker, is_venue_failure)
+from exchanges.simulated import AsyncSimulatedExchange, SimulatedVenue, SyntheticFeed
+
+
+def _expire_cooldown(health):
+    health.opened_at -= health.cooldown
+
+
+def test_consecutive_failures_open_the_breaker():
+    health = ExchangeHealth("binance", failure_threshold=3, cooldown=10.0)
+    for _ in range(2):
+        health.record(0.1, True)
+    assert health.state == CLOSED
+    health.record(0.1, False)
+    health.record(0.1, True)
+    health.record(0.1, True)
+    assert health.state == CLOSED
+
+    health.record(0.1, True)
+    assert (health.state, health.reason) == (OPEN, "3 consecutive failures")
+    assert not health.available()
+    assert not health.allow()
+
+
+def test_error_rate_and_latency_open_the_breaker():
+    flaky = ExchangeHealth("okx", failure_threshold=100, error_rate=0.5)
+    for i in range(MIN_SAMPLES):
+        flaky.record(0.1, i % 2 == 0)
+    assert (flaky.state, flaky.reason) == (OPEN, "error rate 50%")
+
+    slow = ExchangeHealth("mexc", latency_ceiling=1.0)
+    for _ in range(MIN_SAMPLES):
+        slow.record(2.0, False)
+    assert (slow.state, slow.reason) == (OPEN, "p95 latency 2000ms")
+
+
+def test_half_open_probe_closes_on_success():
+    health = ExchangeHealth("bybit", failure_threshold=1, cooldown=10.0)
+    health.record(0.1, True)
+    _expire_cooldown(health)
+
+    assert health.allow()
+    assert health.state == HALF_OPEN
+    # Only the probe goes out while it is pending
+    assert not health.allow()
+    health.record(0.1, False)
+    assert (health.state, health.reason, health.consecutive_failures) == (CLOSED, None, 0)
+    assert health.snapshot()["samples"] == 0
+
+
+def test_failed_probe_reopens_with_a_longer_cooldown():
+    health = ExchangeHealth("gateio", failure_threshold=1, cooldown=10.0)
+    health.record(0.1, True)
+    _expire_cooldown(health)
+    health.allow()
+    health.record(0.1, True)
+
+    assert (health.state, health.reason, health.cooldown) == (OPEN, "probe failed", 20.0)
+    _expire_cooldown(health)
+    health.allow()
+    health.record(0.1, False)
+    assert health.cooldown == 10.0
+
+
+def test_only_venue_failures_count():
+    assert is_venue_failure(ccxt.NetworkError("down"))
+    assert is_venue_failure(TimeoutError())
+    assert not is_venue_failure(ccxt.InsufficientFunds("poor"))
+    assert not is_venue_failure(ccxt.BadSymbol("nope"))
+
+
+def test_manager_calls_trip_and_skip_the_venue():
+    venue = SimulatedVenue("sim", SyntheticFeed(), latency=0.0, failure_rate=1.0)
+    manager = AsyncExchangeManager()
+    manager.exchanges = {"sim": AsyncSimulatedExchange(venue)}
+    manager.health = HealthTracker(failure_threshold=2, cooldown=60.0)
+
+    async def call():
+        return await manager._call("sim", "fetch_ticker", "BTC/USDT")
+
+    for _ in range(2):
+        with pytest.raises(ccxt.NetworkError):
+            asyncio.run(call())
+    assert manager.health.get("sim").state == OPEN
+    with pytest.raises(ExchangeUnavailable):
+        asyncio.run(call())
+    assert asyncio.run(manager.get_ticker("sim", "BTC/USDT")) == {}
@@ -0,0 +1,40 @@
+# Unit tests for the log rate limiter
+import logging
+
+import ccxt
+
+from utils.logger import RateLimitFilter
+
+
+def _record(msg, *args, level=logging.ERROR):
+    return logging.LogRecord("arbitrage_bot", level, __file__, 1, msg, args, None)
+
+
+def _expire(limiter):
+    for entry in limiter._seen.values():
+        entry[0] -= limiter.window
+
+
+def test_repeated_exceptions_are_suppressed_then_summarized():
+    limiter = RateLimitFilter(window=30.0)
+    message = "Error fetching ticker %s from %s: %s"
+    # A fresh exception object per call, as in an except block
+    passed = [limiter.filter(_record(message, "BTC/USDT", "binance", ccxt.NetworkError("timed out")))
+              for _ in range(100)]
+    assert passed.count(True) == 1
+
+    _expire(limiter)
+    record = _record(message, "BTC/USDT", "binance", ccxt.NetworkError("timed out"))
+    assert limiter.filter(record)
+    assert record.getMessage().endswith("timed out [suppressed 99 repeats]")
+
+
+def test_different_arguments_and_info_records_pass():
+    limiter = RateLimitFilter(window=30.0)
+    message = "Error fetching ticker %s from %s: %s"
+    assert limiter.filter(_record(message, "BTC/USDT", "binance", ccxt.NetworkError("timed out")))
+    assert limiter.filter(_record(message, "BTC/USDT", "okx", ccxt.NetworkError("timed out")))
+    assert limiter.filter(_record(message, "BTC/USDT", "binance", ccxt.ExchangeError("timed out")))
+    assert limiter.filter(_record("Trade %(id)s failed", {"id": 1}))
+    assert not limiter.filter(_record("Trade %(id)s failed", {"id": 1}))
+    assert all(limiter.filter(_record("Scanning %s", "BTC/USDT", level=logging.INFO)) for _ in range(3))
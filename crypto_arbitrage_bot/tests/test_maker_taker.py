@@ -0,0 +1,161 @@
+# Unit tests for maker-taker execution against simulated venues
+import threading
+
+import pytest
+
+from core.fee_schedule import FeeSchedule
+from core.maker_taker import MakerTaker, _Run
+from core.models import TradeRecord
+from core.trade_executor import TradeExecutor
+from exchanges.exchange_manager import ExchangeManager
+from exchanges.health import HealthTracker
+from exchanges.simulated import SimulatedExchange, SimulatedVenue
+
+SYMBOL = "BTC/USDT"
+MIN_SPREAD = 0.1
+# Resting the buy on "maker" costs 0 + 0.1% taker on "hedge"
+MARGIN = 1 + MIN_SPREAD / 100 + 0.0 + 0.001
+
+
+class FixedFeed:
+    """A market that only moves when the test says so"""
+
+    def __init__(self, bid=100.0, ask=101.0, size=1.0):
+        self.set(bid, ask, size, timestamp=1.0)
+
+    def set(self, bid, ask, size=1.0, timestamp=None):
+        self.current = {"bid": bid, "ask": ask, "bid_size": size, "ask_size": size, "last": (bid + ask) / 2,
+                        "timestamp": timestamp if timestamp is not None else self.current["timestamp"] + 1}
+
+    def quote(self, venue, symbol, now):
+        return dict(self.current)
+
+
+@pytest.fixture
+def market():
+    maker_feed = FixedFeed(99.0, 100.5)
+    hedge_feed = FixedFeed(100.0, 100.2)
+    maker = SimulatedVenue("maker", maker_feed, balances={"USDT": 10000.0}, fee=0.001, maker_fee=0.0, latency=0.0)
+    hedge = SimulatedVenue("hedge", hedge_feed, balances={"BTC": 1.0}, fee=0.001, latency=0.0)
+    manager = ExchangeManager()
+    manager.exchanges = {"maker": SimulatedExchange(maker), "hedge": SimulatedExchange(hedge)}
+    manager.health = HealthTracker()
+    fees = FeeSchedule(["maker", "hedge"], overrides={"maker": {None: (0.001, 0.0)}, "hedge": {None: (0.001, 0.001)}})
+    executor = TradeExecutor(exchange_manager=manager, fees=fees)
+    executor.maker_taker = MakerTaker(manager, fees, requote_interval=0.01, requote_bps=1.0, timeout=0.2)
+    return executor, maker_feed, hedge_feed, maker, hedge
+
+
+def _run(executor, quantity=0.01):
+    record = TradeRecord("t", "2025-11-22T10:00:00", SYMBOL, quantity, "maker", "hedge", mode="maker_taker")
+    return _Run(executor.maker_taker, record, "buy", MIN_SPREAD)
+
+
+def test_rests_the_leg_with_the_cheaper_maker_fee(market):
+    executor = market[0]
+    assert executor.maker_taker.maker_side("maker", "hedge", SYMBOL) == "buy"
+    assert executor.maker_taker.maker_side("hedge", "maker", SYMBOL) == "sell"
+
+
+def test_cancel_replace_follows_the_hedge_venue(market):
+    executor, maker_feed, hedge_feed, maker, _ = market
+    run = _run(executor)
+
+    run._requote()
+    first = run.order
+    assert first["price"] == pytest.approx(100.0 / MARGIN)
+    # The price improves on the 99.0 bid, so nothing is queued ahead
+    assert run.record.queue_ahead == 0.0
+
+    hedge_feed.set(100.5, 100.7)
+    run._requote()
+    assert run.order["price"] == pytest.approx(100.5 / MARGIN)
+    assert run.record.requotes == 1
+    assert [order["status"] for order in run.maker_orders] == ["canceled"]
+    assert maker.orders[first["id"]]["status"] == "canceled"
+
+    # Moves under MAKER_REQUOTE_BPS leave the order alone
+    replaced = run.order["id"]
+    hedge_feed.set(100.505, 100.7)
+    run._requote()
+    assert run.order["id"] == replaced
+    assert run.record.requotes == 1
+
+
+def test_partial_fills_are_hedged_as_they_happen(market):
+    executor, maker_feed, hedge_feed, _, hedge = market
+    run = _run(executor)
+    run._requote()
+    price = run.order["price"]
+
+    maker_feed.set(98.0, 99.0, size=0.004)
+    run._poll()
+    assert run.filled() == pytest.approx(0.004)
+    assert run.hedged == pytest.approx(0.004)
+    assert hedge.balances["BTC"][0] == pytest.approx(1.0 - 0.004)
+
+    run._finish()
+    record = run.record
+    assert record.status == "completed"
+    assert (record.quantity, record.filled, record.hedged) == (pytest.approx(0.004),) * 3
+    assert record.buy_order["average"] == pytest.approx(price)
+    assert record.sell_order["average"] == pytest.approx(100.0)
+    assert executor.calculate_pnl(record) == pytest.approx(0.004 * (100.0 - price))
+
+
+def test_failed_hedge_leaves_a_partial_priced_on_what_was_hedged(market):
+    executor, maker_feed, _, _, hedge = market
+    hedge.balances["BTC"] = [0.004, 0.0]
+    run = _run(executor)
+    run._requote()
+    price = run.order["price"]
+
+    maker_feed.set(98.0, 99.0, size=0.004)
+    run._poll()
+    maker_feed.set(98.0, 99.0, size=1.0)
+    run._poll()
+    run._finish()
+
+    record = run.record
+    assert record.status == "partial"
+    assert record.error.startswith("Hedge sell failed")
+    assert (record.filled, record.hedged) == (pytest.approx(0.01), pytest.approx(0.004))
+    # Only the hedged 0.004 is realized; the other 0.006 is open inventory
+    assert executor.calculate_pnl(record) == pytest.approx(0.004 * (100.0 - price))
+
+
+def test_unfilled_orders_expire_and_release_their_funds(market):
+    executor, _, _, maker, _ = market
+    record = executor.execute_maker_taker("maker", "hedge", SYMBOL, 0.01, min_spread=MIN_SPREAD)
+
+    assert record.status == "expired"
+    assert (record.filled, record.hedged) == (0.0, 0.0)
+    assert record.sell_order is None
+    assert executor.calculate_pnl(record) == 0.0
+    assert all(order["status"] == "canceled" for order in maker.orders.values())
+    assert maker.balances["USDT"] == [pytest.approx(10000.0), pytest.approx(0.0)]
+
+
+def test_fills_while_resting_complete_the_trade(market):
+    executor, maker_feed, _, _, _ = market
+    executor.maker_taker.timeout = 5.0
+    # The maker venue's ask drops through our bid shortly after it is placed
+    timer = threading.Timer(0.05, maker_feed.set, args=(98.0, 98.5))
+    timer.start()
+    try:
+        record = executor.execute_maker_taker("maker", "hedge", SYMBOL, 0.01, min_spread=MIN_SPREAD)
+    finally:
+        timer.cancel()
+
+    assert record.status == "completed"
+    assert record.quantity == pytest.approx(0.01)
+    assert executor.calculate_pnl(record) == pytest.approx(0.01 * (100.0 - 100.0 / MARGIN))
+
+
+def test_stop_is_terminal(market):
+    executor, _, _, maker, _ = market
+    executor.stop()
+
+    record = executor.execute_maker_taker("maker", "hedge", SYMBOL, 0.01, min_spread=MIN_SPREAD)
+    assert record.status == "expired"
+    assert maker.orders == {}
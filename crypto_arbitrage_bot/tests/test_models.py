@@ -0,0 +1,38 @@
+# Unit tests for the slotted records and their conversion at the bot's edges
+from fastapi.testclient import TestClient
+
+from core.models import Quote, TradeRecord, prices_to_dict
+
+
+def _trade():
+    trade = TradeRecord("rt-1", "2025-11-22T10:00:00+00:00", "BTC/USDT", 0.01, "binance", "okx",
+                        buy_order={"id": "b1", "average": 100.0, "filled": 0.01},
+                        sell_order={"id": "s1", "average": 101.0, "filled": 0.01},
+                        status="completed", pnl=0.0079, mode="maker_taker")
+    trade.requotes = 2
+    return trade
+
+
+def test_records_compare_and_convert_by_field():
+    quote = Quote(100.0, 101.0, bid_size=2.0)
+    assert quote == Quote(100.0, 101.0, bid_size=2.0)
+    assert quote != Quote(100.0, 101.5, bid_size=2.0)
+    assert not hasattr(quote, "__dict__")
+    assert prices_to_dict({"BTC/USDT": {"okx": quote}})["BTC/USDT"]["okx"]["bid_size"] == 2.0
+
+    data = _trade().to_dict()
+    assert list(data) == list(TradeRecord.__slots__)
+    assert (data["requotes"], data["filled"]) == (2, None)
+
+
+def test_trade_record_round_trips_to_the_api(fresh_db):
+    fresh_db.save_trade(_trade().to_dict())
+
+    from api.app import app
+    (row,) = TestClient(app).get("/trades").json()
+    assert {key: row[key] for key in ("trade_id", "timestamp", "symbol", "quantity", "buy_exchange",
+                                      "sell_exchange", "buy_price", "sell_price", "pnl", "status", "error")} == {
+        "trade_id": "rt-1", "timestamp": "2025-11-22T10:00:00", "symbol": "BTC/USDT", "quantity": 0.01,
+        "buy_exchange": "binance", "sell_exchange": "okx", "buy_price": 100.0, "sell_price": 101.0,
+        "pnl": 0.0079, "status": "completed", "error": None,
+    }
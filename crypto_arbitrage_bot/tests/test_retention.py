@@ -0,0 +1,85 @@
+# Unit tests for balance rollups and tiered history reads
+from datetime import datetime, timedelta
+
+from database.models import Balance, BalanceRollup
+from database.retention import DAY, HOUR, BalanceRetention, get_balance_history
+
+NOW = datetime(2025, 11, 22, 12, 0)
+
+
+def _snapshots(db, *samples):
+    session = db.SessionLocal()
+    try:
+        session.add_all([Balance(exchange="binance", asset="USDT", available=total, locked=0.0,
+                                 total=total, timestamp=timestamp) for timestamp, total in samples])
+        session.commit()
+    finally:
+        session.close()
+
+
+def _rows(db, model, **filters):
+    session = db.SessionLocal()
+    try:
+        return session.query(model).filter_by(**filters).order_by(model.id).all()
+    finally:
+        session.close()
+
+
+def _retention():
+    # One row per batch, so merging into an existing rollup is exercised too
+    return BalanceRetention(raw_retention=timedelta(hours=2), hourly_retention=timedelta(days=1),
+                            batch_size=1, batch_pause=0)
+
+
+def _seed(db):
+    _snapshots(db, (NOW.replace(hour=8, minute=10), 100.0), (NOW.replace(hour=8, minute=40), 200.0),
+               (NOW.replace(hour=9, minute=15), 300.0), (NOW.replace(hour=11, minute=30), 400.0))
+
+
+def test_old_snapshots_roll_into_hours(fresh_db):
+    _seed(fresh_db)
+
+    assert _retention().run_once(NOW) == {"raw_rolled": 3, "hourly_rolled": 0}
+
+    assert [b.total for b in _rows(fresh_db, Balance)] == [400.0]
+    hours = _rows(fresh_db, BalanceRollup, resolution=HOUR)
+    assert [(h.bucket.hour, h.samples) for h in hours] == [(8, 2), (9, 1)]
+    first = hours[0]
+    assert (first.avg_total, first.min_total, first.max_total, first.last_total) == (150.0, 100.0, 200.0, 200.0)
+
+
+def test_hours_roll_into_days(fresh_db):
+    _seed(fresh_db)
+
+    result = _retention().run_once(NOW + timedelta(days=3))
+
+    assert result == {"raw_rolled": 4, "hourly_rolled": 3}
+    assert _rows(fresh_db, Balance) == []
+    assert _rows(fresh_db, BalanceRollup, resolution=HOUR) == []
+    (day,) = _rows(fresh_db, BalanceRollup, resolution=DAY)
+    assert (day.samples, day.avg_total, day.min_total, day.max_total, day.last_total) == (4, 250.0, 100.0, 400.0, 400.0)
+
+
+def test_history_merges_every_tier(fresh_db):
+    _seed(fresh_db)
+    _retention().run_once(NOW)
+
+    hourly = get_balance_history("binance", "USDT", NOW.replace(hour=8), NOW, resolution=HOUR)
+    assert [(p["timestamp"], p["samples"], p["avg_total"]) for p in hourly["points"]] == [
+        ("2025-11-22T08:00:00", 2, 150.0),
+        ("2025-11-22T09:00:00", 1, 300.0),
+        ("2025-11-22T11:00:00", 1, 400.0),
+    ]
+
+    (daily,) = get_balance_history("binance", "USDT", NOW.replace(hour=8), NOW, resolution=DAY)["points"]
+    assert (daily["samples"], daily["avg_total"], daily["min_total"], daily["max_total"]) == (4, 250.0, 100.0, 400.0)
+    assert daily["total"] == 400.0
+
+
+def test_history_includes_a_day_rollup_that_starts_before_the_range(fresh_db):
+    _seed(fresh_db)
+    _retention().run_once(NOW + timedelta(days=3))
+
+    # The day bucket starts at midnight, before `start`, but still holds the range's samples
+    points = get_balance_history("binance", "USDT", NOW.replace(hour=10), NOW, resolution=DAY)["points"]
+    assert [(p["timestamp"], p["samples"]) for p in points] == [("2025-11-22T00:00:00", 4)]
@@ -0,0 +1,98 @@
+# Unit tests for live configuration reloads
+import asyncio
+import json
+import time
+
+import pytest
+
+from config.config import settings
+from config.runtime_config import RuntimeConfig, validate
+from core.models import Opportunity, TradeRecord
+from main import ArbitrageBot
+from utils.lazy import Lazy
+
+
+@pytest.fixture(autouse=True)
+def restore_settings(monkeypatch):
+    # Reloads write onto the shared settings object
+    for name in RuntimeConfig().current():
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+
+
+class _Executor:
+    def __init__(self):
+        self.quantities = []
+
+    def execute_arbitrage_trade(self, buy_exchange, sell_exchange, symbol, quantity):
+        self.quantities.append(quantity)
+        return TradeRecord("t", "2025-11-22T10:00:00", symbol, quantity, buy_exchange, sell_exchange,
+                           status="failed")
+
+    def calculate_pnl(self, record):
+        return 0.0
+
+
+class _Database:
+    @staticmethod
+    def save_trade(trade_data):
+        pass
+
+
+def _execute(bot):
+    async def run():
+        bot.persist_queue = asyncio.Queue()
+        opportunity = Opportunity("BTC/USDT", "binance", "okx", 100.0, 101.0, 0.8, quote_time=time.time())
+        await bot.execute_opportunity(opportunity)
+    asyncio.run(run())
+
+
+def test_validate_coerces_and_rejects():
+    assert validate({"trading_pairs": "btc/usdt, eth/usdt", "FUNCTION_TIMINGS": "true"}) == {
+        "TRADING_PAIRS": ["BTC/USDT", "ETH/USDT"], "FUNCTION_TIMINGS": True}
+    # Settings nothing re-reads after startup can't be changed live
+    with pytest.raises(ValueError, match="Not reloadable"):
+        validate({"MAX_CONCURRENT_TRADES": 5})
+    with pytest.raises(ValueError, match="MAX_POSITION_SIZE"):
+        validate({"MAX_POSITION_SIZE": 0})
+
+
+def test_file_reload_changes_the_running_bot(tmp_path):
+    executor = _Executor()
+    bot = ArbitrageBot()
+    bot.runtime_config = RuntimeConfig(path=str(tmp_path / "runtime.json"))
+    bot.runtime_config.add_listener(bot.apply_config)
+    bot.trade_executor = Lazy(lambda: executor, "trade_executor")
+    bot.db = _Database()
+
+    _execute(bot)
+    (tmp_path / "runtime.json").write_text(json.dumps({"MAX_POSITION_SIZE": 0.004, "MIN_SPREAD_THRESHOLD": 0.9,
+                                                       "DAILY_LOSS_LIMIT": -1.0}))
+    changes = bot.runtime_config.check_file()
+    _execute(bot)
+
+    assert set(changes) == {"MAX_POSITION_SIZE", "MIN_SPREAD_THRESHOLD", "DAILY_LOSS_LIMIT"}
+    assert executor.quantities == [0.01, 0.004]
+    assert bot.arbitrage_engine.min_spread == 0.9
+    assert bot.risk_manager.daily_loss_limit == -1.0
+    # An unchanged file isn't applied again
+    assert bot.runtime_config.check_file() == {}
+
+
+def test_config_updates_need_the_admin_token(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from api import app as api
+
+    monkeypatch.setattr(api.runtime_config, "path", str(tmp_path / "runtime.json"))
+    client = TestClient(api.app)
+    update = {"DAILY_LOSS_LIMIT": -1000.0}
+
+    # Without ADMIN_TOKEN nobody can change the limits
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.post("/config", json=update).status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.post("/config", json=update, headers={"X-Admin-Token": "wrong"}).status_code == 404
+    assert settings.DAILY_LOSS_LIMIT != -1000.0
+
+    response = client.post("/config", json=update, headers={"X-Admin-Token": "secret"}).json()
+    assert response["changed"] == {"DAILY_LOSS_LIMIT": -1000.0}
+    assert client.get("/config").json()["DAILY_LOSS_LIMIT"] == -1000.0
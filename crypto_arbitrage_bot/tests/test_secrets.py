@@ -0,0 +1,54 @@
+# Unit tests for encrypted secrets storage
+import os
+
+from cryptography.fernet import Fernet
+
+from config.secrets import SecretsManager
+
+
+def _manager(tmp_path):
+    return SecretsManager(key_path=str(tmp_path / "secrets.key"), secrets_path=str(tmp_path / "secrets.enc"))
+
+
+def test_secrets_round_trip_encrypted(tmp_path):
+    _manager(tmp_path).save_secrets({"binance_api_key": "key", "binance_api_secret": "s3cret"})
+
+    raw = (tmp_path / "secrets.enc").read_bytes()
+    assert b"s3cret" not in raw
+    # A new instance decrypts with the stored key
+    reopened = _manager(tmp_path)
+    assert reopened.get_secret("binance_api_secret") == "s3cret"
+    assert reopened.load_secrets() == {"binance_api_key": "key", "binance_api_secret": "s3cret"}
+
+
+def test_delete_returns_only_existing_names(tmp_path):
+    manager = _manager(tmp_path)
+    manager.save_secrets({"okx_api_key": "a", "okx_password": "b", "bybit_api_key": "c"})
+
+    assert manager.delete_secrets(["okx_api_key", "okx_password", "okx_missing"]) == ["okx_api_key", "okx_password"]
+    assert _manager(tmp_path).load_secrets() == {"bybit_api_key": "c"}
+
+
+def test_changes_from_another_process_are_picked_up(tmp_path):
+    manager = _manager(tmp_path)
+    manager.save_secret("telegram_api_token", "old")
+    assert manager.get_secret("telegram_api_token") == "old"
+
+    # Another writer replaces the file; the cache is keyed on its mtime and size
+    key = (tmp_path / "secrets.key").read_bytes()
+    (tmp_path / "secrets.enc").write_bytes(Fernet(key).encrypt(b'{"telegram_api_token": "newer"}'))
+    os.utime(tmp_path / "secrets.enc", ns=(0, 1))
+    assert manager.get_secret("telegram_api_token") == "newer"
+
+
+def test_legacy_dict_literal_files_are_read(tmp_path):
+    manager = _manager(tmp_path)
+    (tmp_path / "secrets.enc").write_bytes(manager.fernet.encrypt(b"{'mexc_api_key': 'legacy'}"))
+
+    assert manager.get_secret("mexc_api_key") == "legacy"
+
+
+def test_unreadable_file_reads_as_empty(tmp_path):
+    (tmp_path / "secrets.enc").write_bytes(b"not encrypted")
+
+    assert _manager(tmp_path).load_secrets() == {}
@@ -0,0 +1,116 @@
+# Unit tests for the shared quote matrix, its seqlock and shard workers
+import asyncio
+import time
+
+import pytest
+
+from core.fee_schedule import FeeSchedule
+from core.shared_quotes import SharedQuoteMatrix
+from core.sharding import MatrixDetector, _worker_main, shard_symbols
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+EXCHANGES = ["binance", "okx"]
+
+
+@pytest.fixture
+def matrix():
+    matrix = SharedQuoteMatrix(SYMBOLS, EXCHANGES, create=True)
+    yield matrix
+    matrix.close()
+
+
+def test_shard_symbols_split_round_robin():
+    assert shard_symbols(SYMBOLS, 2) == [["BTC/USDT", "SOL/USDT"], ["ETH/USDT"]]
+    assert shard_symbols(SYMBOLS, 10) == [["BTC/USDT"], ["ETH/USDT"], ["SOL/USDT"]]
+    assert shard_symbols(SYMBOLS, 0) == [SYMBOLS]
+
+
+def test_writes_are_visible_to_another_attachment(matrix):
+    reader = SharedQuoteMatrix(SYMBOLS, EXCHANGES, name=matrix.name)
+    try:
+        matrix.write(1, 0, 100.0, 101.0, 2.0, 3.0, 1234.5)
+
+        assert reader.read_cell(1, 0) == {"bid": 100.0, "ask": 101.0, "bid_size": 2.0,
+                                          "ask_size": 3.0, "timestamp": 1234.5}
+        assert int(reader.seq[1, 0]) == 2
+    finally:
+        reader.close()
+
+
+def test_seqlock_rejects_cells_written_during_a_read(matrix):
+    matrix.write(0, 0, 100.0, 101.0, 1.0, 1.0, 1.0)
+    matrix.write(0, 1, 100.0, 101.0, 1.0, 1.0, 1.0)
+    before = matrix.begin_read()
+    # One cell changes while the reader works, another is mid-write
+    matrix.write(0, 0, 102.0, 103.0, 1.0, 1.0, 2.0)
+    matrix.seq[0, 1] += 1
+
+    valid = matrix.valid_after(before)
+    assert not valid[0, 0]
+    assert not valid[0, 1]
+    assert valid[1, 0]
+    assert matrix.read_cell(0, 1, retries=3) is None
+
+
+def test_detector_finds_cross_venue_spreads_net_of_fees(matrix):
+    now = time.time()
+    matrix.write(0, 0, 99.0, 100.0, 1.0, 1.0, now)   # BTC cheap on binance
+    matrix.write(0, 1, 101.0, 102.0, 1.0, 1.0, now)  # and rich on okx
+    matrix.write(1, 0, 10.0, 10.01, 1.0, 1.0, now)   # ETH flat
+    matrix.write(1, 1, 10.0, 10.01, 1.0, 1.0, now)
+    detector = MatrixDetector(matrix, fees=FeeSchedule(EXCHANGES, default=0.001))
+
+    (opportunity,) = detector.detect(min_spread=0.1, max_age=5)
+    assert (opportunity.symbol, opportunity.buy_exchange, opportunity.sell_exchange) == ("BTC/USDT", "binance", "okx")
+    assert (opportunity.buy_price, opportunity.sell_price) == (100.0, 101.0)
+    assert opportunity.spread_pct == pytest.approx(1.0 - 0.2)
+
+
+def test_detector_skips_stale_quotes(matrix):
+    old = time.time() - 60
+    matrix.write(0, 0, 99.0, 100.0, 1.0, 1.0, old)
+    matrix.write(0, 1, 101.0, 102.0, 1.0, 1.0, time.time())
+
+    assert MatrixDetector(matrix, fees=FeeSchedule(EXCHANGES)).detect(min_spread=0.1, max_age=5) == []
+
+
+class _FakeManager:
+    """Async manager stand-in whose tickers come from a dict"""
+
+    def __init__(self, tickers):
+        self.exchanges = {name: object() for name in EXCHANGES}
+        self.tickers = tickers
+        self.closed = False
+
+    async def get_tickers(self, symbols):
+        return {symbol: self.tickers[symbol] for symbol in symbols if symbol in self.tickers}
+
+    async def close(self):
+        self.closed = True
+
+
+def test_worker_publishes_its_shard_into_the_matrix(matrix):
+    manager = _FakeManager({
+        "ETH/USDT": {"binance": {"bid": 10.0, "ask": 10.1, "bidVolume": 5.0, "askVolume": 6.0},
+                     "okx": {"bid": 10.2, "ask": 10.3}},
+        "BTC/USDT": {"binance": {"bid": 1.0, "ask": 2.0}},
+    })
+
+    async def run():
+        worker = asyncio.ensure_future(_worker_main(matrix.name, SYMBOLS, EXCHANGES, ["ETH/USDT"],
+                                                    0.01, lambda: manager))
+        for _ in range(200):
+            if matrix.seq[1, 1]:
+                break
+            await asyncio.sleep(0.01)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert matrix.read_cell(1, 0)["bid"] == 10.0
+    assert matrix.read_cell(1, 0)["ask_size"] == 6.0
+    assert matrix.read_cell(1, 1)["ask"] == 10.3
+    # Symbols outside the shard are left to their own workers
+    assert int(matrix.seq[0, 0]) == 0
+    assert manager.closed
@@ -0,0 +1,128 @@
+# Unit tests for the simulated exchange: fills, reservations and post-only rejects
+import asyncio
+
+import ccxt
+import pytest
+
+from exchanges.simulated import AsyncSimulatedExchange, SimulatedExchange, SimulatedVenue
+
+
+class FixedFeed:
+    """A market that only moves when the test says so"""
+
+    def __init__(self, bid=100.0, ask=101.0, size=1.0):
+        self.set(bid, ask, size, timestamp=1.0)
+
+    def set(self, bid, ask, size=1.0, timestamp=None):
+        self.current = {"bid": bid, "ask": ask, "bid_size": size, "ask_size": size, "last": (bid + ask) / 2,
+                        "timestamp": timestamp if timestamp is not None else self.current["timestamp"] + 1}
+
+    def quote(self, venue, symbol, now):
+        return dict(self.current)
+
+
+def _venue(feed=None, **kwargs):
+    kwargs.setdefault("balances", {"USDT": 10000.0, "BTC": 1.0})
+    return SimulatedVenue("sim", feed or FixedFeed(), fee=0.001, maker_fee=0.0005, latency=0.0, **kwargs)
+
+
+def _balance(venue, asset):
+    free, used = venue.balances[asset]
+    return pytest.approx(free), pytest.approx(used)
+
+
+def test_market_buy_fills_at_the_ask_and_pays_taker_fees():
+    venue = _venue()
+    order = venue.create_order("BTC/USDT", "market", "buy", 0.5)
+
+    assert (order["status"], order["filled"], order["average"]) == ("closed", 0.5, 101.0)
+    assert order["fee"]["cost"] == pytest.approx(0.5 * 101.0 * 0.001)
+    assert _balance(venue, "USDT") == (10000.0 - 50.5 * 1.001, 0.0)
+    assert _balance(venue, "BTC") == (1.5, 0.0)
+
+
+def test_market_orders_walk_the_book():
+    venue = _venue()
+    order = venue.create_order("BTC/USDT", "market", "buy", 2.0)
+
+    # 1.0 at the ask, the rest one spread higher
+    assert order["filled"] == pytest.approx(2.0)
+    assert order["average"] == pytest.approx((101.0 + 102.0) / 2)
+
+
+def test_orders_beyond_the_balance_are_rejected():
+    venue = _venue(balances={"USDT": 10.0})
+    with pytest.raises(ccxt.InsufficientFunds):
+        venue.create_order("BTC/USDT", "market", "buy", 0.5)
+    with pytest.raises(ccxt.InsufficientFunds):
+        venue.create_order("BTC/USDT", "limit", "sell", 0.5, 102.0)
+    assert venue.orders == {}
+
+
+def test_resting_limit_order_reserves_and_cancel_releases():
+    venue = _venue()
+    order = venue.create_order("BTC/USDT", "limit", "buy", 0.5, 99.0)
+
+    assert (order["status"], order["filled"]) == ("open", 0.0)
+    reserved = 0.5 * 99.0 * 1.001
+    assert _balance(venue, "USDT") == (10000.0 - reserved, reserved)
+
+    canceled = venue.cancel_order(order["id"])
+    assert canceled["status"] == "canceled"
+    assert _balance(venue, "USDT") == (10000.0, 0.0)
+    with pytest.raises(ccxt.OrderNotFound):
+        venue.cancel_order(order["id"])
+
+
+def test_resting_order_fills_as_maker_once_per_quote():
+    feed = FixedFeed()
+    venue = _venue(feed)
+    order = venue.create_order("BTC/USDT", "limit", "buy", 1.5, 99.0)
+
+    # The ask comes down through our price, showing 1.0
+    feed.set(98.0, 98.5, size=1.0)
+    first = venue.fetch_order(order["id"])
+    assert (first["status"], first["filled"], first["average"]) == ("open", 1.0, 99.0)
+    # Polling the same quote again doesn't fill twice
+    assert venue.fetch_order(order["id"])["filled"] == 1.0
+
+    feed.set(98.0, 98.5, size=1.0)
+    done = venue.fetch_order(order["id"])
+    assert (done["status"], done["filled"]) == ("closed", 1.5)
+    assert done["fee"]["cost"] == pytest.approx(1.5 * 99.0 * 0.0005)
+    # The reservation was spent on the fills; the maker fee difference came back
+    assert _balance(venue, "USDT") == (10000.0 - 1.5 * 99.0 * 1.0005, 0.0)
+    assert _balance(venue, "BTC") == (2.5, 0.0)
+
+
+def test_post_only_orders_that_would_take_are_rejected():
+    venue = _venue()
+    with pytest.raises(ccxt.OrderImmediatelyFillable):
+        venue.create_order("BTC/USDT", "limit", "buy", 0.1, 101.0, {"postOnly": True})
+    with pytest.raises(ccxt.OrderImmediatelyFillable):
+        venue.create_order("BTC/USDT", "limit", "sell", 0.1, 100.0, {"postOnly": True})
+
+    resting = venue.create_order("BTC/USDT", "limit", "sell", 0.1, 101.0, {"postOnly": True})
+    assert resting["status"] == "open"
+    assert _balance(venue, "BTC") == (0.9, 0.1)
+
+
+def test_partial_fills_expire_market_remainders():
+    venue = _venue(partial_fill_rate=1.0)
+    order = venue.create_order("BTC/USDT", "market", "sell", 0.5)
+
+    assert order["status"] == "expired"
+    assert 0 < order["filled"] < 0.5
+    assert order["remaining"] == pytest.approx(0.5 - order["filled"])
+
+
+def test_clients_expose_only_ccxt_methods():
+    venue = _venue()
+    client = SimulatedExchange(venue)
+    assert client.fetch_ticker("BTC/USDT")["ask"] == 101.0
+    with pytest.raises(AttributeError):
+        client.withdraw
+
+    async_client = AsyncSimulatedExchange(venue)
+    balance = asyncio.run(async_client.fetch_balance())
+    assert balance["USDT"]["free"] == 10000.0
@@ -0,0 +1,102 @@
+# Unit tests for the supervised-task runtime
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.models import Opportunity, TradeRecord
+from core.supervisor import put_latest, supervise
+from main import ArbitrageBot
+from utils.lazy import Lazy
+
+
+def test_crashing_tasks_restart_with_growing_backoff(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record_sleep(delay, *args):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", record_sleep)
+    runs = []
+
+    async def flaky():
+        runs.append(len(runs))
+        if len(runs) <= 4:
+            raise RuntimeError("boom")
+        await asyncio.Event().wait()
+
+    async def run():
+        task = asyncio.ensure_future(supervise("flaky", flaky, max_backoff=5.0))
+        while len(runs) < 5:
+            await sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert len(runs) == 5
+    assert delays == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_full_queues_evict_the_oldest_item():
+    async def run():
+        queue = asyncio.Queue(maxsize=2)
+        accepted = [put_latest(queue, item) for item in ("a", "b", "c", "d")]
+        items = [queue.get_nowait() for _ in range(queue.qsize())]
+        for _ in items:
+            queue.task_done()
+        # Evicted items were marked done, so join() doesn't wait on them
+        await asyncio.wait_for(queue.join(), 1.0)
+        return accepted, items
+
+    assert asyncio.run(run()) == ([True, True, False, False], ["c", "d"])
+
+
+class _SlowExecutor:
+    """Fills once the test releases it, like orders still in flight"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def execute_arbitrage_trade(self, buy_exchange, sell_exchange, symbol, quantity):
+        self.started.set()
+        self.release.wait(5.0)
+        return TradeRecord("slow", "2025-11-22T10:00:00", symbol, quantity, buy_exchange, sell_exchange,
+                           buy_order={"average": 100.0}, sell_order={"average": 101.0}, status="completed")
+
+    def calculate_pnl(self, record):
+        return 0.01
+
+
+def test_cancelled_execution_still_records_and_persists_the_trade(fresh_db):
+    executor = _SlowExecutor()
+    bot = ArbitrageBot()
+    bot.trade_executor = Lazy(lambda: executor, "trade_executor")
+    bot.db = fresh_db
+
+    async def run():
+        bot.persist_queue = asyncio.Queue()
+        opportunity = Opportunity("BTC/USDT", "binance", "okx", 100.0, 101.0, 0.8, quote_time=time.time())
+        task = asyncio.ensure_future(bot.execute_opportunity(opportunity))
+        await asyncio.to_thread(executor.started.wait, 5.0)
+        # Shutdown cancels the task while both legs are still going out
+        task.cancel()
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        executor.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        persister = asyncio.ensure_future(bot.persistence_task())
+        await asyncio.wait_for(bot.persist_queue.join(), 5.0)
+        persister.cancel()
+
+    asyncio.run(run())
+    assert bot.risk_manager.daily_pnl == pytest.approx(0.01)
+    (trade,) = fresh_db.get_trades(10)
+    assert (trade.trade_id, trade.status, trade.pnl) == ("slow", "completed", pytest.approx(0.01))
+    assert (trade.buy_price, trade.sell_price) == (100.0, 101.0)
@@ -1,16 +1,125 @@
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Unit tests for the Telegram notifier against a local stand-in for the Bot API
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
 
-from utils.notifications import TelegramNotifier
 from config.secrets import SecretsManager
+from utils.notifications import TelegramNotifier
+
+
+class _BotApi(ThreadingHTTPServer):
+    """Records sendMessage calls and answers with scripted responses"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requests = []
+        self.responses = []
+        self.received = threading.Condition()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def wait_for(self, count, timeout=5.0):
+        with self.received:
+            self.received.wait_for(lambda: len(self.requests) >= count, timeout)
+        return self.requests
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        status, reply = server.responses.pop(0) if server.responses else (200, {"ok": True})
+        with server.received:
+            server.requests.append((time.monotonic(), self.path, body))
+            server.received.notify_all()
+        data = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def bot_api(tmp_path, monkeypatch):
+    # The notifier reads its token from secrets.enc in the working directory
+    monkeypatch.chdir(tmp_path)
+    SecretsManager().save_secret("telegram_api_token", "123:test")
+    server = _BotApi()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _notifier(server, **kwargs):
+    kwargs.setdefault("rate_per_second", 100.0)
+    kwargs.setdefault("burst", 10)
+    return TelegramNotifier(api_url=server.url, **kwargs)
+
+
+def test_bursts_are_sent_as_one_digest_per_chat(bot_api):
+    notifier = _notifier(bot_api, digest_window=0.3)
+    notifier.start()
+    for text in ("spread 0.5%", "spread 0.6%", "spread 0.7%"):
+        notifier.notify(1, text)
+    notifier.notify(2, "filled")
+
+    requests = bot_api.wait_for(2)
+    notifier.stop()
+
+    assert {path for _, path, _ in requests} == {"/bot123:test/sendMessage"}
+    assert [body for _, _, body in requests] == [
+        {"chat_id": "1", "text": "🔔 3 updates\n\nspread 0.5%\nspread 0.6%\nspread 0.7%"},
+        {"chat_id": "2", "text": "filled"},
+    ]
+
+
+def test_rate_limited_sends_wait_for_retry_after(bot_api):
+    bot_api.responses = [(429, {"ok": False, "parameters": {"retry_after": 0.3}})]
+    notifier = _notifier(bot_api, digest_window=0.0, backoff=5.0)
+    notifier.start()
+    notifier.notify(1, "hello")
+
+    (first, _, _), (retried, _, body) = bot_api.wait_for(2)
+    notifier.stop()
+
+    assert body == {"chat_id": "1", "text": "hello"}
+    # Telegram's retry_after, not the (much longer) default backoff
+    assert 0.3 <= retried - first < 5.0
+
+
+def test_stop_delivers_the_queue_before_closing_the_session(bot_api):
+    notifier = _notifier(bot_api, digest_window=10.0, max_batch=2)
+    delivered_at_close = []
+    close = notifier.session.close
+    notifier.session.close = lambda: (delivered_at_close.append(len(bot_api.requests)), close())
+
+    notifier.start()
+    for i in range(5):
+        notifier.notify(1, f"update {i}")
+    notifier.stop()
+
+    # Stopping skips the digest wait but still sends every queued message
+    texts = [body["text"] for _, _, body in bot_api.requests]
+    assert "".join(texts).count("update ") == 5
+    assert delivered_at_close and set(delivered_at_close) == {len(texts)}
+    assert not notifier._thread.is_alive()
+
 
-# Save your Telegram API token securely (run once)
-secrets = SecretsManager()
-secrets.save_secret("telegram_api_token", "8207262508:AAHJqs7gkmmYhHe4TAecsyEwbKiScK3B1yA")
+def test_without_a_token_nothing_is_queued(bot_api):
+    SecretsManager().delete_secrets(["telegram_api_token"])
+    notifier = _notifier(bot_api)
 
-# Test sending a message
-notifier = TelegramNotifier()
-chat_id = "1395251148"  # Your provided chat ID
-response = notifier.send_message(chat_id, "Test message from crypto arbitrage bot!")
-print(response)
+    assert not notifier.notify(1, "hello")
+    with pytest.raises(ValueError):
+        notifier.send_message(1, "hello")
@@ -0,0 +1,65 @@
+# Unit tests for the tick store
+from datetime import datetime, timezone
+
+from core.models import Opportunity
+from database.tick_store import OPPORTUNITIES, TickStore
+
+DAY = datetime(2025, 11, 22, tzinfo=timezone.utc).timestamp()
+
+
+def test_append_and_read_ticks(tmp_path):
+    store = TickStore(str(tmp_path))
+    store.append_tick("BTC/USDT", "binance", bid=100.0, ask=101.0, ts=DAY + 10)
+    store.append_tick("BTC/USDT", "kucoin", bid=100.5, ask=101.5, ts=DAY + 20)
+    store.flush()
+
+    rows = store.load("BTC/USDT", "20251122")
+    assert len(rows) == 2
+    assert rows["bid"].tolist() == [100.0, 100.5]
+    assert [store.exchange_name(i) for i in rows["exchange"]] == ["binance", "kucoin"]
+
+
+def test_reads_come_back_in_time_order(tmp_path):
+    store = TickStore(str(tmp_path))
+    for ts in (30, 10, 20):
+        store.append_tick("ETH/USDT", "okx", bid=ts, ask=ts + 1, ts=DAY + ts)
+    store.flush()
+    store.append_tick("ETH/USDT", "okx", bid=5, ask=6, ts=DAY + 5)
+    store.flush()
+
+    assert store.load("ETH/USDT", "20251122")["ts"].tolist() == [DAY + 5, DAY + 10, DAY + 20, DAY + 30]
+    assert store.scan("ETH/USDT", DAY + 10, DAY + 30)["bid"].tolist() == [10, 20]
+
+
+def test_scan_spans_days(tmp_path):
+    store = TickStore(str(tmp_path))
+    store.append_tick("BTC/USDT", "binance", bid=1, ask=2, ts=DAY - 60)
+    store.append_tick("BTC/USDT", "binance", bid=3, ask=4, ts=DAY + 60)
+    store.flush()
+
+    assert store.days() == ["20251121", "20251122"]
+    assert store.scan("BTC/USDT", DAY - 120, DAY + 120)["bid"].tolist() == [1, 3]
+
+
+def test_symbols_round_trip_through_a_new_store(tmp_path):
+    store = TickStore(str(tmp_path))
+    for symbol in ("BTC/USDT", "BTC/USDT:USDT", "SOL_X/USDT"):
+        store.append_tick(symbol, "bybit", bid=1, ask=2, ts=DAY)
+    store.flush()
+
+    reopened = TickStore(str(tmp_path))
+    assert reopened.symbols("20251122") == ["BTC/USDT", "BTC/USDT:USDT", "SOL_X/USDT"]
+    assert reopened.exchange_names == ["bybit"]
+    assert len(reopened.load("BTC/USDT:USDT", "20251122")) == 1
+
+
+def test_opportunities_are_recorded(tmp_path):
+    store = TickStore(str(tmp_path))
+    store.append_opportunity(Opportunity("BTC/USDT", "binance", "okx", 100.0, 101.0, 0.8), ts=DAY)
+    store.flush()
+
+    rows = store.load("BTC/USDT", "20251122", kind=OPPORTUNITIES)
+    assert len(rows) == 1
+    assert store.exchange_name(rows["buy_exchange"][0]) == "binance"
+    assert store.exchange_name(rows["sell_exchange"][0]) == "okx"
+    assert rows["spread_pct"][0] == 0.8
@@ -0,0 +1,86 @@
+# Unit tests for versioned state, ETags and If-None-Match handling
+from fastapi.testclient import TestClient
+
+from api.versioned_state import VersionedState, etag_matches
+
+
+def test_etag_matching():
+    etag = 'W/"balances-7"'
+    assert etag_matches(etag, etag)
+    assert etag_matches('"balances-7"', etag)
+    assert etag_matches('"balances-6", W/"balances-7"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"balances-6"', etag)
+    assert not etag_matches('W/"balances-70"', etag)
+    assert not etag_matches("", etag)
+    assert not etag_matches(None, etag)
+
+
+def test_version_and_etag_change_only_with_the_state():
+    state = VersionedState("balances")
+    state.update({"binance": 1})
+    version, etag = state.version, state.etag
+
+    assert not state.update({"binance": 1})
+    assert (state.version, state.etag) == (version, etag)
+    assert state.update({"binance": 2})
+    assert state.version == version + 1
+    assert state.etag != etag
+
+
+def test_delta_reports_changes_and_removals():
+    state = VersionedState("balances")
+    state.update({"binance": 1, "okx": 1})
+    since = state.version
+    state.update({"binance": 2})
+
+    delta = state.delta(since)
+    assert (delta["full"], delta["data"], delta["removed"]) == (False, {"binance": 2}, ["okx"])
+    # Versions it can't diff from get a full snapshot
+    assert state.delta(since - 10)["full"]
+    assert state.delta(state.version + 1)["full"]
+
+
+def test_trades_endpoint_answers_304_for_a_matching_etag(fresh_db):
+    fresh_db.save_trade({"trade_id": "t1", "timestamp": "2025-11-22T10:00:00", "symbol": "BTC/USDT",
+                         "quantity": 0.01, "buy_exchange": "binance", "sell_exchange": "okx",
+                         "pnl": 1.0, "status": "completed"})
+
+    from api.app import app
+    client = TestClient(app)
+    first = client.get("/trades")
+    assert first.status_code == 200
+    assert [trade["trade_id"] for trade in first.json()] == ["t1"]
+    etag = first.headers["ETag"]
+
+    assert client.get("/trades", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/trades", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get("/trades", headers={"If-None-Match": '"trades-0"'}).status_code == 200
+
+
+def test_trades_since_advances_only_past_what_was_sent(fresh_db):
+    def save(i):
+        fresh_db.save_trade({"trade_id": f"t{i}", "timestamp": f"2025-11-22T10:{i:02d}:00", "symbol": "BTC/USDT",
+                             "quantity": 0.01, "buy_exchange": "binance", "sell_exchange": "okx",
+                             "pnl": 0.0, "status": "completed"})
+
+    save(0)
+    from api.app import app
+    client = TestClient(app)
+    version = client.get("/trades").headers["X-Version"]
+
+    # Five trades arrive between polls, more than the client asks for at once
+    for i in range(1, 6):
+        save(i)
+    seen, polls = [], 0
+    while True:
+        response = client.get("/trades", params={"since": version, "limit": 2})
+        polls += 1
+        seen.extend(reversed([trade["trade_id"] for trade in response.json()]))
+        version = response.headers["X-Version"]
+        if response.headers["X-Has-More"] == "false":
+            break
+
+    assert seen == ["t1", "t2", "t3", "t4", "t5"]
+    assert polls == 3
+    assert client.get("/trades", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
@@ -0,0 +1,61 @@
+"""
+Lazily built components.
+
+Heavy components (exchange clients, the database engine) are wrapped in
+`Lazy` so importing a module stays cheap: the factory runs on first use, or
+earlier from a startup hook, exactly once even if several threads ask at the
+same time. Build times are kept for the startup report.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+from utils.logger import logger
+
+T = TypeVar("T")
+
+# name -> Lazy, for reporting build times
+_instances: Dict[str, "Lazy"] = {}
+
+
+class Lazy(Generic[T]):
+    """A value built by `factory` on first use"""
+
+    def __init__(self, factory: Callable[[], T], name: str):
+        self.factory = factory
+        self.name = name
+        self.build_seconds: Optional[float] = None
+        self._value: Optional[T] = None
+        self._ready = False
+        self._lock = threading.Lock()
+        _instances[name] = self
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> T:
+        """The value, building it first if needed (blocking)"""
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                started = time.perf_counter()
+                self._value = self.factory()
+                self.build_seconds = time.perf_counter() - started
+                self._ready = True
+                logger.info("Built %s in %.2fs", self.name, self.build_seconds)
+        return self._value
+
+    async def aget(self) -> T:
+        """Like get(), but builds in a worker thread so the event loop keeps serving"""
+        if self._ready:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+
+def build_times() -> Dict[str, Optional[float]]:
+    """Seconds each lazy component took to build (None if not built yet)"""
+    return {name: round(lazy.build_seconds, 3) if lazy.build_seconds is not None else None
+            for name, lazy in _instances.items()}
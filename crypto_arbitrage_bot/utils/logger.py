@@ -1,23 +1,135 @@
 """
 Logger utility for consistent logging across the bot.
+
+Records are handed to a QueueHandler and written by a QueueListener thread,
+so the calling thread never waits on disk or console I/O. Repeated identical
+warnings and errors are rate-limited before they are queued. Output is plain
+text or JSON lines (LOG_FORMAT) with size- or time-based rotation.
 """
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "7"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")
+LOG_RATE_LIMIT_WINDOW = float(os.getenv("LOG_RATE_LIMIT_WINDOW", "30"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let one copy of an identical record through per window
+
+    Records are identified by level, message template and the type and text
+    of each argument, so lazy `%s` logging is needed for different values to
+    count as different messages, and two exceptions with the same message
+    count as the same one. The next copy after a window reports how many
+    were suppressed.
+    """
+
+    def __init__(self, window: float = LOG_RATE_LIMIT_WINDOW, min_level: int = logging.WARNING,
+                 max_keys: int = 10000):
+        super().__init__()
+        self.window = window
+        self.min_level = min_level
+        self.max_keys = max_keys
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.window <= 0:
+            return True
+        args = record.args.values() if isinstance(record.args, dict) else record.args or ()
+        # Objects such as exceptions hash by identity, so key on what they print as
+        key = (record.levelno, str(record.msg), tuple((type(arg).__name__, str(arg)) for arg in args))
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            suppressed = entry[1] if entry is not None else 0
+            if len(self._seen) >= self.max_keys:
+                self._prune(now)
+            self._seen[key] = [now, 0]
+
+        if suppressed:
+            record.msg = f"{record.msg} [suppressed {suppressed} repeats]"
+        return True
+
+    def _prune(self, now: float):
+        stale = [k for k, (first, _) in self._seen.items() if now - first >= self.window]
+        for k in stale:
+            del self._seen[k]
+        if len(self._seen) >= self.max_keys:
+            self._seen.clear()
+
+
+def _file_handler(path: str) -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(path, when=LOG_ROTATE_WHEN,
+                                                         backupCount=LOG_BACKUP_COUNT)
+    return logging.handlers.RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES,
+                                                backupCount=LOG_BACKUP_COUNT)
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to background file/console writers"""
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+
+    formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    file_handler = _file_handler(os.path.join(LOG_DIR, "bot.log"))
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
 
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.handlers = [queue_handler]
 
-log_file = os.path.join(LOG_DIR, f"bot_{datetime.now().strftime('%Y%m%d')}.log")
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler,
+                                              respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
 
+listener = setup_logging()
 logger = logging.getLogger("arbitrage_bot")
@@ -0,0 +1,163 @@
+"""
+Bot metrics, exposed in Prometheus text format.
+
+Metrics are `prometheus_client` collectors in its default registry; the API
+serves them at /metrics, and processes without the API can serve them with
+`start_http_server` (which also hosts the /debug profiling routes).
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+from prometheus_client import (CONTENT_TYPE_LATEST as CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram,
+                               disable_created_metrics, generate_latest)
+
+# No *_created series: nothing here is scraped across restarts in a way that needs them
+disable_created_metrics()
+
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Down to microseconds, for per-function timings
+FUNCTION_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def render() -> bytes:
+    """Every registered metric in Prometheus text format"""
+    return generate_latest(REGISTRY)
+
+
+def histogram_totals(histogram: Histogram) -> Dict[Tuple[str, ...], Tuple[float, float]]:
+    """(count, sum) per label values of a labelled histogram"""
+    totals: Dict[Tuple[str, ...], list] = {}
+    for family in histogram.collect():
+        for sample in family.samples:
+            if sample.name.endswith("_count"):
+                slot = 0
+            elif sample.name.endswith("_sum"):
+                slot = 1
+            else:
+                continue
+            key = tuple(value for name, value in sample.labels.items() if name != "le")
+            totals.setdefault(key, [0.0, 0.0])[slot] = sample.value
+    return {key: (count, total) for key, (count, total) in totals.items()}
+
+
+# ----------------------------------------------------------------------
+# Bot metrics
+# ----------------------------------------------------------------------
+
+EXCHANGE_REQUEST_SECONDS = Histogram(
+    "arbitrage_exchange_request_seconds", "Latency of exchange API calls",
+    ["exchange", "method"]
+)
+EXCHANGE_ERRORS = Counter(
+    "arbitrage_exchange_errors_total", "Exchange API calls that raised",
+    ["exchange", "method"]
+)
+EXCHANGE_BREAKER_OPEN = Gauge(
+    "arbitrage_exchange_breaker_open", "1 while an exchange is out of service after failing health checks",
+    ["exchange"]
+)
+HEDGED_REQUESTS = Counter(
+    "arbitrage_hedged_requests_total", "Reads re-sent because the first attempt passed the p95 latency",
+    ["exchange", "method", "winner"]
+)
+STALE_QUOTES = Counter(
+    "arbitrage_stale_quotes_total", "Quotes older than MAX_QUOTE_AGE_MS left out of detection or execution",
+    ["stage"]
+)
+PRICE_CYCLE_SECONDS = Histogram(
+    "arbitrage_price_cycle_seconds", "Duration of one price fetch across all exchanges and symbols"
+)
+OPPORTUNITIES_PER_CYCLE = Histogram(
+    "arbitrage_opportunities_per_cycle", "Opportunities found per detection pass",
+    buckets=COUNT_BUCKETS
+)
+TRADE_SECONDS = Histogram(
+    "arbitrage_trade_seconds", "Time to place both legs of an arbitrage trade"
+)
+TRADE_OUTCOMES = Counter(
+    "arbitrage_trade_outcomes_total", "Arbitrage trades by final status",
+    ["status"]
+)
+MAKER_REQUOTE_SECONDS = Histogram(
+    "arbitrage_maker_requote_seconds", "Time to cancel a resting maker order and place its replacement",
+    ["exchange"]
+)
+MAKER_QUEUE_AHEAD = Histogram(
+    "arbitrage_maker_queue_ahead", "Displayed size queued ahead of a new maker order, in multiples of its size",
+    ["exchange"], buckets=(0, 0.5, 1, 2, 5, 10, 20, 50, 100)
+)
+MAKER_FILL_TO_HEDGE_SECONDS = Histogram(
+    "arbitrage_maker_fill_to_hedge_seconds", "Time from a maker fill on the venue to its taker hedge being accepted",
+    ["exchange"]
+)
+RISK_DENIALS = Counter(
+    "arbitrage_risk_denials_total", "Trades blocked by the risk manager",
+    ["reason"]
+)
+DB_WRITE_QUEUE = Gauge(
+    "arbitrage_db_write_queue", "Database writes queued and not yet started"
+)
+DB_WRITE_SECONDS = Histogram(
+    "arbitrage_db_write_seconds", "Duration of database writes",
+    ["table"]
+)
+NOTIFIER_BACKLOG = Gauge(
+    "arbitrage_notifier_backlog", "Notifications queued, not counting the batch being delivered"
+)
+NOTIFICATIONS = Counter(
+    "arbitrage_notifications_total", "Notification deliveries by outcome",
+    ["outcome"]
+)
+FUNCTION_SECONDS = Histogram(
+    "arbitrage_function_seconds", "Duration of hot functions while function timings are on",
+    ["function"], buckets=FUNCTION_BUCKETS
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    # /debug routes (utils/profiling.py) need this in X-Admin-Token; empty disables them
+    admin_token = ""
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path.startswith("/debug/"):
+            self._debug("GET")
+            return
+        if path != "/metrics":
+            self.send_error(404)
+            return
+        self._send(200, CONTENT_TYPE, render())
+
+    def do_POST(self):
+        self._debug("POST")
+
+    def _debug(self, method: str):
+        from utils.profiling import debug_response, token_matches
+        if not token_matches(self.admin_token, self.headers.get("X-Admin-Token")):
+            self.send_error(404)
+            return
+        path, _, query = self.path.partition("?")
+        self._send(*debug_response(method, path, query))
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", admin_token: str = "") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread (for processes without the API)
+
+    With `admin_token`, the profiling routes under /debug/ are served too.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"admin_token": admin_token})
+    server = ThreadingHTTPServer((addr, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    return server
@@ -1,22 +1,191 @@
 # Notification system
+#
+# `notify()` only enqueues; a background worker coalesces bursts into digests
+# per chat, respects a send rate limit and retries with exponential backoff
+# over a pooled HTTP session. Set TELEGRAM_API_URL to point at a local
+# stand-in server in tests.
+
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from config.config import settings
 from config.secrets import SecretsManager
+from utils.logger import logger
+from utils.metrics import NOTIFIER_BACKLOG, NOTIFICATIONS
+
+MAX_MESSAGE_LENGTH = 4096
 
 class TelegramNotifier:
-    def __init__(self):
+    def __init__(self, api_url: str = None, queue_size: int = 1000, digest_window: float = 2.0,
+                 max_batch: int = 50, rate_per_second: float = 1.0, burst: int = 5,
+                 timeout: float = 10.0, max_retries: int = 5, backoff: float = 1.0,
+                 max_backoff: float = 60.0):
         self.secrets = SecretsManager()
         self.token = self.secrets.get_secret("telegram_api_token")
-        self.base_url = f"https://api.telegram.org/bot{self.token}" if self.token else None
+        api_url = (api_url or settings.TELEGRAM_API_URL).rstrip("/")
+        self.base_url = f"{api_url}/bot{self.token}" if self.token else None
+        self.digest_window = digest_window
+        self.max_batch = max_batch
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
 
     def send_message(self, chat_id, text):
+        """Send one message now and return Telegram's response (blocking)"""
         if not self.base_url:
             raise ValueError("Telegram API token not set.")
         url = f"{self.base_url}/sendMessage"
         payload = {"chat_id": chat_id, "text": text}
-        response = requests.post(url, json=payload)
+        response = self.session.post(url, json=payload, timeout=self.timeout)
         return response.json()
 
+    def notify(self, chat_id, text) -> bool:
+        """Queue a message for background delivery; never blocks"""
+        if not self.base_url:
+            return False
+        try:
+            self._queue.put_nowait((str(chat_id), text))
+            return True
+        except queue.Full:
+            NOTIFICATIONS.labels("dropped").inc()
+            logger.warning("Notification queue full; dropping message")
+            return False
+
+    # ------------------------------------------------------------------
+    # Background worker
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start delivering queued notifications from a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        NOTIFIER_BACKLOG.set_function(self._queue.qsize)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Deliver what is already queued (up to `timeout`) and stop
+
+        The session is closed once the worker has exited; if it is still in
+        a send after `timeout`, the worker closes it when that send ends.
+        """
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("Notifier still delivering after %.0fs; it will stop when done", timeout)
+                return
+        self.session.close()
+
+    def _run(self):
+        try:
+            self._work()
+        finally:
+            if self._stop.is_set():
+                self.session.close()
+
+    def _work(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + (0 if self._stop.is_set() else self.digest_window)
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logger.error("Notification delivery failed: %s", e)
+
+    def _deliver(self, batch: List[Tuple[str, str]]):
+        by_chat: Dict[str, List[str]] = {}
+        for chat_id, text in batch:
+            by_chat.setdefault(chat_id, []).append(text)
+
+        for chat_id, texts in by_chat.items():
+            if len(texts) == 1:
+                digest = texts[0]
+            else:
+                digest = f"🔔 {len(texts)} updates\n\n" + "\n".join(texts)
+            for start in range(0, len(digest), MAX_MESSAGE_LENGTH):
+                self._send_with_retry(chat_id, digest[start:start + MAX_MESSAGE_LENGTH])
+
+    def _throttle(self):
+        """Token bucket: wait until a send is allowed"""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_per_second)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            time.sleep((1 - self._tokens) / self.rate_per_second)
+
+    def _send_with_retry(self, chat_id: str, text: str):
+        url = f"{self.base_url}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text}
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            self._throttle()
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+                if response.status_code == 429:
+                    # Telegram says how long to back off
+                    retry_after = response.json().get("parameters", {}).get("retry_after", delay)
+                    logger.warning("Telegram rate limited; retrying in %ss", retry_after)
+                    time.sleep(min(float(retry_after), self.max_backoff))
+                    continue
+                if response.status_code < 500:
+                    if response.ok:
+                        NOTIFICATIONS.labels("sent").inc()
+                    else:
+                        # Client errors (bad chat id, bad token) won't succeed on retry
+                        NOTIFICATIONS.labels("failed").inc()
+                        logger.error("Telegram rejected message: %s %s", response.status_code, response.text[:200])
+                    return
+                logger.warning("Telegram returned %s (attempt %d)", response.status_code, attempt + 1)
+            except requests.RequestException as e:
+                logger.warning("Telegram request failed (attempt %d): %s", attempt + 1, e)
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+        NOTIFICATIONS.labels("failed").inc()
+        logger.error("Giving up on notification to %s after %d attempts", chat_id, self.max_retries + 1)
+
 # Usage example:
 # notifier = TelegramNotifier()
-# notifier.send_message(chat_id="YOUR_CHAT_ID", text="Test message from bot!")
+# notifier.start()
+# notifier.notify(chat_id="YOUR_CHAT_ID", text="Test message from bot!")
+# notifier.stop()
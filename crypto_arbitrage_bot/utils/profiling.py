@@ -0,0 +1,248 @@
+"""
+On-demand profiling for the running process.
+
+- `SamplingProfiler` samples every thread's Python stack at a fixed interval
+  from a background thread and counts the stacks in collapsed form (one
+  `frame;frame;frame count` line per stack), which flamegraph.pl,
+  speedscope and inferno read directly. Threads running an event loop
+  registered with `register_loop` get the name of the asyncio task that was
+  running as an extra root frame, so time splits by supervised task.
+- `timed` wraps hot methods with a timer that is off by default and
+  switched on at runtime (`function_timings.enabled`). While off it costs
+  one attribute check per call; while on, durations go to the
+  `arbitrage_function_seconds` histogram.
+
+Both are driven from the admin endpoints of the API (/admin/profiler,
+/admin/timings) and the bot's metrics server (/debug/profile, /debug/timings).
+"""
+import asyncio
+import functools
+import hmac
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from utils.metrics import FUNCTION_SECONDS, histogram_totals
+
+DEFAULT_INTERVAL = 0.005
+MAX_SECONDS = 300.0
+
+# Thread ident -> event loop running in that thread
+_loops: Dict[int, asyncio.AbstractEventLoop] = {}
+
+
+def register_loop(loop: Optional[asyncio.AbstractEventLoop] = None):
+    """Label samples from the calling thread with its loop's current task"""
+    _loops[threading.get_ident()] = loop or asyncio.get_running_loop()
+
+
+def _frame_label(code) -> str:
+    """`file.py:Class.method`, or "" for the `timed` wrappers, which are left out of stacks"""
+    if code.co_filename == __file__ and code.co_name in ("wrapper", "async_wrapper"):
+        return ""
+    # co_qualname is new in Python 3.11
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler across every thread of the process"""
+
+    def __init__(self):
+        self.running = False
+        self.interval = DEFAULT_INTERVAL
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self, seconds: Optional[float] = None, interval: float = DEFAULT_INTERVAL):
+        """Start sampling, stopping by itself after `seconds` (at most MAX_SECONDS)
+
+        Raises RuntimeError if a profile is already running.
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError("Profiler is already running")
+            seconds = MAX_SECONDS if seconds is None else min(max(seconds, 0.0), MAX_SECONDS)
+            self.running = True
+            self.interval = max(interval, 0.001)
+            self.started_at = time.time()
+            self.stopped_at = None
+            self.deadline = time.monotonic() + seconds
+            self.samples = 0
+            self.stacks = Counter()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling (if running) and return the collapsed stacks"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        return self.collapsed()
+
+    def profile(self, seconds: float, interval: float = DEFAULT_INTERVAL) -> str:
+        """Sample for `seconds`, blocking the calling thread, and return the collapsed stacks"""
+        self.start(seconds, interval)
+        self._stop.wait(min(max(seconds, 0.0), MAX_SECONDS))
+        return self.stop()
+
+    def collapsed(self) -> str:
+        """Stacks of the current or last profile, most sampled first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def status(self) -> Dict:
+        remaining = None
+        if self.running:
+            remaining = max(0.0, self.deadline - time.monotonic())
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "remaining": remaining,
+            "samples": self.samples,
+            "stacks": len(self.stacks)
+        }
+
+    def _run(self):
+        own = threading.get_ident()
+        try:
+            while not self._stop.wait(self.interval):
+                if time.monotonic() >= self.deadline:
+                    break
+                self._sample(own)
+        finally:
+            self.running = False
+            self.stopped_at = time.time()
+
+    def _sample(self, own: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        labels = self._labels
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                if label:
+                    stack.append(label)
+                frame = frame.f_back
+            loop = _loops.get(ident)
+            if loop is not None:
+                task = asyncio.current_task(loop)
+                if task is not None:
+                    stack.append(f"task:{task.get_name()}")
+            stack.append(names.get(ident, f"thread-{ident}"))
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+
+class FunctionTimings:
+    """Runtime switch and registry for `timed` functions"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.functions: List[str] = []
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Calls, total and mean time per timed function, busiest first"""
+        rows = {}
+        totals = histogram_totals(FUNCTION_SECONDS)
+        for name in self.functions:
+            count, total = totals.get((name,), (0, 0.0))
+            if count:
+                rows[name] = {"calls": int(count), "total_ms": total * 1000, "mean_ms": total / count * 1000}
+        return dict(sorted(rows.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+
+function_timings = FunctionTimings()
+
+
+def timed(fn: Callable = None, *, name: Optional[str] = None):
+    """Time calls to `fn` while `function_timings.enabled` is on
+
+    Coroutine functions are timed until they return, including time spent
+    awaiting.
+    """
+    if fn is None:
+        return functools.partial(timed, name=name)
+    label = name or f"{fn.__module__}.{fn.__qualname__}"
+    function_timings.functions.append(label)
+    histogram = FUNCTION_SECONDS.labels(label)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if not function_timings.enabled:
+                return await fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not function_timings.enabled:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return wrapper
+
+
+profiler = SamplingProfiler()
+
+
+def token_matches(expected: str, given: Optional[str]) -> bool:
+    """Admin token check; an empty `expected` means admin access is off"""
+    return bool(expected) and given is not None and hmac.compare_digest(expected, given)
+
+
+def debug_response(method: str, path: str, query: str) -> Tuple[int, str, bytes]:
+    """(status, content type, body) for the metrics server's /debug routes
+
+    GET  /debug/profile?seconds=30&interval_ms=5  sample, then return collapsed stacks
+    GET  /debug/timings                           per-function timings
+    POST /debug/timings?enabled=true|false        switch the timers
+    """
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    try:
+        if path == "/debug/profile" and method == "GET":
+            seconds = float(params.get("seconds", 30))
+            if not 0 < seconds <= MAX_SECONDS:
+                raise ValueError(f"seconds must be greater than 0 and at most {MAX_SECONDS:g}")
+            interval = float(params.get("interval_ms", DEFAULT_INTERVAL * 1000)) / 1000
+            body = profiler.profile(seconds, interval).encode()
+            return 200, "text/plain; charset=utf-8", body
+        if path == "/debug/timings":
+            if method == "POST":
+                function_timings.enabled = params.get("enabled", "true").lower() == "true"
+            body = {"enabled": function_timings.enabled, "functions": function_timings.snapshot()}
+            return 200, "application/json", json.dumps(body).encode()
+    except RuntimeError as e:
+        return 409, "text/plain; charset=utf-8", str(e).encode()
+    except ValueError as e:
+        return 400, "text/plain; charset=utf-8", str(e).encode()
+    return 404, "text/plain; charset=utf-8", b"Not found"
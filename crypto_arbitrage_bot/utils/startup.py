@@ -0,0 +1,119 @@
+"""
+Startup report: import time and memory of the API and the bot, optionally
+the time to build their lazy components and the time until a fresh API
+server answers /health.
+
+Every measurement runs in a fresh interpreter so earlier imports don't hide
+the cost.
+
+Usage:
+    python -m utils.startup
+    python -m utils.startup --build --serve
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict
+
+# Modules whose presence after import shows that laziness broke somewhere
+HEAVY_MODULES = ("ccxt", "aiohttp", "sqlalchemy", "numpy", "requests", "cryptography")
+
+# What `--build` does once the module is imported (`m` is the module)
+BUILD_STEPS = {
+    "api.app": "m.database.get(); m.services.get(); m.secrets_manager.get()",
+    "main": "bot = m.ArbitrageBot(); bot._build_clients(); bot._open_database(); bot.trade_executor.get()",
+}
+
+PROBE = """
+import importlib, json, resource, sys, time
+
+def peak_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+name, build, heavy = sys.argv[1], sys.argv[2], sys.argv[3].split(",")
+result = {"baseline_mb": round(peak_mb(), 1)}
+started = time.perf_counter()
+m = importlib.import_module(name)
+result["import_seconds"] = round(time.perf_counter() - started, 3)
+result["import_mb"] = round(peak_mb() - result["baseline_mb"], 1)
+result["modules"] = len(sys.modules)
+result["heavy_modules_loaded"] = [h for h in heavy if h in sys.modules]
+if build:
+    started = time.perf_counter()
+    exec(build)
+    result["build_seconds"] = round(time.perf_counter() - started, 3)
+    result["build_mb"] = round(peak_mb() - result["baseline_mb"] - result["import_mb"], 1)
+print(json.dumps(result))
+"""
+
+
+def measure_import(module: str, build: bool = False) -> Dict:
+    """Import `module` (and optionally build its components) in a fresh interpreter"""
+    steps = BUILD_STEPS.get(module, "") if build else ""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, module, steps, ",".join(HEAVY_MODULES)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_serve(timeout: float = 60.0) -> Dict:
+    """Start the API with uvicorn and time /health, then readiness"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {"health_seconds": None, "ready_seconds": None, "startup": None}
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline and server.poll() is None:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    health = json.loads(response.read())
+            except OSError:
+                time.sleep(0.02)
+                continue
+            elapsed = round(time.perf_counter() - started, 3)
+            if result["health_seconds"] is None:
+                result["health_seconds"] = elapsed
+            if health.get("ready"):
+                result["ready_seconds"] = elapsed
+                result["startup"] = health.get("startup")
+                break
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait(10)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup time and import memory")
+    parser.add_argument("--build", action="store_true",
+                        help="Also build exchange clients, database and secrets (needs credentials)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Also start the API and time /health and readiness")
+    args = parser.parse_args()
+
+    report = {module: measure_import(module, args.build) for module in BUILD_STEPS}
+    if args.serve:
+        report["serve"] = measure_serve()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()